@@ -0,0 +1,114 @@
+'''
+Browsing a large ImageCollection: listing every member up front versus
+the paged model (first page on expand, more pages only as the view
+scrolls), plus bulk delete / move of selected members via AssetManager.
+
+    python -m benchmarks.bench_collection --images 50000 --latency 0.05
+'''
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PySide6.QtCore import QThreadPool
+from PySide6.QtWidgets import QApplication
+
+import src.assetCache as assetCache
+import src.crawler as crawler
+import src.moveEngine as moveEngine
+import src.retry as retry
+from benchmarks.fake_ee import FakeEEData
+from src.assetOps import AssetManager
+from src.opeAsset import MyTreeView
+from src.treeModel import AssetTreeModel, build_tree
+
+
+def settle(app, until):
+    '''
+    Run the event loop until until() holds.
+    '''
+    while not until():
+        app.processEvents()
+        QThreadPool.globalInstance().waitForDone(10)
+    app.processEvents()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--images', type=int, default=50000)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--screens', type=int, default=20, help='pages of rows scrolled in the paged view')
+    parser.add_argument('--selected', type=int, default=500)
+    args = parser.parse_args()
+
+    assetCache.CACHE_DIR = tempfile.mkdtemp()
+    moveEngine.JOURNAL_DIR = tempfile.mkdtemp()
+    retry.configure(rate=0)
+    app = QApplication.instance() or QApplication([])
+
+    fake = FakeEEData(assets=1, fanout=1, leaves=0, latency=args.latency)
+    folder = fake.roots[0]['id']
+    collection = f"{folder}/big_collection"
+    fake.add_collection(collection, args.images)
+    restore = fake.install()
+    try:
+        # ---- 一次列出全部成员 ----
+        tracemalloc.start()
+        start = time.perf_counter()
+        members = crawler.list_children(collection)
+        eager_tree = build_tree([{'id': collection, 'type': 'Folder',
+                                  'children': [dict(m, children=[]) for m in members]}])
+        eager_time = time.perf_counter() - start
+        eager_mem = tracemalloc.get_traced_memory()[0] / 2 ** 20
+        tracemalloc.stop()
+        del members, eager_tree
+        print(f"eager listing   {args.images} members  {eager_time:7.2f}s  {eager_mem:7.1f} MB")
+
+        # ---- 分页模型 + 虚拟化视图 ----
+        model = AssetTreeModel()
+        model.setAssets([{'id': folder, 'type': 'Folder', 'children': [{'id': collection, 'type': 'ImageCollection'}]}])
+        view = MyTreeView()
+        view.resize(400, 600)
+        view.setModel(model)
+        view.show()
+        view.expand(model.indexFromNode(model.findNode(folder)))
+        node = model.findNode(collection)
+
+        tracemalloc.start()
+        calls = fake.calls
+        start = time.perf_counter()
+        view.expand(model.indexFromNode(node))
+        settle(app, lambda: node.children and not node.fetching)
+        first_page = time.perf_counter() - start
+        bar = view.verticalScrollBar()
+        for _ in range(args.screens):
+            bar.setValue(bar.value() + bar.pageStep())
+            settle(app, lambda: not node.fetching)
+        paged_mem = tracemalloc.get_traced_memory()[0] / 2 ** 20
+        tracemalloc.stop()
+        print(f"paged view      first page {first_page:7.2f}s  after {args.screens} screens: "
+              f"{len(node.children)} members loaded, {fake.calls - calls} list calls, {paged_mem:7.1f} MB")
+
+        # ---- 通过 AssetManager 批量删除 / 移动选中成员 ----
+        picked = [{'id': child.id, 'type': child.type} for child in node.children[:2 * args.selected]]
+        dest = f"{folder}/moved"
+        fake.createFolder(dest)
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            moved = AssetManager().move_assets([(a['id'], dest, a['type']) for a in picked[:args.selected]])
+            move_time = time.perf_counter() - start
+            start = time.perf_counter()
+            deleted = AssetManager().delete_assets(picked[args.selected:])
+            delete_time = time.perf_counter() - start
+        print(f"move {moved['done']} members {move_time:6.2f}s  delete {deleted['done']} members {delete_time:6.2f}s  "
+              f"(failed {moved['failed'] + deleted['failed']}), {len(fake.children[collection])} left in the collection")
+    finally:
+        restore()
+
+
+if __name__ == '__main__':
+    main()
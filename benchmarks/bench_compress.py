@@ -0,0 +1,56 @@
+'''
+Size and time of each merge_tifs output mode on synthetic imagery.
+
+    python -m benchmarks.bench_compress --inputs 5 --size 4096 --bands 2
+'''
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+import rasterio
+
+from benchmarks.bench_merge import make_inputs
+from src.rasterMerge import merge_tifs, size_report
+
+MODES = [
+    ('input layout', {}),
+    ('DEFLATE', {'compress': 'DEFLATE'}),
+    ('ZSTD', {'compress': 'ZSTD'}),
+    ('LZW', {'compress': 'LZW'}),
+    ('DEFLATE + COG', {'compress': 'DEFLATE', 'cog': True}),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--inputs', type=int, default=5)
+    parser.add_argument('--size', type=int, default=4096)
+    parser.add_argument('--bands', type=int, default=2)
+    parser.add_argument('--dtype', default='uint16')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tifs = make_inputs(tmp, args.inputs, args.size, args.bands, dtype=args.dtype, smooth=True)
+        print(f"{args.inputs} inputs x {args.size}^2 x {args.bands} bands ({args.dtype})")
+        reference = None
+        for name, options in MODES:
+            output = os.path.join(tmp, 'out.tif')
+            start = time.perf_counter()
+            merge_tifs(tifs, output, max_workers=args.workers, **options)
+            elapsed = time.perf_counter() - start
+            report = size_report(output)
+            with rasterio.open(output) as merged:
+                data = merged.read()
+            if reference is None:
+                reference = data
+            elif not np.array_equal(reference, data):
+                print(f"❌ {name} 的像素与原始布局不一致")
+            print(f"{name:<14} {elapsed:6.2f}s  {report['size'] / 2 ** 20:8.1f} MB  "
+                  f"ratio {report['ratio']:5.2f}")
+            os.remove(output)
+
+
+if __name__ == '__main__':
+    main()
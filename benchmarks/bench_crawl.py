@@ -0,0 +1,88 @@
+'''
+Benchmark the concurrent crawler against the old serial recursion.
+
+    python -m benchmarks.bench_crawl --latency 0.05 --depth 3 --fanout 4
+'''
+import argparse
+import os
+import tempfile
+import time
+import ee
+
+import src.crawler as crawler
+import src.opeAsset as oa
+from src.assetCache import AssetCache
+from benchmarks.fake_ee import FakeEEData
+
+
+def serial_get_assets():
+    '''
+    The original depth-first get_assets(): one blocking call per folder.
+    '''
+    def fetch_children(parent_id):
+        results = []
+        for child in ee.data.listAssets({'parent': parent_id}).get('assets', []):
+            node = {"id": child['id'], "type": crawler.asset_type(child), "children": []}
+            if node['type'] == 'Folder':
+                node["children"] = fetch_children(child['id'])
+            results.append(node)
+        return results
+
+    return [
+        {"id": root['id'], "type": root.get('type', ''), "children": fetch_children(root['id'])}
+        for root in ee.data.getAssetRoots()
+    ]
+
+
+def count(tree):
+    return sum(1 + count(node['children']) for node in tree)
+
+
+def run(name, fake, func):
+    fake.calls = 0
+    start = time.perf_counter()
+    tree = func()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<22} {elapsed:8.2f}s  assets={count(tree):<7} calls={fake.calls}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--fanout', type=int, default=4)
+    parser.add_argument('--leaves', type=int, default=20)
+    parser.add_argument('--page-size', type=int, default=1000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 8, 32])
+    args = parser.parse_args()
+
+    fake = FakeEEData(depth=args.depth, fanout=args.fanout, leaves=args.leaves,
+                      latency=args.latency, page_size=args.page_size)
+    print(f"tree: {fake.asset_count} assets, {len(fake.children)} folders, latency {args.latency}s")
+    restore = fake.install()
+    try:
+        base = run('serial get_assets', fake, serial_get_assets)
+        for workers in args.workers:
+            elapsed = run(f'crawl workers={workers}', fake,
+                          lambda: crawler.crawl_assets(max_workers=workers, page_size=args.page_size))
+            print(f"{'':<22} speedup x{base / elapsed:.1f}")
+
+        # 本地缓存：首次全量写入，之后 updateTime 未变的文件夹不再列出（其子文件夹仍要列出）
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = AssetCache(os.path.join(tmp, 'cache.sqlite'))
+            workers = max(args.workers)
+            run('cache cold', fake, lambda: oa.get_assets(max_workers=workers, cache=cache))
+            elapsed = run('cache unchanged', fake, lambda: oa.get_assets(max_workers=workers, cache=cache))
+            print(f"{'':<22} speedup x{base / elapsed:.1f}")
+            for folder in list(fake.children)[::10]:
+                fake.touch(folder)
+            elapsed = run('cache 10% changed', fake, lambda: oa.get_assets(max_workers=workers, cache=cache))
+            print(f"{'':<22} speedup x{base / elapsed:.1f}")
+            cache.close()
+    finally:
+        restore()
+
+
+if __name__ == '__main__':
+    main()
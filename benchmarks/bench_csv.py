@@ -0,0 +1,129 @@
+'''
+CSV point ingestion: the original _upload_csv (pd.read_csv of the whole
+file, then geemap.df_to_ee, i.e. one GeoJSON Feature per row) against the
+chunked csvPoints path (a validation pass, per-chunk dtypes, NumPy
+coordinate checks, column-oriented size-bounded batches), on a synthetic
+point log.
+
+    python -m benchmarks.bench_csv --rows 1000000 2000000
+
+Both stop at the request payload, which is serialized to measure it; the
+old path ends with geemap's df_to_geojson (mirrored here with plain dicts,
+it needs the geojson package) since turning it into ee.Features needs an
+initialized session. Each runs in its own process; "peak" is the RSS
+high-water mark above the process baseline. The old path keeps the bad
+rows (missing longitude, latitude out of range), the new one drops them.
+'''
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_tree_memory import rss_mb
+
+
+def synthetic_csv(path, rows, bad=0.01, chunk=500000):
+    '''
+    Point log with an id, timestamp, device name, reading and coordinates;
+    a fraction bad of the rows have unusable coordinates.
+    '''
+    # 非数值坐标会让原函数的 float() 直接报错，这里只用缺失和越界
+    rng = np.random.default_rng(0)
+    for start in range(0, rows, chunk):
+        n = min(chunk, rows - start)
+        lon = rng.uniform(-180, 180, n).round(6)
+        lat = rng.uniform(-90, 90, n).round(6)
+        broken = rng.random(n) < bad
+        lon[broken & (rng.random(n) < 0.5)] = np.nan
+        lat[broken] = 123.0
+        pd.DataFrame({
+            'id': np.arange(start, start + n),
+            'time': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 86400 * 365, n), unit='s'),
+            'device': np.char.add('dev_', rng.integers(0, 500, n).astype(str)),
+            'value': rng.normal(20, 5, n).round(3),
+            'longitude': lon,
+            'latitude': lat,
+        }).to_csv(path, mode='a', header=start == 0, index=False)
+
+
+def df_to_geojson(df, latitude='latitude', longitude='longitude'):
+    '''
+    geemap.common.df_to_geojson with dicts for geojson.Feature / Point.
+    '''
+    features = df.apply(
+        lambda row: {'type': 'Feature',
+                     'geometry': {'type': 'Point', 'coordinates': (float(row[longitude]), float(row[latitude]))},
+                     'properties': dict(row)},
+        axis=1,
+    ).tolist()
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+def run_old(path):
+    df = pd.read_csv(path)
+    geojson = df_to_geojson(df, latitude='latitude', longitude='longitude')
+    payload = json.dumps(geojson)
+    return {'rows': len(df), 'kept': len(geojson['features']), 'batches': 1,
+            'payload': len(payload), 'max_batch': len(payload)}
+
+
+def run_new(path):
+    import src.csvPoints as csvPoints
+    csvPoints.validate_points(path)  # 与 upload_points 相同，导出前先检查整个文件
+    stats = {}
+    batches = kept = total = largest = 0
+    for batch in csvPoints.batched(csvPoints.read_points(path, stats=stats)):
+        size = len(json.dumps(csvPoints.batch_payload(batch)))
+        batches += 1
+        kept += len(batch)
+        total += size
+        largest = max(largest, size)
+    return {'rows': stats['rows'], 'kept': kept, 'batches': batches, 'payload': total, 'max_batch': largest}
+
+
+def run_variant(variant, path):
+    import src.csvPoints  # noqa: F401  导入开销不计入
+    gc.collect()
+    base = rss_mb()
+    start = time.perf_counter()
+    result = globals()[f"run_{variant}"](path)
+    result['time'] = time.perf_counter() - start
+    result['peak'] = rss_mb('VmHWM') - base
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000000])
+    parser.add_argument('--run', choices=['old', 'new'])
+    parser.add_argument('--path')
+    args = parser.parse_args()
+
+    if args.run:
+        run_variant(args.run, args.path)
+        return
+
+    print(f"{'rows':>9} {'path':<5} {'time':>8} {'rows/s':>9} {'peak':>8} {'kept':>9} {'batches':>8} "
+          f"{'payload':>9} {'max batch':>10}")
+    for rows in args.rows:
+        path = os.path.join(tempfile.mkdtemp(), 'points.csv')
+        synthetic_csv(path, rows)
+        for variant in ('old', 'new'):
+            proc = subprocess.run([sys.executable, '-m', 'benchmarks.bench_csv', '--run', variant, '--path', path],
+                                  capture_output=True, text=True, check=True)
+            r = json.loads(proc.stdout.strip().splitlines()[-1])
+            print(f"{rows:>9} {variant:<5} {r['time']:>7.2f}s {r['rows'] / r['time']:>9.0f} {r['peak']:>6.0f}MB "
+                  f"{r['kept']:>9} {r['batches']:>8} {r['payload'] / 2 ** 20:>7.1f}MB "
+                  f"{r['max_batch'] / 2 ** 20:>8.2f}MB")
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+'''
+Benchmark the parallel DeleteEngine against the old serial AssetManager.delete.
+
+    python -m benchmarks.bench_delete --latency 0.02 --leaves 500 --quota-rate 0.02
+'''
+import argparse
+import tempfile
+import time
+import ee
+
+import src.assetCache as assetCache
+from src.deleteEngine import DeleteEngine
+from benchmarks.fake_ee import FakeEEData
+
+
+def serial_delete(asset_id):
+    '''
+    The original AssetManager.delete: one getAsset per node, one delete at a time.
+    '''
+    info = ee.data.getAsset(asset_id)
+    if info.get("type", "").lower() == "folder":
+        for child in ee.data.listAssets({"parent": asset_id}).get("assets", []):
+            serial_delete(child["id"])
+    ee.data.deleteAsset(asset_id)
+
+
+def run(name, args, func):
+    fake = FakeEEData(depth=args.depth, fanout=args.fanout, leaves=args.leaves,
+                      latency=args.latency, quota_rate=args.quota_rate)
+    total = fake.asset_count
+    restore = fake.install()
+    start = time.perf_counter()
+    try:
+        func([root['id'] for root in fake.roots])
+        status = 'ok'
+    except Exception as e:
+        status = f'aborted ({e})'
+    finally:
+        restore()
+    elapsed = time.perf_counter() - start
+    deleted = total - fake.asset_count
+    print(f"{name:<20} {elapsed:8.2f}s  deleted {deleted}/{total}  "
+          f"{deleted / elapsed:8.1f} assets/s  calls={fake.calls} quota errors={fake.quota_errors}  {status}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--depth', type=int, default=2)
+    parser.add_argument('--fanout', type=int, default=2)
+    parser.add_argument('--leaves', type=int, default=200)
+    parser.add_argument('--quota-rate', type=float, default=0.0)
+    parser.add_argument('--workers', type=int, nargs='+', default=[8, 32])
+    args = parser.parse_args()
+
+    assetCache.CACHE_DIR = tempfile.mkdtemp()
+
+    def serial(ids):
+        for asset_id in ids:
+            serial_delete(asset_id)
+    run('serial delete', args, serial)
+
+    for workers in args.workers:
+        def engine(ids):
+            result = DeleteEngine(max_workers=workers, backoff=0.05).run(ids)
+            if result['failed']:
+                raise RuntimeError(f"{result['failed']} failed")
+        run(f'engine workers={workers}', args, engine)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+'''
+Delete a tree through the shared Gateway against a backend that rejects
+more than --server-limit concurrent requests with 429: a fixed
+concurrency equal to the worker count versus the adaptive (AIMD) limit.
+
+    python -m benchmarks.bench_gateway --server-limit 10 --workers 32 --latency 0.01
+'''
+import argparse
+import tempfile
+import time
+
+import src.assetCache as assetCache
+import src.retry as retry
+from benchmarks.fake_ee import FakeEEData
+from src.deleteEngine import DeleteEngine
+
+
+def run(name, args, **gateway):
+    fake = FakeEEData(assets=args.assets, fanout=args.fanout, leaves=args.leaves,
+                      latency=args.latency, jitter=args.jitter, max_concurrent=args.server_limit)
+    total = fake.asset_count
+    gw = retry.configure(rate=args.rate, **gateway)
+    restore = fake.install()
+    start = time.perf_counter()
+    try:
+        result = DeleteEngine(max_workers=args.workers, backoff=args.backoff).run([r['id'] for r in fake.roots])
+    finally:
+        restore()
+    elapsed = time.perf_counter() - start
+    stats = gw.stats()
+    print(f"{name:<10} {elapsed:7.2f}s  {total / elapsed:8.1f} assets/s  failed {result['failed']:>4}  "
+          f"calls {fake.calls:>6}  429s {fake.quota_errors:>5}  retries {stats['retries']:>5}  "
+          f"final limit {stats['limit']:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--assets', type=int, default=3000)
+    parser.add_argument('--fanout', type=int, default=10)
+    parser.add_argument('--leaves', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.01)
+    parser.add_argument('--jitter', type=float, default=0.005)
+    parser.add_argument('--server-limit', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=32)
+    parser.add_argument('--rate', type=float, default=0, help='token bucket rate, 0 = unlimited')
+    parser.add_argument('--backoff', type=float, default=0.05)
+    args = parser.parse_args()
+
+    assetCache.CACHE_DIR = tempfile.mkdtemp()
+    print(f"server limit {args.server_limit} concurrent, {args.workers} workers, latency {args.latency}s")
+    run('fixed', args, concurrency=args.workers, min_concurrency=args.workers, max_concurrency=args.workers)
+    run('adaptive', args)
+
+
+if __name__ == '__main__':
+    main()
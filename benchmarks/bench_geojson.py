@@ -0,0 +1,87 @@
+'''
+Peak memory and parse throughput of the streaming GeoJSON path against
+json.load of the whole file. Only parsing and batching are measured; the
+ee.Feature construction and export request are the same per feature.
+
+    python -m benchmarks.bench_geojson --features 500000
+'''
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_merge import peak_rss_mb
+from src.geojsonStream import iter_features
+from src.tableUpload import batched
+
+
+def make_geojson(path, features, vertices=20, seed=0):
+    '''
+    Write a FeatureCollection of small polygons without holding it in memory.
+    '''
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{"type": "FeatureCollection", "name": "bench", "features": [\n')
+        for i in range(features):
+            x, y = rng.uniform(-170, 170), rng.uniform(-80, 80)
+            ring = [[x + 0.01 * k, y + 0.005 * (k % 3)] for k in range(vertices)] + [[x, y]]
+            feature = {
+                'type': 'Feature',
+                'geometry': {'type': 'Polygon', 'coordinates': [ring]},
+                'properties': {'id': i, 'name': f'parcel_{i}', 'area': rng.random() * 1000},
+            }
+            f.write(('' if i == 0 else ',\n') + json.dumps(feature))
+        f.write('\n]}\n')
+
+
+def run_one(variant, path, max_bytes, max_features):
+    start = time.perf_counter()
+    if variant == 'json.load':
+        with open(path, 'r', encoding='utf-8') as f:
+            features = json.load(f)['features']
+        count, parts = len(features), 1
+    else:
+        count = parts = 0
+        for batch in batched(iter_features(path, sizes=True), max_bytes=max_bytes, max_features=max_features):
+            count += len(batch)
+            parts += 1
+    elapsed = time.perf_counter() - start
+    print(json.dumps({'seconds': elapsed, 'peak_mb': peak_rss_mb(), 'features': count, 'parts': parts}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--features', type=int, default=200000)
+    parser.add_argument('--max-mb', type=float, default=8)
+    parser.add_argument('--max-features', type=int, default=10000)
+    parser.add_argument('--run', help=argparse.SUPPRESS)
+    parser.add_argument('--path', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    max_bytes = int(args.max_mb * 2 ** 20)
+
+    if args.run:
+        run_one(args.run, args.path, max_bytes, args.max_features)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.geojson')
+        make_geojson(path, args.features)
+        size_mb = os.path.getsize(path) / 2 ** 20
+        print(f"{args.features} features, {size_mb:.0f} MB")
+        for variant in ('json.load', 'stream'):
+            proc = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.bench_geojson', '--run', variant, '--path', path,
+                 '--max-mb', str(args.max_mb), '--max-features', str(args.max_features)],
+                capture_output=True, text=True, check=True
+            )
+            stats = json.loads(proc.stdout.strip().splitlines()[-1])
+            print(f"{variant:<10} {stats['seconds']:6.2f}s  {size_mb / stats['seconds']:6.1f} MB/s  "
+                  f"peak RSS {stats['peak_mb']:7.1f} MB  {stats['features']} features in {stats['parts']} batches")
+
+
+if __name__ == '__main__':
+    main()
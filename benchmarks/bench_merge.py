@@ -0,0 +1,141 @@
+'''
+Benchmark the streaming merge_tifs against the old read-everything merge
+on synthetic rasters. Each variant runs in its own process so peak RSS is
+measured independently.
+
+    python -m benchmarks.bench_merge --inputs 4 --size 4096 --bands 2
+'''
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import rasterio
+from rasterio.transform import from_origin
+
+from src.rasterMerge import merge_tifs
+
+
+def old_merge(tifs, output_path):
+    '''
+    The original _merge_tifs: read every input fully, then concatenate.
+    '''
+    arrays = []
+    profile = None
+    for i, path in enumerate(tifs):
+        with rasterio.open(path) as src:
+            if i == 0:
+                profile = src.profile
+            arrays.append(src.read())
+    merged = np.concatenate(arrays, axis=0)
+    profile.update(count=merged.shape[0])
+    with rasterio.open(output_path, 'w', **profile) as dst:
+        dst.write(merged)
+
+
+def make_inputs(folder, inputs, size, bands, dtype='uint16', smooth=False):
+    '''
+    Write synthetic GeoTIFFs; smooth=True gives gradients with a little
+    noise, which compress like real imagery instead of like white noise.
+    '''
+    rng = np.random.default_rng(0)
+    paths = []
+    for i in range(inputs):
+        path = os.path.join(folder, f"in_{i}.tif")
+        profile = {
+            'driver': 'GTiff', 'height': size, 'width': size, 'count': bands, 'dtype': dtype,
+            'crs': 'EPSG:4326', 'transform': from_origin(0, 0, 0.0001, 0.0001),
+        }
+        with rasterio.open(path, 'w', **profile) as dst:
+            for b in range(1, bands + 1):
+                for row in range(0, size, 1024):
+                    h = min(1024, size - row)
+                    if smooth:
+                        rows, cols = np.mgrid[row:row + h, 0:size]
+                        field = 3000 + 2000 * np.sin(rows / 700 + b) * np.cos(cols / 900 + i)
+                        block = (field + rng.normal(0, 20, field.shape)).astype(dtype)
+                    else:
+                        block = rng.integers(0, 10000, (h, size), dtype=dtype)
+                    dst.write(block, b, window=rasterio.windows.Window(0, row, size, h))
+        paths.append(path)
+    return paths
+
+
+def peak_rss_mb():
+    '''
+    Peak RSS of this process. ru_maxrss also counts the parent's memory at
+    fork time, so prefer VmHWM where /proc is available.
+    '''
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_one(variant, tifs, output_path, block_size, workers):
+    start = time.perf_counter()
+    if variant == 'old':
+        old_merge(tifs, output_path)
+    else:
+        merge_tifs(tifs, output_path, block_size=block_size, max_workers=workers)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({'seconds': elapsed, 'peak_mb': peak_rss_mb()}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--inputs', type=int, default=4)
+    parser.add_argument('--size', type=int, default=4096)
+    parser.add_argument('--bands', type=int, default=2)
+    parser.add_argument('--block-size', type=int, default=1024)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count() or 4])
+    parser.add_argument('--run', help=argparse.SUPPRESS)
+    parser.add_argument('--tifs', nargs='*', help=argparse.SUPPRESS)
+    parser.add_argument('--output', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run_one(args.run, args.tifs, args.output, args.block_size, args.workers[0])
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tifs = make_inputs(tmp, args.inputs, args.size, args.bands)
+        total_mb = sum(os.path.getsize(p) for p in tifs) / 2 ** 20
+        baseline = subprocess.run([sys.executable, '-c', 'from benchmarks.bench_merge import peak_rss_mb; '
+                                   'print(peak_rss_mb())'],
+                                  capture_output=True, text=True, check=True)
+        print(f"{args.inputs} inputs x {args.size}^2 x {args.bands} bands, {total_mb:.0f} MB on disk, "
+              f"import-only RSS {float(baseline.stdout):.1f} MB")
+        variants = [('old', 1)] + [('stream', w) for w in args.workers]
+        reference = None
+        for variant, workers in variants:
+            output = os.path.join(tmp, f"out_{variant}_{workers}.tif")
+            proc = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.bench_merge', '--run', variant, '--tifs', *tifs,
+                 '--output', output, '--block-size', str(args.block_size), '--workers', str(workers)],
+                capture_output=True, text=True, check=True
+            )
+            stats = json.loads(proc.stdout.strip().splitlines()[-1])
+            name = 'old merge' if variant == 'old' else f'stream workers={workers}'
+            print(f"{name:<20} {stats['seconds']:7.2f}s  {total_mb / stats['seconds']:8.1f} MB/s  "
+                  f"peak RSS {stats['peak_mb']:8.1f} MB")
+            with rasterio.open(output) as merged:
+                data = merged.read()
+            if reference is None:
+                reference = data
+            elif not np.array_equal(reference, data):
+                print(f"❌ {name} 的输出与原实现不一致")
+            del data
+            os.remove(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+'''
+Cost of the instrumentation on the Gateway hot path (metrics disabled vs
+enabled, per call), then the breakdown it reports for a crawl, move and
+delete against the fake backend.
+
+    python -m benchmarks.bench_metrics --calls 200000 --assets 5000
+'''
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import src.assetCache as assetCache
+import src.metrics as metrics
+import src.moveEngine as moveEngine
+import src.retry as retry
+from benchmarks.fake_ee import FakeEEData
+from src.assetOps import get_assets
+from src.deleteEngine import DeleteEngine
+from src.moveEngine import MoveEngine
+
+
+def noop():
+    return None
+
+
+def bench_overhead(calls):
+    gateway = retry.Gateway(rate=0, concurrency=1, max_concurrency=1)
+    print(f"{'metrics':<10} {'per call':>10}")
+    for label, enabled in (('disabled', False), ('enabled', True), ('disabled', False), ('enabled', True)):
+        metrics.configure(enabled=enabled)
+        start = time.perf_counter()
+        for _ in range(calls):
+            gateway.call(noop)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<10} {elapsed / calls * 1e6:>8.2f}us")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--calls', type=int, default=200000)
+    parser.add_argument('--assets', type=int, default=5000)
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--jitter', type=float, default=0.02)
+    parser.add_argument('--export', help='also write the metrics here (.prom or .json)')
+    args = parser.parse_args()
+
+    bench_overhead(args.calls)
+
+    os.environ.setdefault("PROJECT", 'bench')
+    assetCache.CACHE_DIR = tempfile.mkdtemp()
+    moveEngine.JOURNAL_DIR = tempfile.mkdtemp()
+    recorder = metrics.configure(enabled=True)
+    retry.configure(rate=0)
+    fake = FakeEEData(project=os.environ["PROJECT"], assets=args.assets, latency=args.latency, jitter=args.jitter)
+    restore = fake.install()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            get_assets(max_workers=16)
+            fake.createFolder(f"{fake.root}/moved")
+            MoveEngine().run([(f"{fake.root}/root_0", f"{fake.root}/moved", 'Folder')])
+            DeleteEngine().run([f"{fake.root}/moved"])
+    finally:
+        restore()
+
+    data = recorder.to_dict(recent=False)
+    print(f"\n{args.assets} assets, latency {args.latency}s + jitter {args.jitter}s")
+    print(f"{'name':<16} {'count':>7} {'err%':>6} {'total':>8} {'p50':>8} {'p95':>8} {'max':>8}")
+    for kind in ('spans', 'calls'):
+        for name, h in data[kind].items():
+            print(f"{name:<16} {h['count']:>7} {h['error_rate']:>6.1%} {h['sum']:>7.2f}s "
+                  f"{h['p50'] * 1000:>6.0f}ms {h['p95'] * 1000:>6.0f}ms {h['max'] * 1000:>6.0f}ms")
+    print(recorder.summary())
+    if args.export:
+        recorder.write(args.export)
+
+
+if __name__ == '__main__':
+    main()
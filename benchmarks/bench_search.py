@@ -0,0 +1,77 @@
+'''
+Per-keystroke search latency on a synthetic tree: the AssetIndex lookup
+alone, and the full SearchBar update (highlight, expand ancestors, jump
+to the first match) on an offscreen tree view.
+
+    python -m benchmarks.bench_search --sizes 100000 500000
+'''
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PySide6.QtWidgets import QApplication
+
+from benchmarks.bench_tree_memory import synthetic_assets
+from src.opeAsset import MyTreeView
+from src.searchBar import SearchBar
+from src.treeModel import AssetTreeModel, build_tree
+
+QUERIES = ['i', 'im', 'ima', 'image_0', 'image_01', 'image_012', 'image_0123', '^dir_1', '^dir_12', 'zzz']
+
+
+def timed_ms(func):
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def bench(size):
+    start = time.perf_counter()
+    tree = build_tree(synthetic_assets(size))
+    build = time.perf_counter() - start
+    model = AssetTreeModel()
+    model.setTree(tree)
+    view = MyTreeView()
+    view.setModel(model)
+    bar = SearchBar(view, model)
+    index = model.search_index
+    # 首次调用的一次性初始化（枚举、视口）不计入
+    bar.edit.setText('warm-up')
+    bar.edit.setText('')
+
+    def keystrokes(asset_type=None):
+        lookup, full = [], []
+        for query in QUERIES:
+            prefix = query.startswith('^')
+            lookup.append(timed_ms(lambda: index.search(query.lstrip('^'), asset_type, prefix=prefix)))
+            bar.type_box.blockSignals(True)
+            bar.type_box.setCurrentIndex(bar.type_box.findData(asset_type))
+            bar.type_box.blockSignals(False)
+            full.append(timed_ms(lambda: bar.edit.setText(query)))
+        return max(lookup), sum(lookup) / len(lookup), max(full), sum(full) / len(full)
+
+    for asset_type in (None, 'Folder'):
+        worst, mean, full_worst, full_mean = keystrokes(asset_type)
+        print(f"{size:>8} type {asset_type or 'any':<7} index {mean:6.2f} ms avg {worst:6.2f} ms max   "
+              f"search bar {full_mean:6.2f} ms avg {full_worst:6.2f} ms max   (build {build:.2f}s)")
+
+    # 删除 / 移动后索引的更新成本
+    ids = random.Random(0).sample(list(model._by_id), 1000)
+    removal = timed_ms(lambda: [index.remove(i) for i in ids])
+    after = timed_ms(lambda: index.search('image_01'))
+    print(f"{size:>8} remove 1000 ids {removal:6.1f} ms, next search {after:6.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 500000])
+    args = parser.parse_args()
+    app = QApplication.instance() or QApplication([])
+    for size in args.sizes:
+        bench(size)
+
+
+if __name__ == '__main__':
+    main()
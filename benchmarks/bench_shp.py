@@ -0,0 +1,120 @@
+'''
+Shapefile ingestion payload: geemap.shp_to_geojson (what _upload_shp sent
+in one request, full precision; for a lon / lat file it is the reader's
+__geo_interface__, used directly here since geemap's CRS check needs
+pycrs) against shpStream with coordinate
+quantization and optional simplification, on a synthetic parcel layer
+(noisy polygons) plus a coastline (one long line).
+
+    python -m benchmarks.bench_shp --parcels 5000 --vertices 400 --coast 200000
+
+Both stop at the serialized request payload (building ee objects needs an
+initialized session). Each variant runs in its own process; "peak" is the
+RSS high-water mark above the process baseline.
+'''
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import shapefile
+
+from benchmarks.bench_tree_memory import rss_mb
+
+WGS84 = ('GEOGCS["GCS_WGS_1984",DATUM["D_WGS_1984",SPHEROID["WGS_1984",6378137.0,298.257223563]],'
+         'PRIMEM["Greenwich",0.0],UNIT["Degree",0.0174532925199433]]')
+VARIANTS = {
+    'original': None,
+    'streamed': {'precision': None, 'tolerance': None},  # 默认：不取整、不简化
+    'q6': {'precision': 6, 'tolerance': None},
+    'q5+simplify': {'precision': 5, 'tolerance': 5e-5},
+}
+
+
+def synthetic_shapefiles(folder, parcels, vertices, coast):
+    '''
+    parcels.shp: noisy closed rings of `vertices` points around a grid of
+    centres; coast.shp: one random-walk line of `coast` points.
+    '''
+    rng = np.random.default_rng(0)
+    with shapefile.Writer(os.path.join(folder, 'parcels'), shapeType=shapefile.POLYGON) as w:
+        w.field('id', 'N', 10)
+        w.field('owner', 'C', 40)
+        w.field('area', 'F', 18, 6)
+        angles = np.linspace(0, 2 * np.pi, vertices)
+        for i in range(parcels):
+            cx, cy = 100 + (i % 100) * 0.01, 30 + (i // 100) * 0.01
+            radius = 0.004 * (1 + 0.05 * rng.standard_normal(vertices))
+            ring = np.column_stack([cx + radius * np.cos(angles), cy + radius * np.sin(angles)])
+            ring[-1] = ring[0]
+            w.poly([ring[::-1].tolist()])  # shapefile 外环顺时针
+            w.record(i, f"owner_{i % 977}", float(np.pi * 0.004 ** 2))
+    with shapefile.Writer(os.path.join(folder, 'coast'), shapeType=shapefile.POLYLINE) as w:
+        w.field('name', 'C', 20)
+        steps = rng.normal(0, 1e-4, (coast, 2)) + [2e-5, 0]
+        w.line([(np.cumsum(steps, axis=0) + [110, 20]).tolist()])
+        w.record('coast')
+    for name in ('parcels', 'coast'):
+        with open(os.path.join(folder, name + '.prj'), 'w') as f:
+            f.write(WGS84)
+    return [os.path.join(folder, name + '.shp') for name in ('parcels', 'coast')]
+
+
+def run_variant(variant, path):
+    import src.shpStream as shpStream
+    import src.tableUpload as tableUpload
+    gc.collect()
+    base = rss_mb()
+    start = time.perf_counter()
+    options = VARIANTS[variant]
+    if options is None:
+        with shapefile.Reader(path) as reader:
+            payload = json.dumps(reader.__geo_interface__)
+        result = {'payload': len(payload), 'max_batch': len(payload), 'batches': 1}
+    else:
+        stats = {}
+        features = shpStream.iter_features(path, stats=stats, **options)
+        sizes = [sum(len(json.dumps(f, separators=(',', ':'))) for f in batch)
+                 for batch in tableUpload.batched(features)]
+        result = {'payload': sum(sizes), 'max_batch': max(sizes), 'batches': len(sizes),
+                  'vertices': (stats['vertices_before'], stats['vertices_after']),
+                  'report': shpStream.payload_report(os.path.basename(path), stats)}
+    result['time'] = time.perf_counter() - start
+    result['peak'] = rss_mb('VmHWM') - base
+    print(json.dumps(result, ensure_ascii=False))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--parcels', type=int, default=5000)
+    parser.add_argument('--vertices', type=int, default=400)
+    parser.add_argument('--coast', type=int, default=200000)
+    parser.add_argument('--run', choices=list(VARIANTS))
+    parser.add_argument('--path')
+    args = parser.parse_args()
+
+    if args.run:
+        run_variant(args.run, args.path)
+        return
+
+    paths = synthetic_shapefiles(tempfile.mkdtemp(), args.parcels, args.vertices, args.coast)
+    print(f"{'file':<8} {'variant':<12} {'time':>7} {'peak':>7} {'payload':>9} {'batches':>8} {'max batch':>10}")
+    for path in paths:
+        for variant in VARIANTS:
+            proc = subprocess.run([sys.executable, '-m', 'benchmarks.bench_shp', '--run', variant, '--path', path],
+                                  capture_output=True, text=True, check=True)
+            r = json.loads(proc.stdout.strip().splitlines()[-1])
+            name = os.path.splitext(os.path.basename(path))[0]
+            print(f"{name:<8} {variant:<12} {r['time']:>6.2f}s {r['peak']:>5.0f}MB {r['payload'] / 2 ** 20:>7.1f}MB "
+                  f"{r['batches']:>8} {r['max_batch'] / 2 ** 20:>8.2f}MB")
+            if 'report' in r:
+                print(f"  {r['report']}")
+
+
+if __name__ == '__main__':
+    main()
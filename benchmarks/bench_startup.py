@@ -0,0 +1,61 @@
+'''
+Cold-start cost of the headless CLI versus importing the GUI module.
+Every variant runs in a fresh interpreter; `list` runs against the fake
+ee.data backend with no latency, so the time is imports plus a crawl of
+a small tree.
+
+    python -m benchmarks.bench_startup --repeat 5
+'''
+import argparse
+import contextlib
+import io
+import statistics
+import subprocess
+import sys
+import time
+
+VARIANTS = [
+    ('python (empty)', ['-c', 'pass']),
+    # 拆分前 opeAsset 在模块加载时导入的依赖
+    ('original opeAsset deps', ['-c', 'import ee, geemap, pandas, rasterio, numpy, PySide6.QtWidgets']),
+    ('import src.opeAsset', ['-c', 'import src.opeAsset']),
+    ('import src.assetOps', ['-c', 'import src.assetOps']),
+    ('cli list', ['-m', 'benchmarks.bench_startup', '--run-list']),
+]
+
+
+def run_list():
+    '''
+    What `python -m src.cli list` does, with ee.Initialize replaced by the fake backend.
+    '''
+    import src.cli as cli
+    import src.assetOps as assetOps
+    from benchmarks.fake_ee import FakeEEData
+
+    FakeEEData(depth=2, fanout=3, leaves=5, latency=0).install()
+    assetOps.initialize = lambda project=None: project
+    with contextlib.redirect_stdout(io.StringIO()):
+        cli.main(['--jsonl', 'list'])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--run-list', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_list:
+        run_list()
+        return
+
+    for name, argv in VARIANTS:
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, *argv], check=True, capture_output=True)
+            times.append(time.perf_counter() - start)
+        print(f"{name:<22} median {statistics.median(times):6.2f}s  min {min(times):6.2f}s")
+
+
+if __name__ == '__main__':
+    main()
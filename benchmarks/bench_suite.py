@@ -0,0 +1,111 @@
+'''
+Throughput of every bulk path against the fake backend at several tree
+sizes: crawl (get_assets), delete (DeleteEngine), move (MoveEngine) and
+upload (UploadEngine + export tasks polled by the TaskTracker).
+
+    python -m benchmarks.bench_suite --sizes 1000 10000 100000 --latency 0.005 --jitter 0.005
+
+Upload starts one single-feature GeoJSON table per 100 assets of scale.
+'''
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+
+import src.assetCache as assetCache
+import src.moveEngine as moveEngine
+import src.retry as retry
+import src.tableUpload as tableUpload
+import src.taskTracker as taskTracker
+from benchmarks.fake_ee import FakeEEData
+from src.assetOps import get_assets
+from src.deleteEngine import DeleteEngine
+from src.moveEngine import MoveEngine
+from src.uploadEngine import UploadEngine
+
+
+def count_nodes(tree):
+    return sum(1 + count_nodes(node['children']) for node in tree)
+
+
+def bench_crawl(fake, args):
+    tree = get_assets(max_workers=args.workers)
+    return count_nodes(tree)
+
+
+def bench_delete(fake, args):
+    before = fake.asset_count
+    DeleteEngine(max_workers=args.workers).run([root['id'] for root in fake.roots])
+    return before - fake.asset_count
+
+
+def bench_move(fake, args):
+    fake.createFolder(f"{fake.root}/moved")
+    moves = [(root['id'], f"{fake.root}/moved", 'Folder') for root in fake.roots if not root['id'].endswith('/moved')]
+    result = MoveEngine(max_workers=args.workers).run(moves)
+    return result['done']
+
+
+def bench_upload(fake, args, size):
+    folder = tempfile.mkdtemp()
+    paths = []
+    for i in range(max(1, size // 100)):
+        path = os.path.join(folder, f"layer_{i}.geojson")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'type': 'FeatureCollection', 'features': [
+                {'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [i % 180, 0]}, 'properties': {'i': i}}
+            ]}, f)
+        paths.append(path)
+    tracker = taskTracker.get_tracker()
+    tracker.min_interval = tracker.interval = 0.05
+    result = UploadEngine(max_workers=args.workers).run(paths, f"{fake.root}/root_0")
+    tracker.wait(tracker.active())
+    return result['done']
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--latency', type=float, default=0.005)
+    parser.add_argument('--jitter', type=float, default=0.005)
+    parser.add_argument('--quota-rate', type=float, default=0.0)
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--rate', type=float, default=0, help='gateway requests/s, 0 = unlimited')
+    parser.add_argument('--fanout', type=int, default=10)
+    parser.add_argument('--leaves', type=int, default=50)
+    parser.add_argument('--ops', nargs='+', default=['crawl', 'delete', 'move', 'upload'])
+    args = parser.parse_args()
+
+    os.environ.setdefault("PROJECT", 'bench')
+    assetCache.CACHE_DIR = tempfile.mkdtemp()
+    moveEngine.JOURNAL_DIR = tempfile.mkdtemp()
+    # 构造客户端 FeatureCollection 需要已初始化的会话，这里跳过
+    tableUpload.to_collection = lambda features, start_index=0: None
+
+    print(f"latency {args.latency}s + jitter {args.jitter}s, quota rate {args.quota_rate}, workers {args.workers}, "
+          f"gateway rate {args.rate or 'unlimited'}")
+    print(f"{'op':<8} {'assets':>8} {'items':>8} {'wall':>9} {'ops/s':>9} {'calls':>8}")
+    for size in args.sizes:
+        for op in args.ops:
+            fake = FakeEEData(project=os.environ["PROJECT"], assets=size, fanout=args.fanout, leaves=args.leaves,
+                              latency=args.latency, jitter=args.jitter, quota_rate=args.quota_rate)
+            retry.configure(rate=args.rate)
+            restore = fake.install()
+            start = time.perf_counter()
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    if op == 'upload':
+                        items = bench_upload(fake, args, size)
+                    else:
+                        items = globals()[f"bench_{op}"](fake, args)
+            finally:
+                restore()
+            elapsed = time.perf_counter() - start
+            print(f"{op:<8} {size:>8} {items:>8} {elapsed:>8.2f}s {items / elapsed:>9.1f} {fake.calls:>8}")
+
+
+if __name__ == '__main__':
+    main()
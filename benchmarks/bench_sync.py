@@ -0,0 +1,124 @@
+'''
+Incremental directory sync against re-uploading everything, plus the
+hashing paths on one large file.
+
+    python -m benchmarks.bench_sync --files 300 --changed 10 --big-mb 512
+
+Nightly runs: the first sync uploads every file, an unchanged directory
+uploads nothing, and after changing / adding / removing a few files only
+those are uploaded (or deleted, with delete_orphans).
+'''
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import src.assetCache as assetCache
+import src.retry as retry
+import src.syncEngine as syncEngine
+import src.tableUpload as tableUpload
+import src.taskTracker as taskTracker
+from benchmarks.fake_ee import FakeEEData
+from src.syncEngine import SyncEngine, hash_file
+from src.uploadEngine import UploadEngine
+
+
+def write_layer(path, seed):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'type': 'FeatureCollection', 'features': [
+            {'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [(seed + i) % 180, i % 90]},
+             'properties': {'seed': seed, 'i': i}} for i in range(200)
+        ]}, f)
+
+
+def bench_hash(args):
+    path = os.path.join(tempfile.mkdtemp(), 'big.bin')
+    with open(path, 'wb') as f:
+        for _ in range(args.big_mb):
+            f.write(os.urandom(2 ** 20))
+
+    def read_all(p):
+        with open(p, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    print(f"\nhash {args.big_mb} MB file")
+    print(f"{'method':<12} {'wall':>8} {'MB/s':>8} {'peak MB':>8}")
+    for label, func in (('read all', read_all), ('chunked', lambda p: hash_file(p)),
+                        ('mmap', lambda p: hash_file(p))):
+        syncEngine.MMAP_THRESHOLD = 0 if label == 'mmap' else 2 ** 62
+        tracemalloc.start()
+        start = time.perf_counter()
+        func(path)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{label:<12} {elapsed:>7.2f}s {args.big_mb / elapsed:>8.0f} {peak / 2 ** 20:>8.1f}")
+    shutil.rmtree(os.path.dirname(path))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--files', type=int, default=300)
+    parser.add_argument('--changed', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--big-mb', type=int, default=512)
+    args = parser.parse_args()
+
+    os.environ.setdefault("PROJECT", 'bench')
+    assetCache.CACHE_DIR = tempfile.mkdtemp()
+    syncEngine.MANIFEST_DIR = tempfile.mkdtemp()
+    tableUpload.to_collection = lambda features, start_index=0: None
+    retry.configure(rate=0)
+    tracker = taskTracker.get_tracker()
+    tracker.min_interval = tracker.interval = 0.05
+
+    local_dir = tempfile.mkdtemp()
+    for i in range(args.files):
+        write_layer(os.path.join(local_dir, f"layer_{i:04d}.geojson"), i)
+    fake = FakeEEData(project=os.environ["PROJECT"], assets=10, latency=args.latency)
+    folder = f"{fake.root}/synced"
+    restore = fake.install()
+
+    def timed(label, func):
+        calls = fake.calls
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = func()
+            tracker.wait(tracker.active())
+        elapsed = time.perf_counter() - start
+        uploads = result.get('uploaded', [None] * result['done'])
+        print(f"{label:<26} {elapsed:>7.2f}s {fake.calls - calls:>7} {len(uploads):>8} "
+              f"{len(result.get('deleted', [])):>8} {result['failed']:>7}")
+
+    print(f"{args.files} GeoJSON files, latency {args.latency}s")
+    print(f"{'run':<26} {'wall':>8} {'calls':>7} {'uploads':>8} {'deleted':>8} {'failed':>7}")
+    try:
+        fake.createFolder(f"{fake.root}/full")
+        paths = sorted(os.path.join(local_dir, name) for name in os.listdir(local_dir))
+        timed('upload everything', lambda: UploadEngine().run(paths, f"{fake.root}/full"))
+
+        timed('sync, first run', lambda: SyncEngine().run(local_dir, folder))
+        timed('sync, unchanged', lambda: SyncEngine().run(local_dir, folder))
+
+        for i in range(args.changed):
+            write_layer(os.path.join(local_dir, f"layer_{i * 7:04d}.geojson"), i + 100000)
+        write_layer(os.path.join(local_dir, 'layer_new.geojson'), -1)
+        for i in (1, 2):
+            os.remove(os.path.join(local_dir, f"layer_{args.files - i:04d}.geojson"))
+        label = f"sync, {args.changed} changed +1 -2"
+        timed(label, lambda: SyncEngine(delete_orphans=True).run(local_dir, folder))
+        timed('sync, unchanged again', lambda: SyncEngine(delete_orphans=True).run(local_dir, folder))
+    finally:
+        restore()
+        shutil.rmtree(local_dir)
+    bench_hash(args)
+
+
+if __name__ == '__main__':
+    main()
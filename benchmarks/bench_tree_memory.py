@@ -0,0 +1,110 @@
+'''
+Memory and build time of the asset tree model: the original
+QStandardItemModel (one item + display string + asset dict per asset)
+versus the compact AssetNode tree, for get_assets()-shaped input.
+
+    python -m benchmarks.bench_tree_memory --sizes 100000 500000
+
+Each variant runs in its own process; "retained" is the RSS growth that
+remains after the input dicts are dropped, "peak" the high-water mark.
+'''
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import time
+
+
+def synthetic_assets(size, per_folder=1000, fanout=10):
+    '''
+    get_assets() output: fanout root folders, subfolders of per_folder images.
+    '''
+    root = 'projects/bench/assets'
+    folders = max(1, size // per_folder)
+    tree = [{"id": f"{root}/root_{r}", "type": "Folder", "children": []} for r in range(min(fanout, folders))]
+    for f in range(folders):
+        parent = tree[f % len(tree)]
+        folder_id = f"{parent['id']}/dir_{f}"
+        children = [{"id": f"{folder_id}/image_{i:06d}", "type": "Image", "children": []} for i in range(per_folder)]
+        parent['children'].append({"id": folder_id, "type": "Folder", "children": children})
+    return tree
+
+
+def rss_mb(field='VmRSS'):
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def build_standard(assets):
+    '''
+    The original widget.insert_asset over a QStandardItemModel.
+    '''
+    from PySide6.QtCore import Qt
+    from PySide6.QtGui import QStandardItemModel, QStandardItem
+    model = QStandardItemModel()
+
+    def insert_asset(asset, parent_item):
+        name = asset['id'].split('/')[-1]
+        node_text = f"{name} ({asset['type']})"
+        item = QStandardItem(node_text)
+        item.setData(asset, Qt.UserRole)
+        parent_item.appendRow(item)
+        for child in asset.get('children', []):
+            insert_asset(child, item)
+
+    for asset in assets:
+        insert_asset(asset, model.invisibleRootItem())
+    return model
+
+
+def build_compact(assets):
+    from src.treeModel import AssetTreeModel, build_tree
+    model = AssetTreeModel()
+    model.setTree(build_tree(assets))
+    return model
+
+
+def run_variant(variant, size):
+    from PySide6.QtCore import QCoreApplication
+    import src.treeModel  # noqa: F401  导入开销不计入
+    app = QCoreApplication.instance() or QCoreApplication([])
+    gc.collect()
+    base = rss_mb()
+    assets = synthetic_assets(size)
+    start = time.perf_counter()
+    model = globals()[f"build_{variant}"](assets)
+    elapsed = time.perf_counter() - start
+    del assets
+    gc.collect()
+    print(json.dumps({'time': elapsed, 'retained': rss_mb() - base, 'peak': rss_mb('VmHWM') - base,
+                      'rows': model.rowCount()}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 500000])
+    parser.add_argument('--run', choices=['standard', 'compact'])
+    parser.add_argument('--size', type=int)
+    args = parser.parse_args()
+
+    if args.run:
+        run_variant(args.run, args.size)
+        return
+
+    print(f"{'assets':>8} {'model':<10} {'build':>8} {'retained':>10} {'peak':>10}")
+    for size in args.sizes:
+        for variant in ('standard', 'compact'):
+            proc = subprocess.run([sys.executable, '-m', 'benchmarks.bench_tree_memory', '--run', variant,
+                                   '--size', str(size)], capture_output=True, text=True, check=True,
+                                  env={'QT_QPA_PLATFORM': 'offscreen', **os.environ})
+            r = json.loads(proc.stdout.strip().splitlines()[-1])
+            print(f"{size:>8} {variant:<10} {r['time']:>7.2f}s {r['retained']:>8.0f}MB {r['peak']:>8.0f}MB")
+
+
+if __name__ == '__main__':
+    main()
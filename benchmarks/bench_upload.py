@@ -0,0 +1,77 @@
+'''
+Wall time of uploading many GeoJSON files one after another versus the
+UploadEngine worker pool. Parsing and batching are real; building the
+client-side collection and starting the export task are replaced by a
+fixed latency, since they need an initialized Earth Engine session.
+
+    python -m benchmarks.bench_upload --files 200 --latency 0.5
+'''
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import src.tableUpload as tableUpload
+from benchmarks.bench_geojson import make_geojson
+from src.uploadEngine import UploadEngine
+
+
+class FakeTask:
+    def __init__(self, description):
+        self.description = description
+
+    def status(self):
+        return {'state': 'COMPLETED', 'description': self.description}
+
+
+def install_fake_export(latency):
+    '''
+    Replace the ee parts of tableUpload; returns a function that restores them.
+    '''
+    saved = tableUpload.to_collection, tableUpload.export_table
+
+    def export_table(collection, description, asset_id):
+        time.sleep(latency)
+        return FakeTask(description)
+
+    tableUpload.to_collection = lambda features, start_index=0: features
+    tableUpload.export_table = export_table
+
+    def restore():
+        tableUpload.to_collection, tableUpload.export_table = saved
+    return restore
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--files', type=int, default=200)
+    parser.add_argument('--features', type=int, default=2000, help='features per file')
+    parser.add_argument('--latency', type=float, default=0.5, help='seconds per export start')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 8, 16])
+    args = parser.parse_args()
+
+    restore = install_fake_export(args.latency)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for i in range(args.files):
+                path = os.path.join(tmp, f"layer_{i}.geojson")
+                make_geojson(path, args.features, seed=i)
+                paths.append(path)
+            print(f"{args.files} files x {args.features} features, export latency {args.latency}s")
+            for workers in args.workers:
+                engine = UploadEngine(max_workers=workers)
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    result = engine.run(paths, 'projects/bench/assets/upload')
+                elapsed = time.perf_counter() - start
+                print(f"workers={workers:<3} {elapsed:7.2f}s  {args.files / elapsed:6.1f} files/s  "
+                      f"failed {result['failed']}")
+    finally:
+        restore()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+'''
+Storage usage report over a large tree: a cold run where listAssets
+already carries sizeBytes, a cold run where every size needs a getAsset,
+and a repeat run after a few assets changed (listings and sizes from the
+local cache, only the changed assets queried again).
+
+    python -m benchmarks.bench_usage --assets 40000 --latency 0.05
+'''
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import src.assetCache as assetCache
+import src.retry as retry
+from benchmarks.fake_ee import FakeEEData
+from src.usageEngine import UsageEngine, format_size
+
+
+def run(fake, cache, workers):
+    restore = fake.install()
+    calls = fake.calls
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = UsageEngine(max_workers=workers, cache=cache).run()
+    finally:
+        restore()
+    return result, time.perf_counter() - start, fake.calls - calls
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--assets', type=int, default=40000)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--jitter', type=float, default=0.01)
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--changed', type=int, default=20)
+    args = parser.parse_args()
+    os.environ.setdefault("PROJECT", 'bench')
+    retry.configure(rate=0)
+
+    print(f"{args.assets} assets, latency {args.latency}s + jitter {args.jitter}s, workers {args.workers}")
+    print(f"{'run':<24} {'wall':>8} {'calls':>8} {'getAsset':>9} {'total':>10}")
+    for label, list_sizes in (('cold, sizes listed', True), ('cold, sizes not listed', False)):
+        fake = FakeEEData(project=os.environ["PROJECT"], assets=args.assets, latency=args.latency,
+                          jitter=args.jitter, list_sizes=list_sizes)
+        cache = assetCache.AssetCache(os.path.join(tempfile.mkdtemp(), 'cache.db'))
+        result, elapsed, calls = run(fake, cache, args.workers)
+        total = sum(r['total_bytes'] for r in result['rows'] if r['parent'] is None)
+        print(f"{label:<24} {elapsed:>7.2f}s {calls:>8} {result['queried']:>9} {format_size(total):>10}")
+
+    # 改动少量资产后再次统计：只重新列出变化的文件夹、只查询变化的资产
+    images = [a for a in fake.assets if fake.assets[a]['type'] == 'Image']
+    for asset_id in images[::max(1, len(images) // args.changed)][:args.changed]:
+        fake.touch(asset_id)
+    result, elapsed, calls = run(fake, cache, args.workers)
+    total = sum(r['total_bytes'] for r in result['rows'] if r['parent'] is None)
+    print(f"{'repeat, ' + str(args.changed) + ' changed':<24} {elapsed:>7.2f}s {calls:>8} {result['queried']:>9} "
+          f"{format_size(total):>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,309 @@
+'''
+In-process stand-in for the ee.data calls used by the project.
+
+Builds a synthetic asset tree and serves getAssetRoots / listAssets /
+getAsset / createFolder / renameAsset / deleteAsset plus export task
+start / status (exportTable, getOperation, listOperations and
+ee.batch.Export.table.toAsset) with a configurable per-call latency and
+jitter, an optional rate of injected quota errors and an optional
+concurrent-request quota, so crawl, delete, move and upload cost can be
+measured offline.
+
+Like the client library, getAssetRoots reports legacy types ('Folder')
+while listAssets and getAsset report Cloud API ones ('FOLDER',
+'IMAGE_COLLECTION', ...).
+
+Trees are either depth x fanout x leaves, or any size with assets=N.
+Images and tables get a random sizeBytes; list_sizes=False leaves it out
+of listAssets, so only getAsset reports it.
+'''
+import random
+import threading
+import time
+from collections import deque
+import ee
+from src.crawler import ASSET_TYPES
+
+UPDATE_TIME = '2024-01-01T00:00:00Z'
+CLOUD_TYPES = {name: cloud for cloud, name in ASSET_TYPES.items()}
+
+
+def _cloud(asset):
+    # 内部按旧名称保存，返回时换成 Cloud API 名称
+    return dict(asset, type=CLOUD_TYPES.get(asset['type'], asset['type']))
+
+
+class FakeEEData:
+    def __init__(self, project='bench', depth=3, fanout=4, leaves=20, latency=0.05, page_size=1000,
+                 quota_rate=0.0, seed=0, jitter=0.0, assets=None, task_duration=0.0, task_fail_rate=0.0,
+                 max_concurrent=0, list_sizes=True):
+        self.project = project
+        self.latency = latency
+        self.jitter = jitter
+        self.page_size = page_size
+        self.quota_rate = quota_rate
+        self.task_duration = task_duration
+        self.task_fail_rate = task_fail_rate
+        self.max_concurrent = max_concurrent
+        self.list_sizes = list_sizes  # False: listAssets 不带 sizeBytes，只能 getAsset
+        self.in_flight = 0
+        self.calls = 0
+        self.quota_errors = 0
+        self.children = {}  # parent id -> {asset id: asset dict}
+        self.assets = {}  # asset id -> asset dict
+        self.operations = {}  # operation name -> {"name","description","asset_id","created","fail"}
+        self.root = f"projects/{project}/assets"
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        if assets is None:
+            self._build(depth, fanout, leaves)
+        else:
+            self._build_sized(assets, fanout, leaves)
+
+    def _build(self, depth, fanout, leaves):
+        def add(parent_id, level):
+            self.children[parent_id] = {}
+            for i in range(leaves):
+                self._add({'id': f"{parent_id}/img_{i}", 'type': 'Image', 'updateTime': UPDATE_TIME}, parent_id)
+            if level < depth:
+                for i in range(fanout):
+                    folder_id = f"{parent_id}/dir_{i}"
+                    self._add({'id': folder_id, 'type': 'Folder', 'updateTime': UPDATE_TIME}, parent_id)
+                    add(folder_id, level + 1)
+
+        # 项目根目录本身也作为文件夹保存，便于列出/移动到根目录
+        self.assets[self.root] = {'id': self.root, 'type': 'Folder'}
+        self.children[self.root] = {}
+        for i in range(fanout):
+            root_id = f"{self.root}/root_{i}"
+            self._add({'id': root_id, 'type': 'Folder'}, self.root)
+            add(root_id, 1)
+
+    def _build_sized(self, count, fanout, leaves):
+        '''
+        Fill folders breadth-first (leaves images and fanout subfolders
+        each) until the tree holds count assets.
+        '''
+        self.assets[self.root] = {'id': self.root, 'type': 'Folder'}
+        self.children[self.root] = {}
+        queue = deque()
+        for i in range(min(fanout, count)):
+            root_id = f"{self.root}/root_{i}"
+            self._add({'id': root_id, 'type': 'Folder', 'updateTime': UPDATE_TIME}, self.root)
+            queue.append(root_id)
+        while queue and self.asset_count < count:
+            parent_id = queue.popleft()
+            for i in range(leaves):
+                if self.asset_count >= count:
+                    return
+                self._add({'id': f"{parent_id}/img_{i}", 'type': 'Image', 'updateTime': UPDATE_TIME}, parent_id)
+            for i in range(fanout):
+                if self.asset_count >= count:
+                    return
+                folder_id = f"{parent_id}/dir_{i}"
+                self._add({'id': folder_id, 'type': 'Folder', 'updateTime': UPDATE_TIME}, parent_id)
+                queue.append(folder_id)
+
+    def add_collection(self, collection_id, images):
+        '''
+        Add an ImageCollection with the given number of member images.
+        '''
+        self._add({'id': collection_id, 'type': 'ImageCollection', 'updateTime': UPDATE_TIME},
+                  collection_id.rsplit('/', 1)[0])
+        self.children[collection_id] = {}
+        for i in range(images):
+            self._add({'id': f"{collection_id}/image_{i:06d}", 'type': 'Image', 'updateTime': UPDATE_TIME},
+                      collection_id)
+
+    def _add(self, asset, parent_id):
+        if asset['type'] in ('Image', 'Table') and 'sizeBytes' not in asset:
+            asset['sizeBytes'] = str(self._random.randint(1 << 20, 1 << 28))
+        self.children.setdefault(parent_id, {})[asset['id']] = asset
+        self.assets[asset['id']] = asset
+
+    @property
+    def roots(self):
+        return list(self.children[self.root].values())
+
+    @property
+    def asset_count(self):
+        return len(self.assets) - 1
+
+    def touch(self, asset_id):
+        '''
+        Bump the updateTime of one asset; like GEE, its ancestor folders
+        keep theirs.
+        '''
+        if asset_id in self.assets:
+            stamp = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime()) + f'.{time.time_ns()}Z'
+            self.assets[asset_id]['updateTime'] = stamp
+
+    def _wait(self):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            quota = self.quota_rate and self._random.random() < self.quota_rate
+            # 超出服务端并发配额的请求同样以 429 拒绝
+            quota = quota or (self.max_concurrent and self.in_flight > self.max_concurrent)
+            if quota:
+                self.quota_errors += 1
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+        with self._lock:
+            self.in_flight -= 1
+        if quota:
+            raise ee.EEException('Too Many Requests: RESOURCE_EXHAUSTED (429)')
+
+    def _get(self, asset_id):
+        asset = self.assets.get(asset_id)
+        if asset is None:
+            raise ee.EEException(f'Asset "{asset_id}" not found.')
+        return asset
+
+    # ---- ee.data API ----
+    def getAssetRoots(self):
+        self._wait()
+        return self.roots
+
+    def listAssets(self, params):
+        self._wait()
+        if isinstance(params, str):
+            params = {'parent': params}
+        self._get(params['parent'])
+        kids = list(self.children.get(params['parent'], {}).values())
+        if 'pageSize' not in params:
+            # 与客户端库一致：不指定 pageSize 时返回全部
+            return {'assets': [_cloud(a) for a in kids]}
+        size = min(int(params['pageSize']), self.page_size)
+        start = int(params.get('pageToken') or 0)
+        page = kids[start:start + size]
+        page = [_cloud(a) for a in page]
+        if not self.list_sizes:
+            page = [{k: v for k, v in a.items() if k != 'sizeBytes'} for a in page]
+        result = {'assets': page}
+        if start + size < len(kids):
+            result['nextPageToken'] = str(start + size)
+        return result
+
+    def getAsset(self, asset_id):
+        self._wait()
+        return _cloud(self._get(asset_id))
+
+    def createFolder(self, folder_id):
+        self._wait()
+        with self._lock:
+            if folder_id in self.assets:
+                raise ee.EEException(f'Cannot overwrite asset "{folder_id}": already exists.')
+            parent_id = folder_id.rsplit('/', 1)[0]
+            self._get(parent_id)
+            self._add({'id': folder_id, 'type': 'Folder', 'updateTime': UPDATE_TIME}, parent_id)
+            self.children.setdefault(folder_id, {})
+
+    def renameAsset(self, src_id, dest_id):
+        self._wait()
+        with self._lock:
+            asset = self._get(src_id)
+            if dest_id in self.assets:
+                raise ee.EEException(f'Cannot overwrite asset "{dest_id}": already exists.')
+            parent_id = dest_id.rsplit('/', 1)[0]
+            self._get(parent_id)
+            self.children.get(src_id.rsplit('/', 1)[0], {}).pop(src_id, None)
+            del self.assets[src_id]
+            asset['id'] = dest_id
+            self._add(asset, parent_id)
+            # 集合连同其中的影像一起改名
+            for child in list(self.children.pop(src_id, {}).values()):
+                del self.assets[child['id']]
+                child['id'] = f"{dest_id}/{child['id'].rsplit('/', 1)[-1]}"
+                self._add(child, dest_id)
+
+    def deleteAsset(self, asset_id):
+        self._wait()
+        with self._lock:
+            self._get(asset_id)
+            if self.children.get(asset_id):
+                raise ee.EEException(f'Folder "{asset_id}" is not empty.')
+            del self.assets[asset_id]
+            self.children.pop(asset_id, None)
+            self.children.get(asset_id.rsplit('/', 1)[0], {}).pop(asset_id, None)
+
+    # ---- 导出任务 ----
+    def exportTable(self, request_id, config):
+        self._wait()
+        name = f"projects/{self.project}/operations/{request_id}"
+        with self._lock:
+            self.operations[name] = {
+                'name': name,
+                'description': config.get('description', ''),
+                'asset_id': config['assetExportOptions']['earthEngineDestination']['name'],
+                'created': time.time(),
+                'fail': self._random.random() < self.task_fail_rate,
+                # 与 GEE 一致：导出不能覆盖已有资产
+                'exists': config['assetExportOptions']['earthEngineDestination']['name'] in self.assets,
+            }
+        return {'name': name}
+
+    def _operation(self, op):
+        '''
+        Cloud API Operation dict; a task finishes task_duration seconds after
+        it started, and a successful one creates its destination table.
+        '''
+        finished = time.time() - op['created'] >= self.task_duration
+        if not finished:
+            state = 'RUNNING'
+        elif op['fail'] or op.get('exists'):
+            state = 'FAILED'
+        else:
+            state = 'SUCCEEDED'
+            parent_id = op['asset_id'].rsplit('/', 1)[0]
+            if op['asset_id'] not in self.assets and parent_id in self.assets:
+                self._add({'id': op['asset_id'], 'type': 'Table', 'updateTime': UPDATE_TIME}, parent_id)
+                self.touch(op['asset_id'])
+        result = {'name': op['name'], 'done': finished,
+                  'metadata': {'state': state, 'description': op['description'], 'type': 'EXPORT_FEATURES'}}
+        if state == 'FAILED':
+            result['error'] = {'message': f'Cannot overwrite asset "{op["asset_id"]}".' if op.get('exists')
+                               else 'Simulated export failure.'}
+        return result
+
+    def getOperation(self, name):
+        self._wait()
+        with self._lock:
+            if name not in self.operations:
+                raise ee.EEException(f'Operation "{name}" not found.')
+            return self._operation(self.operations[name])
+
+    def listOperations(self, project=None):
+        self._wait()
+        with self._lock:
+            return [self._operation(op) for op in self.operations.values()]
+
+    @staticmethod
+    def _export_table_to_asset(collection, description='myExportTableTask', assetId=None, maxVertices=None, **kwargs):
+        '''
+        Export.table.toAsset without serializing the collection, which
+        would need an initialized session.
+        '''
+        config = {'description': description,
+                  'assetExportOptions': {'earthEngineDestination': {'name': assetId}}}
+        return ee.batch.Task(None, ee.batch.Task.Type.EXPORT_TABLE, ee.batch.Task.State.UNSUBMITTED, config)
+
+    def install(self):
+        '''
+        Patch ee.data (and Export.table.toAsset) in place; returns a function
+        that restores them.
+        '''
+        names = ['getAssetRoots', 'listAssets', 'getAsset', 'createFolder', 'renameAsset', 'deleteAsset',
+                 'exportTable', 'getOperation', 'listOperations']
+        saved = {name: getattr(ee.data, name) for name in names}
+        for name in names:
+            setattr(ee.data, name, getattr(self, name))
+        saved_export = ee.batch.Export.table.__dict__['toAsset']
+        ee.batch.Export.table.toAsset = staticmethod(self._export_table_to_asset)
+
+        def restore():
+            for name, func in saved.items():
+                setattr(ee.data, name, func)
+            ee.batch.Export.table.toAsset = saved_export
+        return restore
@@ -1,3 +1,4 @@
+import src.startupTiming  # 先导入以记录进程启动时间
 import src.widget as widget
 
 if __name__ == "__main__":
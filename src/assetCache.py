@@ -0,0 +1,207 @@
+import os
+import sqlite3
+import threading
+
+# --------------------------
+# 本地资产树缓存 (SQLite)
+# --------------------------
+CACHE_DIR = './output/cache'
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS assets (
+    id TEXT PRIMARY KEY,
+    parent TEXT NOT NULL,
+    type TEXT,
+    update_time TEXT
+);
+CREATE INDEX IF NOT EXISTS assets_parent ON assets(parent);
+-- 已列出子资产的文件夹，以及列出时该文件夹的 updateTime
+CREATE TABLE IF NOT EXISTS listed (
+    id TEXT PRIMARY KEY,
+    update_time TEXT
+);
+-- 用量报告：资产在该 updateTime 时的大小
+CREATE TABLE IF NOT EXISTS sizes (
+    id TEXT PRIMARY KEY,
+    update_time TEXT,
+    size_bytes INTEGER
+);
+'''
+TABLES = ('assets', 'listed', 'sizes')
+
+class AssetCache:
+    '''
+    On-disk copy of the asset tree keyed by asset id. The root folders are
+    stored as children of the empty parent '', which root_id (the project's
+    asset folder, e.g. projects/p/assets) also maps to.
+    '''
+    def __init__(self, path, root_id=None):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.root_id = root_id
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ---- 读取 ----
+    def load_tree(self):
+        '''
+        Return the cached tree in get_assets() shape; folders that were never
+        listed get "children": None. Empty list when nothing is cached.
+        '''
+        with self._lock:
+            rows = self._conn.execute('SELECT id, parent, type FROM assets').fetchall()
+            listed = {row[0] for row in self._conn.execute('SELECT id FROM listed')}
+        if '' not in listed:
+            return []
+
+        by_parent = {}
+        for asset_id, parent, asset_type in rows:
+            by_parent.setdefault(parent, []).append((asset_id, asset_type))
+
+        def build(parent_id):
+            nodes = []
+            for asset_id, asset_type in sorted(by_parent.get(parent_id, [])):
+                children = build(asset_id) if asset_id in listed else None
+                nodes.append({"id": asset_id, "type": asset_type, "children": children})
+            return nodes
+        return build('')
+
+    def cached_children(self, asset):
+        '''
+        Children of a folder if it was listed at the same updateTime, else None.
+        Usable directly as crawl_assets(cached=...); asset must come from a
+        fresh listing, the children returned carry cached updateTimes.
+        '''
+        update_time = asset.get('updateTime')
+        if not update_time:
+            return None
+        with self._lock:
+            row = self._conn.execute('SELECT update_time FROM listed WHERE id = ?', (asset['id'],)).fetchone()
+            if not row or row[0] != update_time:
+                return None
+            rows = self._conn.execute(
+                'SELECT id, type, update_time FROM assets WHERE parent = ? ORDER BY id', (asset['id'],)
+            ).fetchall()
+        return [{'id': r[0], 'type': r[1], 'updateTime': r[2]} for r in rows]
+
+    def cached_sizes(self, assets):
+        '''
+        {id: size_bytes} for the assets whose size was stored at their
+        current updateTime.
+        '''
+        wanted = {a['id']: a.get('updateTime') for a in assets if a.get('updateTime')}
+        sizes = {}
+        ids = list(wanted)
+        with self._lock:
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT id, update_time, size_bytes FROM sizes WHERE id IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                sizes.update((r[0], r[2]) for r in rows if r[1] == wanted[r[0]])
+        return sizes
+
+    # ---- 写入 ----
+    def store_sizes(self, rows):
+        '''
+        rows: (id, update_time, size_bytes)
+        '''
+        with self._lock, self._conn:
+            self._conn.executemany('INSERT OR REPLACE INTO sizes (id, update_time, size_bytes) VALUES (?, ?, ?)', rows)
+
+    def replace_children(self, parent_id, children, update_time=None):
+        '''
+        Record a fresh listing of parent_id, dropping children that are gone.
+        '''
+        parent_id = self._parent(parent_id)
+        new_ids = {child['id'] for child in children}
+        with self._lock, self._conn:
+            old_ids = [r[0] for r in self._conn.execute('SELECT id FROM assets WHERE parent = ?', (parent_id,))]
+            for old_id in old_ids:
+                if old_id not in new_ids:
+                    self._remove(old_id)
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO assets (id, parent, type, update_time) VALUES (?, ?, ?, ?)',
+                [(c['id'], parent_id, c.get('type', ''), c.get('updateTime')) for c in children]
+            )
+            self._conn.execute('INSERT OR REPLACE INTO listed (id, update_time) VALUES (?, ?)',
+                               (parent_id, update_time))
+
+    def on_listed(self, asset, children):
+        '''
+        crawl_assets(on_listed=...) hook; roots are listed under ''.
+        '''
+        self.replace_children(asset['id'], children, asset.get('updateTime'))
+
+    def add_folder(self, folder_id, parent_id):
+        '''
+        A newly created, empty folder.
+        '''
+        parent_id = self._parent(parent_id)
+        with self._lock, self._conn:
+            self._conn.execute('INSERT OR REPLACE INTO assets (id, parent, type, update_time) VALUES (?, ?, ?, NULL)',
+                               (folder_id, parent_id, 'Folder'))
+            self._conn.execute('INSERT OR REPLACE INTO listed (id, update_time) VALUES (?, NULL)', (folder_id,))
+
+    def remove(self, asset_id):
+        with self._lock, self._conn:
+            self._remove(asset_id)
+
+    def move(self, src_id, dest_id, dest_parent):
+        '''
+        Rename src_id (and anything cached below it) to dest_id under dest_parent.
+        '''
+        dest_parent = self._parent(dest_parent)
+        with self._lock, self._conn:
+            self._remove(dest_id)
+            n = len(src_id)
+            low, high = _subtree_range(src_id)
+            for table in TABLES:
+                self._conn.execute(
+                    f'UPDATE {table} SET id = ? || substr(id, ?) WHERE id = ? OR (id >= ? AND id < ?)',
+                    (dest_id, n + 1, src_id, low, high)
+                )
+            self._conn.execute(
+                'UPDATE assets SET parent = ? || substr(parent, ?) WHERE parent = ? OR (parent >= ? AND parent < ?)',
+                (dest_id, n + 1, src_id, low, high)
+            )
+            self._conn.execute('UPDATE assets SET parent = ? WHERE id = ?', (dest_parent, dest_id))
+
+    def _parent(self, parent_id):
+        return '' if parent_id == self.root_id else parent_id
+
+    def _remove(self, asset_id):
+        low, high = _subtree_range(asset_id)
+        for table in TABLES:
+            self._conn.execute(f'DELETE FROM {table} WHERE id = ? OR (id >= ? AND id < ?)',
+                               (asset_id, low, high))
+
+
+def _subtree_range(asset_id):
+    '''
+    [low, high) covering every id below asset_id, so the primary key /
+    parent index is used instead of scanning the whole table.
+    '''
+    # '0' 紧跟在 '/' 之后
+    return asset_id + '/', asset_id + '0'
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache():
+    '''
+    Shared cache for the current PROJECT, opened on first use.
+    '''
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            project = os.environ.get("PROJECT")
+            _cache = AssetCache(os.path.join(CACHE_DIR, f"{project or 'default'}.sqlite"),
+                                root_id=f"projects/{project}/assets")
+        return _cache
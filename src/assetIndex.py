@@ -0,0 +1,105 @@
+from array import array
+from bisect import bisect_right
+
+# --------------------------
+# 资产名称搜索索引
+# --------------------------
+MAX_RESULTS = 1000
+SEARCH_TYPES = ('Image', 'ImageCollection', 'Table', 'Folder')
+
+
+class AssetIndex:
+    '''
+    Name search over the loaded assets. The lower-cased names are joined
+    into one newline-separated string, so a keystroke is a few str.find
+    calls instead of a walk over every row: a substring match is any hit,
+    a prefix match a hit right after a newline. Names are grouped by type,
+    so a type filter only searches that type's slice of the string.
+    Additions and removals after the build are kept aside and merged on
+    the next rebuild.
+    '''
+    def __init__(self, items=()):
+        self.build(items)
+
+    def build(self, items):
+        '''
+        items: (asset id, type) pairs.
+        '''
+        by_type = {}
+        for asset_id, asset_type in items:
+            by_type.setdefault(asset_type, []).append(asset_id)
+
+        self._ids = []
+        self._types = []
+        self._starts = array('q')
+        self._ranges = {}  # type -> (首条下标, 末条下标 + 1)
+        names = []
+        offset = 1
+        for asset_type, ids in by_type.items():
+            first = len(self._ids)
+            for asset_id in ids:
+                name = asset_id.rsplit('/', 1)[-1].lower()
+                self._ids.append(asset_id)
+                self._types.append(asset_type)
+                self._starts.append(offset)
+                names.append(name)
+                offset += len(name) + 1
+            self._ranges[asset_type] = (first, len(self._ids))
+        # 每个名称前都有一个换行，前缀匹配即查找 "\n" + 关键字
+        self._text = '\n' + '\n'.join(names)
+        self._removed = set()
+        self._extra = {}  # 建立后新增的资产 id -> type
+
+    def add(self, asset_id, asset_type):
+        self._extra[asset_id] = asset_type
+        self._maybe_rebuild()
+
+    def remove(self, asset_id):
+        self._extra.pop(asset_id, None)
+        self._removed.add(asset_id)
+        self._maybe_rebuild()
+
+    def items(self):
+        for asset_id, asset_type in zip(self._ids, self._types):
+            if asset_id not in self._removed:
+                yield asset_id, asset_type
+        yield from self._extra.items()
+
+    def _maybe_rebuild(self):
+        if len(self._extra) + len(self._removed) > max(1000, len(self._ids) // 4):
+            self.build(list(self.items()))
+
+    def search(self, text, asset_type=None, prefix=False, limit=MAX_RESULTS):
+        '''
+        Ids whose name contains text (starts with it when prefix), optionally
+        of one type; at most limit results. An empty text matches every name.
+        '''
+        text = text.lower()
+        if '\n' in text:
+            return []
+        needle = '\n' + text if prefix else text
+        shift = 1 if prefix else 0
+        if asset_type is None:
+            first, last = 0, len(self._ids)
+        else:
+            first, last = self._ranges.get(asset_type, (0, 0))
+        end = self._starts[last] - 1 if last < len(self._ids) else len(self._text)
+
+        results = []
+        pos = self._text.find(needle, self._starts[first] - shift, end) if first < last else -1
+        while pos != -1 and len(results) < limit:
+            i = bisect_right(self._starts, pos + shift) - 1
+            if self._ids[i] not in self._removed:
+                results.append(self._ids[i])
+            # 同一名称多处命中只算一次，从下一个名称继续
+            if i + 1 >= last:
+                break
+            pos = self._text.find(needle, self._starts[i + 1] - shift, end)
+
+        for asset_id, extra_type in self._extra.items():
+            if len(results) >= limit:
+                break
+            name = asset_id.rsplit('/', 1)[-1].lower()
+            if (name.startswith(text) if prefix else text in name) and asset_type in (None, extra_type):
+                results.append(asset_id)
+        return results
@@ -0,0 +1,137 @@
+import os
+import ee
+import src.crawler as crawler
+import src.retry as retry
+from src.deleteEngine import DeleteEngine
+from src.moveEngine import MoveEngine
+from src.uploadEngine import UploadEngine
+
+# --------------------------
+# 无界面初始化
+# --------------------------
+# 本模块不依赖 Qt；geemap / pandas / rasterio 只在实际上传时才导入
+def initialize(project=None):
+    '''
+    Initialize Earth Engine with stored credentials, without the
+    interactive ee.Authenticate() step, for headless use.
+    '''
+    project = project or os.environ.get("PROJECT")
+    if project:
+        os.environ["PROJECT"] = project
+    ee.Initialize(project=project)
+    return project
+
+# --------------------------
+# 统一资产操作管理类
+# --------------------------
+class AssetManager:
+    '''
+    Bulk delete / move of any selection (folders, collections, collection
+    members) through the parallel engines. Instances report progress and
+    can be cancelled, so the window drives them like an engine.
+
+    on_progress: optional callback(done, total, failed).
+    '''
+    def __init__(self, on_progress=None):
+        self.on_progress = on_progress
+        self._engine = None
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+        if self._engine:
+            self._engine.cancel()
+
+    def _run(self, engine, method, *args):
+        self._engine = engine
+        if self._cancelled:
+            engine.cancel()
+        return getattr(engine, method)(*args)
+
+    def delete_assets(self, assets):
+        '''
+        Delete ids or {"id","type"} dicts and everything below them.
+        '''
+        return self._run(DeleteEngine(on_progress=self.on_progress), 'run', assets)
+
+    def move_assets(self, moves):
+        '''
+        Move [(src_id, dest_folder, asset_type)]; images may also go into
+        or out of an ImageCollection.
+        '''
+        return self._run(MoveEngine(on_progress=self.on_progress), 'run', moves)
+
+    def resume_move(self, journal):
+        return self._run(MoveEngine(on_progress=self.on_progress), 'resume', journal)
+
+    @staticmethod
+    def delete(asset_id, asset_type=None):
+        asset = {'id': asset_id, 'type': asset_type} if asset_type else asset_id
+        result = AssetManager().delete_assets([asset])
+        if result['failed']:
+            raise RuntimeError(f"{asset_id}: {result['failed']} 个资产删除失败")
+        print(f"✅ 删除资产: {asset_id}")
+
+    @staticmethod
+    def move(src_id, dest_folder, asset_type):
+        if not dest_folder:
+            project = os.environ.get("PROJECT")
+            dest_folder = f"projects/{project}/assets"
+        if '/' not in src_id:
+            project = os.environ.get("PROJECT")
+            src_id = f"projects/{project}/assets/{src_id}"
+
+        print(f'{src_id} move to {dest_folder}')
+
+        result = AssetManager().move_assets([(src_id, dest_folder, asset_type)])
+        if result['failed']:
+            raise RuntimeError(f"{src_id}: {result['failed']} 步移动失败，日志: {result['journal']}")
+        print(f"✅ 移动完成: {src_id} → {dest_folder}")
+
+# --------------------------
+# 默认父目录
+# --------------------------
+def default_parent(parent_id):
+    '''
+    Empty parent means the project's root asset folder.
+    '''
+    if parent_id:
+        return parent_id
+    project = os.environ.get("PROJECT")
+    return f"projects/{project}/assets"
+
+# --------------------------
+# 获取 GEE 资产树
+# --------------------------
+def get_assets(on_level=None, max_workers=crawler.MAX_WORKERS, cache=None):
+    '''
+    Fetch the whole asset tree, listing folders concurrently.
+
+    on_level: optional callback(depth, tree) streaming partial results.
+    cache: optional AssetCache; folders whose updateTime is unchanged are
+           served from it instead of being listed again, fresh listings are
+           written back.
+    Returns None when the roots cannot be listed, so callers keep the
+    tree they have instead of showing an empty one.
+    '''
+    try:
+        roots = retry.call_with_retry(ee.data.getAssetRoots)
+        if cache:
+            cache.replace_children('', roots)
+        return crawler.crawl_assets(
+            roots=roots,
+            max_workers=max_workers,
+            on_level=on_level,
+            cached=cache.cached_children if cache else None,
+            on_listed=cache.on_listed if cache else None
+        )
+    except Exception as e:
+        print(f"❌ 获取资产根目录失败: {e}")
+        return None
+
+# 上传文件到asset
+def upload_to_asset(file_paths,asset_folder):
+    '''
+    file_paths: QFileDialog.getOpenFileNames() result, ([paths], filter)
+    '''
+    return UploadEngine().run(file_paths[0], asset_folder)
@@ -0,0 +1,296 @@
+'''
+Headless bulk asset operations.
+
+    python -m src.cli list [ROOT ...]
+    python -m src.cli delete ID [ID ...]
+    python -m src.cli move SRC [SRC ...] DEST_FOLDER
+    python -m src.cli resume JOURNAL
+    python -m src.cli upload FILE [FILE ...] --folder FOLDER [--wait] [--merge]
+    python -m src.cli usage [ROOT ...] [--csv PATH] [--top N]
+    python -m src.cli sync DIR FOLDER [--delete] [--dry-run] [--wait]
+
+--jsonl writes one JSON object per line to stdout (log messages go to
+stderr). The exit code is 1 when anything failed.
+'''
+import argparse
+import contextlib
+import json
+import os
+import sys
+
+# 重依赖（ee 及各引擎）在命令执行时才导入，--help 不需要它们
+
+
+class Output:
+    '''
+    Results either as JSON lines or as plain text on the original stdout.
+    '''
+    def __init__(self, jsonl, stream):
+        self.jsonl = jsonl
+        self.stream = stream
+
+    def emit(self, event, text=None, **fields):
+        if self.jsonl:
+            line = json.dumps({'event': event, **fields}, ensure_ascii=False)
+        else:
+            line = text if text is not None else ' '.join(f"{k}={v}" for k, v in fields.items())
+        print(line, file=self.stream, flush=True)
+
+    def progress(self, done, total, failed):
+        self.emit('progress', f"{done}/{total} failed {failed}", done=done, total=total, failed=failed)
+
+    def result(self, result):
+        summary = {k: result[k] for k in ('total', 'done', 'failed') if k in result}
+        if result.get('journal'):
+            summary['journal'] = result['journal']
+        for asset_id, error in result.get('errors', []):
+            self.emit('error', f"❌ {asset_id}: {error}", id=asset_id, error=error)
+        self.emit('result', None, **summary)
+        return 1 if result.get('failed') else 0
+
+
+def cmd_list(args, out):
+    import ee
+    import src.retry as retry
+    from src.crawler import crawl_assets
+
+    if args.roots:
+        roots = [retry.call_with_retry(ee.data.getAsset, root) for root in args.roots]
+    else:
+        roots = retry.call_with_retry(ee.data.getAssetRoots)
+    tree = crawl_assets(roots=roots, max_workers=args.workers, page_size=args.page_size)
+
+    count = 0
+    stack = [(node, None, 0) for node in reversed(tree)]
+    while stack:
+        node, parent, depth = stack.pop()
+        out.emit('asset', f"{'  ' * depth}{node['id']} ({node['type']})",
+                 id=node['id'], type=node['type'], parent=parent, depth=depth)
+        count += 1
+        stack.extend((child, node['id'], depth + 1) for child in reversed(node['children']))
+    out.emit('result', f"共 {count} 个资产", total=count)
+    return 0
+
+
+def cmd_delete(args, out):
+    from src.deleteEngine import DeleteEngine
+
+    engine = DeleteEngine(max_workers=args.workers, retries=args.retries,
+                          on_progress=out.progress if args.progress else None)
+    if args.dry_run:
+        stack = list(engine.expand(args.ids))
+        while stack:
+            node = stack.pop()
+            out.emit('would_delete', f"将删除 {node['id']}", id=node['id'], type=node['type'])
+            stack.extend(node['children'])
+        return 0
+    result = engine.run(args.ids)
+    for asset_id in result['deleted']:
+        out.emit('deleted', f"🗑️ {asset_id}", id=asset_id)
+    return out.result(result)
+
+
+def cmd_move(args, out):
+    import ee
+    import src.retry as retry
+    import src.crawler as crawler
+    from concurrent.futures import ThreadPoolExecutor
+    from src.moveEngine import MoveEngine
+
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        infos = list(pool.map(lambda src: retry.call_with_retry(ee.data.getAsset, src), args.sources))
+    moves = [(info['id'], args.dest, crawler.asset_type(info)) for info in infos]
+    engine = MoveEngine(max_workers=args.workers, retries=args.retries,
+                        on_progress=out.progress if args.progress else None)
+    return out.result(engine.run(moves))
+
+
+def cmd_resume(args, out):
+    from src.moveEngine import MoveEngine
+
+    engine = MoveEngine(max_workers=args.workers, retries=args.retries,
+                        on_progress=out.progress if args.progress else None)
+    return out.result(engine.resume(args.journal))
+
+
+def cmd_upload(args, out):
+    from src.uploadEngine import UploadEngine
+    import src.taskTracker as taskTracker
+
+    def on_file(label, state):
+        out.emit('file', f"{state}: {label}", file=label, state=state)
+
+    if args.precision is not None or args.tolerance is not None:
+        import src.shpStream as shpStream
+        if args.precision is not None:
+            shpStream.PRECISION = args.precision
+        shpStream.TOLERANCE = args.tolerance or shpStream.TOLERANCE
+
+    engine = UploadEngine(max_workers=args.workers, on_file=on_file, merge=args.merge,
+                          on_progress=out.progress if args.progress else None)
+    result = engine.run(args.files, args.folder)
+    # 合并由轮询触发，进程要一直轮询到合并导出和删除分批资产都完成
+    if args.merge or (args.wait and not result['failed']):
+        tracker = taskTracker.get_tracker()
+        try:
+            tracker.wait_all()
+        except RuntimeError as e:
+            result['failed'] += 1
+            result['errors'].append(('', str(e)))
+        for record in tracker.records():
+            out.emit('task', f"{record['state']}: {record['description']} → {record['asset_id']}",
+                     id=record['id'], state=record['state'], asset_id=record['asset_id'], error=record['error'])
+    return out.result(result)
+
+
+def cmd_usage(args, out):
+    import ee
+    import src.retry as retry
+    from src.usageEngine import UsageEngine, write_csv, format_size
+
+    roots = [retry.call_with_retry(ee.data.getAsset, root) for root in args.roots] or None
+    engine = UsageEngine(max_workers=args.workers, on_progress=out.progress if args.progress else None)
+    result = engine.run(roots)
+    rows = result['rows']
+    if args.csv:
+        write_csv(rows, args.csv)
+    subtrees = [r for r in rows if r['type'] in ('Folder', 'ImageCollection')]
+    for row in sorted(subtrees, key=lambda r: -r['total_bytes'])[:args.top]:
+        out.emit('usage', f"{format_size(row['total_bytes']):>10} {row['assets']:>8}  {row['id']}"
+                          f"  ({row['oldest_update'] or '-'} ~ {row['newest_update'] or '-'})",
+                 **{k: row[k] for k in ('id', 'type', 'total_bytes', 'assets', 'oldest_update', 'newest_update')})
+    return out.result(result)
+
+
+def cmd_sync(args, out):
+    from src.syncEngine import SyncEngine
+    import src.taskTracker as taskTracker
+
+    def on_file(name, state):
+        out.emit('file', f"{state}: {name}", file=name, state=state)
+
+    engine = SyncEngine(max_workers=args.workers, hash_workers=args.hash_workers, delete_orphans=args.delete,
+                        rehash=args.rehash, on_file=on_file, on_progress=out.progress if args.progress else None)
+    result = engine.run(args.dir, args.folder, dry_run=args.dry_run)
+    plan = result['plan']
+    if args.dry_run:
+        for source in plan['upload']:
+            out.emit('would_upload', f"将上传 {source['name']} → {source['asset_id']}",
+                     file=source['name'], asset_id=source['asset_id'], hash=source['hash'])
+        for asset in plan['replace']:
+            out.emit('would_replace', f"将替换 {asset['id']}", id=asset['id'])
+        for asset in plan['orphans']:
+            verb = "将删除" if args.delete else "远端多余（--delete 删除）"
+            out.emit('orphan', f"{verb} {asset['id']}", id=asset['id'], delete=args.delete)
+        out.emit('result', f"上传 {len(plan['upload'])}，未变 {len(plan['unchanged'])}",
+                 upload=len(plan['upload']), unchanged=len(plan['unchanged']), orphans=len(plan['orphans']))
+        return 0
+    for asset_id in result['deleted']:
+        out.emit('deleted', f"🗑️ {asset_id}", id=asset_id)
+    if args.wait and result['uploaded']:
+        tracker = taskTracker.get_tracker()
+        try:
+            tracker.wait([r['id'] for r in tracker.records()])
+        except RuntimeError as e:
+            result['failed'] += 1
+            result['errors'].append(('', str(e)))
+    return out.result(result)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m src.cli', description='GEE asset bulk operations')
+    parser.add_argument('--project', help='GEE project, defaults to $PROJECT')
+    parser.add_argument('--jsonl', action='store_true', help='one JSON object per line on stdout')
+    parser.add_argument('--progress', action='store_true', help='also report progress events')
+    parser.add_argument('--rate', type=float, help='max Earth Engine requests per second (default 100, 0 = no cap)')
+    parser.add_argument('--metrics', help='write call / stage metrics here at exit (.prom for Prometheus text, else JSON)')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('list', help='list the asset tree')
+    p.add_argument('roots', nargs='*', help='folders to list, defaults to the asset roots')
+    p.add_argument('--workers', type=int, default=8)
+    p.add_argument('--page-size', type=int, default=1000)
+    p.set_defaults(func=cmd_list)
+
+    p = sub.add_parser('delete', help='delete assets and everything below them')
+    p.add_argument('ids', nargs='+')
+    p.add_argument('--workers', type=int, default=16)
+    p.add_argument('--retries', type=int, default=5)
+    p.add_argument('--dry-run', action='store_true', help='only list what would be deleted')
+    p.set_defaults(func=cmd_delete)
+
+    p = sub.add_parser('move', help='move assets into a folder')
+    p.add_argument('sources', nargs='+')
+    p.add_argument('dest')
+    p.add_argument('--workers', type=int, default=16)
+    p.add_argument('--retries', type=int, default=5)
+    p.set_defaults(func=cmd_move)
+
+    p = sub.add_parser('resume', help='resume an interrupted move from its journal')
+    p.add_argument('journal')
+    p.add_argument('--workers', type=int, default=16)
+    p.add_argument('--retries', type=int, default=5)
+    p.set_defaults(func=cmd_resume)
+
+    p = sub.add_parser('upload', help='upload GeoJSON / SHP / CSV files, merge TIFs')
+    p.add_argument('files', nargs='+')
+    p.add_argument('--folder', help='destination asset folder (required unless every file is a TIF)')
+    p.add_argument('--workers', type=int, default=8)
+    p.add_argument('--wait', action='store_true', help='wait for the export tasks to finish')
+    p.add_argument('--merge', action='store_true',
+                   help='combine the batch parts of a large table into one asset and delete the parts (implies --wait)')
+    p.add_argument('--precision', type=int, help='round shapefile coordinates to this many decimals (default: no rounding; 6 is about 0.1 m)')
+    p.add_argument('--tolerance', type=float, help='simplify shapefile geometries within this many degrees')
+    p.set_defaults(func=cmd_upload)
+
+    p = sub.add_parser('usage', help='storage used by each folder / collection')
+    p.add_argument('roots', nargs='*', help='folders to report on, defaults to the asset roots')
+    p.add_argument('--workers', type=int, default=16)
+    p.add_argument('--csv', help='write every asset with its subtree totals to this file')
+    p.add_argument('--top', type=int, default=20, help='largest subtrees to print')
+    p.set_defaults(func=cmd_usage)
+
+    p = sub.add_parser('sync', help='upload new / changed files of a directory into a folder')
+    p.add_argument('dir')
+    p.add_argument('folder')
+    p.add_argument('--delete', action='store_true', help='delete assets whose source file is gone')
+    p.add_argument('--dry-run', action='store_true', help='only show what would change')
+    p.add_argument('--rehash', action='store_true', help='hash every file even if size and mtime match')
+    p.add_argument('--workers', type=int, default=8)
+    p.add_argument('--hash-workers', type=int, default=4)
+    p.add_argument('--wait', action='store_true', help='wait for the export tasks to finish')
+    p.set_defaults(func=cmd_sync)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    # 只有全是 TIF（本地合并）时才不需要目标文件夹，与界面上的检查一致
+    if args.command == 'upload' and not args.folder and not all(f.lower().endswith('.tif') for f in args.files):
+        parser.error('upload: --folder is required unless every file is a TIF')
+    if args.command == 'upload' and args.precision is not None and args.precision < 0:
+        parser.error('upload: --precision must be 0 or more')
+    out = Output(args.jsonl, sys.stdout)
+    if args.project:
+        os.environ["PROJECT"] = args.project
+    # 引擎的提示信息写到 stderr，stdout 只留结果
+    with contextlib.redirect_stdout(sys.stderr):
+        try:
+            from src.assetOps import initialize
+            if args.rate is not None:
+                import src.retry as retry
+                retry.configure(rate=args.rate)
+            initialize(args.project)
+            return args.func(args, out)
+        except Exception as e:
+            out.emit('error', f"❌ {e}", error=str(e))
+            return 1
+        finally:
+            if args.metrics:
+                import src.metrics as metrics
+                metrics.get_metrics().write(args.metrics)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
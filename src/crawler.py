@@ -0,0 +1,150 @@
+import ee
+import src.retry as retry
+import src.metrics as metrics
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# --------------------------
+# 并发分页资产爬取
+# --------------------------
+PAGE_SIZE = 1000
+MAX_WORKERS = 8
+CONTAINER_TYPES = ('Folder',)
+# Cloud API 的 listAssets / getAsset 返回 FOLDER 等大写名称，统一为旧名称
+ASSET_TYPES = {
+    'FOLDER': 'Folder',
+    'IMAGE_COLLECTION': 'ImageCollection',
+    'IMAGE': 'Image',
+    'TABLE': 'Table',
+    'CLASSIFIER': 'Classifier',
+    'FEATURE_VIEW': 'FeatureView',
+}
+
+
+def asset_type(asset):
+    '''
+    The asset's type under the names used throughout the project
+    ('Folder', 'ImageCollection', 'Image', 'Table', ...).
+    '''
+    kind = asset.get('type') or ''
+    return ASSET_TYPES.get(kind, kind)
+
+
+def list_page(parent_id, page_token=None, page_size=PAGE_SIZE):
+    '''
+    One page of parent_id's children: (children, next page token or None).
+    Works for folders and for ImageCollections (their images). The
+    children's types are normalized with asset_type().
+    '''
+    params = {'parent': parent_id, 'pageSize': page_size}
+    if page_token:
+        params['pageToken'] = page_token
+    response = retry.call_with_retry(ee.data.listAssets, params)
+    children = response.get('assets', [])
+    for child in children:
+        child['type'] = asset_type(child)
+    return children, response.get('nextPageToken')
+
+
+def list_children(parent_id, page_size=PAGE_SIZE):
+    '''
+    List every direct child of parent_id, following nextPageToken.
+    '''
+    children = []
+    token = None
+    while True:
+        page, token = list_page(parent_id, token, page_size)
+        children.extend(page)
+        if not token:
+            return children
+
+
+def make_node(asset):
+    '''
+    Convert an ee.data asset dict into the {"id","type","children"} tree node.
+    '''
+    return {
+        "id": asset['id'],
+        "type": asset_type(asset),
+        "children": []
+    }
+
+
+@metrics.timed('crawl')
+def crawl_assets(roots=None, max_workers=MAX_WORKERS, page_size=PAGE_SIZE, on_level=None,
+                 cached=None, on_listed=None, containers=CONTAINER_TYPES):
+    '''
+    Crawl the asset tree breadth-first on a bounded thread pool.
+
+    roots: asset dicts to start from, defaults to ee.data.getAssetRoots();
+           like every other asset, only those whose type is in containers
+           are listed.
+    on_level: optional callback(depth, tree), called from the crawling thread
+              once every folder of that depth has been listed.
+    cached: optional callback(asset) returning the folder's children when
+            they are known to be unchanged, or None to list it. Only asked
+            about roots and freshly listed assets: the children it returns
+            carry cached updateTimes, so their sub-folders are listed.
+    on_listed: optional callback(asset, children) after a folder is listed.
+    containers: asset types whose children are listed.
+    Returns the same [{"id","type","children"}] shape as get_assets().
+    '''
+    if roots is None:
+        roots = retry.call_with_retry(ee.data.getAssetRoots)
+    tree = [make_node(root) for root in roots]
+
+    futures = {}
+    pending = defaultdict(int)  # depth -> 未完成的列表请求数
+    deepest = 0  # 已提交过文件夹的最大深度
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        def attach(node, depth, children, fresh=True):
+            node['children'] = [make_node(child) for child in children]
+            for child, child_node in zip(children, node['children']):
+                if child_node['type'] in containers:
+                    submit(child, child_node, depth + 1, fresh)
+
+        def submit(asset, node, depth, fresh=True):
+            nonlocal deepest
+            deepest = max(deepest, depth)
+            # 只用刚列出的 updateTime 判断缓存，缓存里的时间戳可能已过期
+            children = cached(asset) if cached and fresh else None
+            if children is not None:
+                # 缓存命中，不发请求；其子文件夹仍需列出
+                attach(node, depth, children, fresh=False)
+                return
+            future = pool.submit(list_children, node['id'], page_size)
+            futures[future] = (asset, node, depth)
+            pending[depth] += 1
+
+        # 根目录下的集合也不展开，由界面展开时分页获取
+        for root, node in zip(roots, tree):
+            if node['type'] in containers:
+                submit(root, node, 0)
+
+        def flush(emitted):
+            # 下一层只会由上一层提交，所以某层计数归零即该层完成
+            while emitted <= deepest and pending[emitted] == 0:
+                if on_level:
+                    on_level(emitted, tree)
+                emitted += 1
+            return emitted
+
+        emitted = 0
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                asset, node, depth = futures.pop(future)
+                try:
+                    children = future.result()
+                    if on_listed:
+                        on_listed(asset, children)
+                except Exception as e:
+                    print(f"❌ 获取子资产失败: {node['id']} {e}")
+                    children = []
+                attach(node, depth, children)
+                pending[depth] -= 1
+            emitted = flush(emitted)
+        flush(emitted)
+
+    return tree
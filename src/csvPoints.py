@@ -0,0 +1,163 @@
+import ee
+import numpy as np
+import pandas as pd
+import src.tableUpload as tableUpload
+
+# --------------------------
+# 分块读取 CSV 点数据
+# --------------------------
+CHUNK_ROWS = 200000
+LONGITUDE = 'longitude'
+LATITUDE = 'latitude'
+NUMBER_BYTES = 24  # JSON 中一个数值的上限估计（含分隔符）
+
+
+def validate_points(path, chunk_rows=CHUNK_ROWS, lon=LONGITUDE, lat=LATITUDE, **read_kwargs):
+    '''
+    Check the whole file before anything is exported: the coordinate
+    columns exist and every row parses. Rows are tokenized the same way
+    read_points reads them (usecols would let rows with extra fields
+    through) but kept as text, one chunk at a time. Returns the number of
+    rows; raises ValueError (or pandas' ParserError) otherwise.
+    '''
+    header = pd.read_csv(path, nrows=0, **read_kwargs)
+    if lon not in header.columns or lat not in header.columns:
+        raise ValueError(f"CSV 文件中必须包含 '{lon}' 和 '{lat}' 字段: {path}")
+    rows = 0
+    for chunk in pd.read_csv(path, chunksize=chunk_rows, dtype=object, **read_kwargs):
+        rows += len(chunk)
+    return rows
+
+
+def read_points(path, chunk_rows=CHUNK_ROWS, lon=LONGITUDE, lat=LATITUDE, dtypes=None, stats=None,
+                **read_kwargs):
+    '''
+    Yield DataFrames of at most chunk_rows valid rows. Only the coordinate
+    columns have a fixed dtype (text, parsed with to_numeric); pandas
+    infers the others chunk by chunk, so a column whose values change type
+    further down the file still reads. dtypes adds explicit dtypes. Rows
+    whose longitude / latitude is missing, non-numeric or out of range are
+    dropped with one NumPy mask per chunk.
+
+    stats: optional dict, filled with "rows" read and "dropped".
+    '''
+    stats = stats if stats is not None else {}
+    stats.setdefault('rows', 0)
+    stats.setdefault('dropped', 0)
+    dtype = dict(dtypes or {}, **{lon: object, lat: object})
+    for chunk in pd.read_csv(path, chunksize=chunk_rows, dtype=dtype, **read_kwargs):
+        x = pd.to_numeric(chunk[lon], errors='coerce').to_numpy(dtype='float64')
+        y = pd.to_numeric(chunk[lat], errors='coerce').to_numpy(dtype='float64')
+        # NaN 参与比较结果为 False，缺失 / 非数值也一并剔除
+        valid = (np.abs(x) <= 180) & (np.abs(y) <= 90)
+        stats['rows'] += len(chunk)
+        stats['dropped'] += int(len(chunk) - np.count_nonzero(valid))
+        if not valid.all():
+            chunk, x, y = chunk[valid], x[valid], y[valid]
+        if len(chunk):
+            chunk = chunk.assign(**{lon: x, lat: y})
+            yield chunk
+
+
+def row_bytes(frame):
+    '''
+    Upper estimate of each row's share of the batch payload, per column
+    and without touching single rows: a fixed width for numbers, the text
+    length for strings, with 5 more bytes per non-ASCII character for
+    its \\u escape.
+    '''
+    sizes = np.zeros(len(frame), dtype='int64')
+    for name in frame.columns:
+        column = frame[name]
+        if column.dtype.kind in 'iufb' or str(column.dtype) in ('Int64', 'boolean'):
+            sizes += NUMBER_BYTES
+        else:
+            text = column.astype('string')
+            sizes += text.str.len().fillna(4).to_numpy(dtype='int64') + 4
+            wide = text.str.count(r'[^\x00-\x7f]').fillna(0).to_numpy(dtype='int64')
+            sizes += 5 * wide
+    return sizes
+
+
+def batched(frames, max_bytes=tableUpload.MAX_BATCH_BYTES, max_features=tableUpload.MAX_BATCH_FEATURES):
+    '''
+    Regroup DataFrames into batches bounded by the estimated payload size
+    and the row count; the cut points are found with a binary search over
+    the cumulative row sizes.
+    '''
+    pending, sizes = None, None
+    for frame in frames:
+        if pending is None:
+            pending, sizes = frame, row_bytes(frame)
+        else:
+            # 各块类型可能不同（如整数列后面出现文本），concat 会提升为共同类型
+            pending = pd.concat([pending, frame], ignore_index=True)
+            sizes = np.concatenate([sizes, row_bytes(frame)])
+        ends = np.cumsum(sizes)
+        start = 0
+        while start < len(pending):
+            base = ends[start - 1] if start else 0
+            fit = int(np.searchsorted(ends, base + max_bytes, side='right'))
+            # 至少一行，即使单行就超过上限
+            stop = min(max(fit, start + 1), start + max_features)
+            if fit == len(pending) and stop - start < max_features:
+                break  # 剩余不满一批，与下一块合并
+            yield pending.iloc[start:stop]
+            start = stop
+        pending, sizes = pending.iloc[start:].reset_index(drop=True), sizes[start:]
+    if pending is not None and len(pending):
+        yield pending
+
+
+def batch_payload(frame, lon=LONGITUDE, lat=LATITUDE):
+    '''
+    Column-oriented payload of a batch: one list per column instead of a
+    Feature per row. Missing values become None.
+    '''
+    properties = {}
+    for name in frame.columns:
+        if name in (lon, lat):
+            continue
+        column = frame[name]
+        if column.isna().any():
+            column = column.astype(object).where(column.notna(), None)
+        properties[str(name)] = column.tolist()
+    return {'longitude': frame[lon].tolist(), 'latitude': frame[lat].tolist(), 'properties': properties}
+
+
+def points_collection(frame, start_index=0, lon=LONGITUDE, lat=LATITUDE):
+    '''
+    ee.FeatureCollection of a batch, assembled server side from the
+    column lists; system:index continues from start_index.
+    '''
+    payload = batch_payload(frame, lon, lat)
+    xs = ee.List(payload['longitude'])
+    ys = ee.List(payload['latitude'])
+    keys = ee.List(list(payload['properties']))
+    columns = ee.Dictionary(payload['properties'])
+
+    def feature(i):
+        i = ee.Number(i)
+        values = keys.map(lambda key: ee.List(columns.get(key)).get(i))
+        return ee.Feature(ee.Geometry.Point([xs.get(i), ys.get(i)]),
+                          ee.Dictionary.fromLists(keys, values)).set('system:index', i.add(start_index).format('%d'))
+
+    return ee.FeatureCollection(ee.List.sequence(0, len(frame) - 1).map(feature))
+
+
+def upload_points(file_path, asset_id, description, max_bytes=tableUpload.MAX_BATCH_BYTES,
+                  max_features=tableUpload.MAX_BATCH_FEATURES, chunk_rows=CHUNK_ROWS, merge=False, dtypes=None):
+    '''
+    Stream a longitude / latitude CSV into size-bounded table exports;
+    returns [(asset_id, task)] like tableUpload.export_batches. The file
+    is validated first, so a malformed one fails before any part is
+    exported.
+    '''
+    validate_points(file_path, chunk_rows=chunk_rows)
+    stats = {}
+    frames = read_points(file_path, chunk_rows=chunk_rows, dtypes=dtypes, stats=stats)
+    parts = tableUpload.export_batches(batched(frames, max_bytes, max_features), asset_id, description,
+                                       merge=merge, build=points_collection)
+    if stats['dropped']:
+        print(f"⚠️ {description}: {stats['dropped']}/{stats['rows']} 行坐标无效，已跳过")
+    return parts
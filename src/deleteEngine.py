@@ -0,0 +1,158 @@
+import threading
+import ee
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import src.crawler as crawler
+import src.retry as retry
+import src.metrics as metrics
+import src.assetCache as assetCache
+
+# --------------------------
+# 并发递归删除
+# --------------------------
+CONTAINER_TYPES = ('Folder', 'ImageCollection')
+MAX_WORKERS = 16
+
+
+def drop_nested(assets):
+    '''
+    Drop duplicates and every selected asset (id or dict) that lies below
+    another selected one; deleting the ancestor already covers it.
+    '''
+    ids = {a['id'] if isinstance(a, dict) else a for a in assets}
+    kept, seen = [], set()
+    for asset in assets:
+        asset_id = asset['id'] if isinstance(asset, dict) else asset
+        parts = asset_id.split('/')
+        if asset_id in seen or any('/'.join(parts[:i]) in ids for i in range(1, len(parts))):
+            continue
+        seen.add(asset_id)
+        kept.append(asset)
+    return kept
+
+
+class DeleteEngine:
+    '''
+    Delete whole subtrees: expand the selection once, delete leaves in
+    parallel and a folder/collection only after all of its children are gone.
+
+    on_progress: optional callback(done, total, failed), called from the
+                 engine thread.
+    '''
+    def __init__(self, max_workers=MAX_WORKERS, retries=5, backoff=1.0, on_progress=None):
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.on_progress = on_progress
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def _resolve(self, assets):
+        '''
+        Accept ids or {"id","type"} dicts; look up missing types in parallel.
+        '''
+        assets = [a if isinstance(a, dict) else {'id': a} for a in assets]
+        missing = [a for a in assets if not a.get('type')]
+        if missing:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                infos = pool.map(lambda a: retry.call_with_retry(ee.data.getAsset, a['id']), missing)
+                for asset, info in zip(missing, infos):
+                    asset['type'] = crawler.asset_type(info)
+        return [{'id': a['id'], 'type': a['type']} for a in assets]
+
+    def expand(self, assets):
+        '''
+        List every selected container once; returns [{"id","type","children"}].
+        '''
+        roots = self._resolve(drop_nested(assets))
+        containers = [a for a in roots if a['type'] in CONTAINER_TYPES]
+        tree = crawler.crawl_assets(roots=containers, max_workers=self.max_workers,
+                                    containers=CONTAINER_TYPES) if containers else []
+        by_id = {node['id']: node for node in tree}
+        return [by_id.get(a['id']) or crawler.make_node(a) for a in roots]
+
+    def _delete_one(self, asset_id):
+        try:
+            retry.call_with_retry(ee.data.deleteAsset, asset_id,
+                                  retries=self.retries, backoff=self.backoff)
+        except Exception as e:
+            # 重试前的请求可能已成功
+            if 'not found' not in str(e).lower():
+                raise
+        assetCache.get_cache().remove(asset_id)
+
+    @metrics.timed('delete')
+    def run(self, assets):
+        '''
+        Delete the given assets and everything below them.
+        Returns {"total","done","failed","deleted","errors"}.
+        '''
+        tree = self.expand(assets)
+
+        parent_of = {}
+        pending = {}  # container id -> 未删除的子资产数
+        blocked = set()  # 有子资产删除失败的容器
+        nodes = {}
+        ready = []
+
+        def index(node, parent_id):
+            if node['id'] in nodes:
+                return False  # 每个资产只计一次
+            nodes[node['id']] = node
+            parent_of[node['id']] = parent_id
+            pending[node['id']] = sum(index(child, node['id']) for child in node['children'])
+            if not pending[node['id']]:
+                ready.append(node['id'])
+            return True
+
+        for node in tree:
+            index(node, None)
+
+        result = {'total': len(nodes), 'done': 0, 'failed': 0, 'deleted': [], 'errors': []}
+        self._report(result)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {}
+
+            def submit(asset_id):
+                if self._cancelled.is_set():
+                    return
+                futures[pool.submit(self._delete_one, asset_id)] = asset_id
+
+            def finish(asset_id, error=None):
+                if error is None:
+                    result['done'] += 1
+                    result['deleted'].append(asset_id)
+                else:
+                    result['failed'] += 1
+                    result['errors'].append((asset_id, str(error)))
+                    print(f"❌ 删除失败: {asset_id} {error}")
+                parent_id = parent_of[asset_id]
+                if parent_id is None:
+                    return
+                if error is not None:
+                    blocked.add(parent_id)
+                pending[parent_id] -= 1
+                if pending[parent_id] == 0:
+                    if parent_id in blocked:
+                        finish(parent_id, '子资产未全部删除')
+                    else:
+                        submit(parent_id)
+
+            for asset_id in ready:
+                submit(asset_id)
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    asset_id = futures.pop(future)
+                    finish(asset_id, future.exception())
+                self._report(result)
+
+        if self._cancelled.is_set():
+            print(f"⚠️ 删除已取消: {result['done']}/{result['total']}")
+        return result
+
+    def _report(self, result):
+        if self.on_progress:
+            self.on_progress(result['done'], result['total'], result['failed'])
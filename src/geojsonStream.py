@@ -0,0 +1,113 @@
+import json
+
+# --------------------------
+# 流式解析 GeoJSON
+# --------------------------
+CHUNK_SIZE = 2 ** 20
+_WHITESPACE = ' \t\n\r'
+
+
+class _Reader:
+    '''
+    Incremental JSON tokenizer over a text file: decodes one value at a
+    time with raw_decode and keeps only the unconsumed tail in memory.
+    '''
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.last_size = 0
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self, n):
+        '''
+        Drop the consumed prefix and append up to n more characters.
+        '''
+        if self.eof:
+            return False
+        data = self.f.read(n)
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        if not data:
+            self.eof = True
+        return bool(data)
+
+    def peek(self):
+        '''
+        Next non-whitespace character without consuming it, '' at EOF.
+        '''
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill(self.chunk_size):
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"GeoJSON 格式错误: 位置 {self.pos} 处应为 {char!r}")
+        self.pos += 1
+
+    def value(self):
+        '''
+        Decode the next JSON value, reading more of the file while it is
+        incomplete (the read size doubles so huge values stay linear).
+        '''
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill(max(self.chunk_size, len(self.buf) - self.pos)):
+                    raise
+                continue
+            # 数字可能被块边界截断，未到文件末尾时再读一块确认
+            if end == len(self.buf) and isinstance(value, (int, float)) and self._fill(self.chunk_size):
+                continue
+            # 按 UTF-8 字节计，非 ASCII 字符不止一个字节
+            chunk = self.buf[self.pos:end]
+            self.last_size = len(chunk) if chunk.isascii() else len(chunk.encode('utf-8'))
+            self.pos = end
+            return value
+
+
+def iter_features(path, chunk_size=CHUNK_SIZE, sizes=False):
+    '''
+    Yield the features of a GeoJSON FeatureCollection one at a time.
+    Memory stays proportional to the largest single feature, not the file.
+    A bare Feature file yields that feature.
+
+    sizes=True yields (feature, bytes) with the feature's UTF-8 length in
+    the file, which saves re-serializing it to size a batch.
+    '''
+    with open(path, 'r', encoding='utf-8') as f:
+        reader = _Reader(f, chunk_size)
+        reader.expect('{')
+        members = {}
+        while reader.peek() != '}':
+            key = reader.value()
+            reader.expect(':')
+            if key == 'features':
+                reader.expect('[')
+                while reader.peek() != ']':
+                    feature = reader.value()
+                    yield (feature, reader.last_size) if sizes else feature
+                    if reader.peek() == ',':
+                        reader.pos += 1
+                reader.pos += 1
+            else:
+                members[key] = reader.value()
+            if reader.peek() == ',':
+                reader.pos += 1
+        if members.get('type') == 'Feature':
+            yield (members, feature_size(members)) if sizes else members
+
+
+def feature_size(feature):
+    '''
+    Serialized size of a GeoJSON feature in bytes (ASCII JSON, so len == bytes).
+    '''
+    return len(json.dumps(feature, separators=(',', ':')))
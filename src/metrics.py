@@ -0,0 +1,251 @@
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+
+# --------------------------
+# 请求耗时与操作阶段统计
+# --------------------------
+# GEE_METRICS=0 关闭统计
+ENABLED = os.environ.get('GEE_METRICS', '1') != '0'
+RING_SIZE = 2000  # 最近的调用 / 阶段记录条数
+# 直方图桶上限（秒），最后一个桶是 +Inf
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+class Histogram:
+    '''
+    Count, error count, sum, max and fixed-bucket latency counts.
+    '''
+    __slots__ = ('buckets', 'count', 'errors', 'sum', 'max')
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds, error=False):
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.errors += error
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        '''
+        Estimated q-quantile, interpolated inside its bucket like
+        Prometheus' histogram_quantile (max for the +Inf bucket).
+        '''
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for bound, n in zip(BUCKETS, self.buckets):
+            if n and seen + n >= rank:
+                return min(lower + (bound - lower) * (rank - seen) / n, self.max)
+            seen += n
+            lower = bound
+        return self.max
+
+    def to_dict(self):
+        return {'count': self.count, 'errors': self.errors,
+                'error_rate': self.errors / self.count if self.count else 0.0,
+                'sum': self.sum, 'max': self.max,
+                'p50': self.quantile(0.5), 'p95': self.quantile(0.95), 'p99': self.quantile(0.99),
+                'buckets': dict(zip([str(b) for b in BUCKETS] + ['+Inf'], self.buckets))}
+
+
+class Span:
+    '''
+    Times a with-block and records it as a span on exit.
+    '''
+    __slots__ = ('metrics', 'name', 'detail', 'started')
+
+    def __init__(self, metrics, name, detail=None):
+        self.metrics = metrics
+        self.name = name
+        self.detail = detail
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.record_span(self.name, time.perf_counter() - self.started, exc, self.detail)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Metrics:
+    '''
+    Per-method histograms of ee.data calls (recorded by retry.Gateway for
+    every attempt) and of named spans (crawl, model-build, delete, move,
+    merge, upload, ...), plus a ring buffer of the most recent of both.
+    When disabled, span() returns a shared no-op and nothing is recorded.
+    '''
+    def __init__(self, enabled=ENABLED, ring_size=RING_SIZE):
+        self.enabled = enabled
+        self.calls = {}  # 方法名 -> Histogram
+        self.spans = {}  # 阶段名 -> Histogram
+        # (kind, name, 结束时间, 耗时, 错误, detail)；读写都在锁内，遍历前先复制
+        self.recent = deque(maxlen=ring_size)
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def record_call(self, name, seconds, error=None):
+        with self._lock:
+            hist = self.calls.get(name)
+            if hist is None:
+                hist = self.calls[name] = Histogram()
+            hist.observe(seconds, error is not None)
+            self.recent.append(('call', name, time.time(), seconds, None if error is None else str(error), None))
+
+    def record_span(self, name, seconds, error=None, detail=None):
+        with self._lock:
+            hist = self.spans.get(name)
+            if hist is None:
+                hist = self.spans[name] = Histogram()
+            hist.observe(seconds, error is not None)
+            self.recent.append(('span', name, time.time(), seconds, None if error is None else str(error), detail))
+
+    def span(self, name, detail=None):
+        return Span(self, name, detail) if self.enabled else _NULL_SPAN
+
+    def reset(self):
+        with self._lock:
+            self.calls.clear()
+            self.spans.clear()
+            self.recent.clear()
+            self.started = time.time()
+
+    def _total(self):
+        total = Histogram()
+        for hist in self.calls.values():
+            for i, n in enumerate(hist.buckets):
+                total.buckets[i] += n
+            total.count += hist.count
+            total.errors += hist.errors
+            total.sum += hist.sum
+            total.max = max(total.max, hist.max)
+        return total
+
+    def summary(self):
+        '''
+        One line for the status bar: call count, error rate, latency
+        percentiles and the last finished span.
+        '''
+        with self._lock:
+            total = self._total()
+            recent = list(self.recent)
+        if not total.count:
+            return "EE 调用 0 次"
+        text = (f"EE 调用 {total.count} 次 · 错误 {total.errors / total.count:.1%} · "
+                f"p50 {_format_seconds(total.quantile(0.5))} · p95 {_format_seconds(total.quantile(0.95))}")
+        for kind, name, _, seconds, error, _ in reversed(recent):
+            if kind == 'span':
+                text += f" · 上次 {name} {_format_seconds(seconds)}{' ❌' if error else ''}"
+                break
+        return text
+
+    def to_dict(self, recent=True):
+        with self._lock:
+            data = {'started': self.started, 'uptime': time.time() - self.started,
+                    'calls': {name: hist.to_dict() for name, hist in sorted(self.calls.items())},
+                    'spans': {name: hist.to_dict() for name, hist in sorted(self.spans.items())}}
+            entries = list(self.recent) if recent else None
+        if recent:
+            data['recent'] = [{'kind': kind, 'name': name, 'time': at, 'seconds': seconds,
+                               'error': error, 'detail': detail}
+                              for kind, name, at, seconds, error, detail in entries]
+        return data
+
+    def to_prometheus(self):
+        '''
+        Prometheus text exposition format.
+        '''
+        lines = []
+        with self._lock:
+            groups = (('gee_call', 'method', 'ee.data call', self.calls),
+                      ('gee_span', 'span', 'operation stage', self.spans))
+            for prefix, label, what, hists in groups:
+                lines += [f"# HELP {prefix}_duration_seconds Duration of each {what}.",
+                          f"# TYPE {prefix}_duration_seconds histogram"]
+                for name, hist in sorted(hists.items()):
+                    seen = 0
+                    for bound, n in zip([str(b) for b in BUCKETS] + ['+Inf'], hist.buckets):
+                        seen += n
+                        lines.append(f'{prefix}_duration_seconds_bucket{{{label}="{name}",le="{bound}"}} {seen}')
+                    lines.append(f'{prefix}_duration_seconds_sum{{{label}="{name}"}} {hist.sum:.6f}')
+                    lines.append(f'{prefix}_duration_seconds_count{{{label}="{name}"}} {hist.count}')
+                lines += [f"# HELP {prefix}_errors_total Failed {what}s.",
+                          f"# TYPE {prefix}_errors_total counter"]
+                for name, hist in sorted(hists.items()):
+                    lines.append(f'{prefix}_errors_total{{{label}="{name}"}} {hist.errors}')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        '''
+        Export to path: Prometheus text for .prom / .txt, JSON otherwise.
+        '''
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            if path.endswith(('.prom', '.txt')):
+                f.write(self.to_prometheus())
+            else:
+                json.dump(self.to_dict(), f, ensure_ascii=False, indent=1)
+
+
+def _format_seconds(seconds):
+    return f"{seconds * 1000:.0f} ms" if seconds < 1 else f"{seconds:.1f} s"
+
+
+_metrics = Metrics()
+
+
+def get_metrics():
+    return _metrics
+
+
+def configure(**kwargs):
+    '''
+    Replace the shared Metrics, e.g. configure(enabled=False).
+    '''
+    global _metrics
+    _metrics = Metrics(**kwargs)
+    return _metrics
+
+
+def span(name, detail=None):
+    return _metrics.span(name, detail)
+
+
+def timed(name):
+    '''
+    Decorator recording every call of the function as a span.
+    '''
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _metrics.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
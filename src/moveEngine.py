@@ -0,0 +1,252 @@
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+import ee
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import src.crawler as crawler
+import src.retry as retry
+import src.metrics as metrics
+import src.assetCache as assetCache
+
+# --------------------------
+# 可恢复的批量移动
+# --------------------------
+JOURNAL_DIR = './output/journal'
+MAX_WORKERS = 16
+
+
+class MoveJournal:
+    '''
+    Append-only JSON-lines log of a move: the planned operations first,
+    then one line per finished operation. A journal that is not marked
+    complete can be replayed to resume the move.
+    '''
+    def __init__(self, path, ops, done=None):
+        self.path = path
+        self.ops = ops
+        self.done = set(done or ())
+        self._lock = threading.Lock()
+        self._file = None
+
+    @classmethod
+    def create(cls, ops, journal_dir=None):
+        journal_dir = journal_dir or JOURNAL_DIR
+        os.makedirs(journal_dir, exist_ok=True)
+        name = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}.jsonl"
+        path = os.path.join(journal_dir, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'plan': ops}) + '\n')
+        return cls(path, ops)
+
+    @classmethod
+    def load(cls, path):
+        ops, done = [], set()
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break  # 中断时写了一半的行
+                if 'plan' in entry:
+                    ops = entry['plan']
+                elif 'done' in entry:
+                    done.add(entry['done'])
+        return cls(path, ops, done)
+
+    def _append(self, entry):
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(json.dumps(entry) + '\n')
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def mark_done(self, i):
+        self._append({'done': i})
+        self.done.add(i)
+
+    def mark_failed(self, i, error):
+        self._append({'failed': i, 'error': str(error)})
+
+    def complete(self):
+        self.close()
+        os.replace(self.path, self.path + '.done')
+
+
+def pending_journals(journal_dir=None):
+    '''
+    Paths of moves that were interrupted before finishing.
+    '''
+    journal_dir = journal_dir or JOURNAL_DIR
+    if not os.path.isdir(journal_dir):
+        return []
+    return sorted(os.path.join(journal_dir, n) for n in os.listdir(journal_dir) if n.endswith('.jsonl'))
+
+
+def abandon_journal(path):
+    '''
+    Stop offering an interrupted move for resumption; the log is kept.
+    '''
+    os.replace(path, path + '.abandoned')
+
+
+@metrics.timed('move.plan')
+def plan_moves(moves, max_workers=MAX_WORKERS):
+    '''
+    moves: [(src_id, dest_folder, asset_type)]
+    Returns ops [{"op","src","dest","parent","stage"}] where every stage
+    only depends on earlier ones: folder creates parents first, then all
+    renames, then source folder deletes deepest first.
+    '''
+    folders = [{'id': src, 'type': 'Folder'} for src, _, t in moves if t.lower() == 'folder']
+    trees = {node['id']: node for node in crawler.crawl_assets(roots=folders, max_workers=max_workers)} if folders else {}
+
+    creates, renames, deletes = [], [], []
+
+    def walk(node, target, parent, depth):
+        if node['type'].lower() == 'folder':
+            creates.append((depth, {'op': 'create', 'src': node['id'], 'dest': target, 'parent': parent}))
+            for child in node['children']:
+                walk(child, f"{target}/{child['id'].split('/')[-1]}", target, depth + 1)
+            deletes.append((depth, {'op': 'delete', 'src': node['id'], 'dest': None, 'parent': None}))
+        else:
+            renames.append({'op': 'rename', 'src': node['id'], 'dest': target, 'parent': parent})
+
+    for src, dest_folder, asset_type in moves:
+        node = trees.get(src) or {'id': src, 'type': asset_type, 'children': []}
+        walk(node, f"{dest_folder}/{src.split('/')[-1]}", dest_folder, 0)
+
+    max_depth = max([d for d, _ in creates], default=-1)
+    ops = []
+    for depth, op in sorted(creates, key=lambda c: c[0]):
+        ops.append({**op, 'stage': depth})
+    for op in renames:
+        ops.append({**op, 'stage': max_depth + 1})
+    for depth, op in sorted(deletes, key=lambda d: -d[0]):
+        ops.append({**op, 'stage': max_depth + 2 + (max_depth - depth)})
+    return ops
+
+
+class MoveEngine:
+    '''
+    Execute a move plan stage by stage, running each stage's operations
+    concurrently under max_workers and journaling every finished step.
+
+    on_progress: optional callback(done, total, failed), called from the
+                 engine thread.
+    '''
+    def __init__(self, max_workers=MAX_WORKERS, retries=5, backoff=1.0, on_progress=None):
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.on_progress = on_progress
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def _call(self, func, *args, idempotent=True):
+        return retry.call_with_retry(func, *args, retries=self.retries, backoff=self.backoff,
+                                     idempotent=idempotent)
+
+    def _apply(self, op):
+        cache = assetCache.get_cache()
+        try:
+            if op['op'] == 'create':
+                self._call(ee.data.createFolder, op['dest'])
+                cache.add_folder(op['dest'], op['parent'])
+            elif op['op'] == 'rename':
+                # 瞬时错误后不盲目重放，交给 _already_applied 确认或留给恢复
+                self._call(ee.data.renameAsset, op['src'], op['dest'], idempotent=False)
+                cache.move(op['src'], op['dest'], op['parent'])
+            elif op['op'] == 'delete':
+                self._call(ee.data.deleteAsset, op['src'])
+                cache.remove(op['src'])
+        except Exception as e:
+            # 恢复时上次可能已执行成功但未记入日志
+            if not self._already_applied(op, e):
+                raise
+
+    def _already_applied(self, op, error):
+        message = str(error).lower()
+        if op['op'] == 'create':
+            return 'already exists' in message
+        if op['op'] == 'delete':
+            return 'not found' in message
+        if 'not found' in message:
+            try:
+                retry.call_with_retry(ee.data.getAsset, op['dest'], retries=self.retries, backoff=self.backoff)
+                return True
+            except Exception:
+                return False
+        return False
+
+    def run(self, moves):
+        '''
+        Plan and run [(src_id, dest_folder, asset_type)] moves.
+        '''
+        journal = MoveJournal.create(plan_moves(moves, self.max_workers))
+        return self.resume(journal)
+
+    @metrics.timed('move')
+    def resume(self, journal):
+        '''
+        Run the unfinished operations of a journal (a MoveJournal or its path).
+        Returns {"total","done","failed","errors","journal"}.
+        '''
+        if isinstance(journal, str):
+            journal = MoveJournal.load(journal)
+        ops = journal.ops
+        result = {'total': len(ops), 'done': len(journal.done), 'failed': 0, 'errors': [], 'journal': journal.path}
+        self._report(result)
+
+        stages = sorted({op['stage'] for op in ops})
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for stage in stages:
+                if self._cancelled.is_set():
+                    break
+                todo = [i for i, op in enumerate(ops) if op['stage'] == stage and i not in journal.done]
+
+                def step(i):
+                    if self._cancelled.is_set():
+                        return False
+                    try:
+                        self._apply(ops[i])
+                    except Exception as e:
+                        journal.mark_failed(i, e)
+                        return e
+                    journal.mark_done(i)
+                    return True
+
+                futures = {pool.submit(step, i): i for i in todo}
+                for future in as_completed(futures):
+                    i, outcome = futures[future], future.result()
+                    if outcome is True:
+                        result['done'] += 1
+                    elif outcome is not False:
+                        result['failed'] += 1
+                        result['errors'].append((ops[i]['src'], str(outcome)))
+                        print(f"❌ 移动失败: {ops[i]['op']} {ops[i]['src']} {outcome}")
+                    self._report(result)
+
+                if result['failed']:
+                    # 后续阶段依赖本阶段，保留日志以便恢复
+                    break
+
+        if result['done'] == result['total']:
+            journal.complete()
+        else:
+            journal.close()
+            print(f"⚠️ 移动未完成，可从日志恢复: {journal.path}")
+        return result
+
+    def _report(self, result):
+        if self.on_progress:
+            self.on_progress(result['done'], result['total'], result['failed'])
@@ -1,89 +1,109 @@
-import ee
-import geemap
 import os
-import pandas as pd
-import json
-import rasterio
-import numpy as np
-from datetime import datetime
-from PySide6.QtCore import Qt, QTimer, QRunnable, Slot, QThreadPool,Signal,QObject
-from PySide6.QtWidgets import QTreeView, QMenu, QMessageBox
+import src.setup as setup
+from src.treeModel import build_tree
+from src.assetOps import AssetManager, default_parent, get_assets
+from src.uploadEngine import UploadEngine
+from PySide6.QtCore import Qt, QTimer, QRunnable, Slot, QThreadPool,Signal,QObject,QModelIndex,QPoint
+from PySide6.QtWidgets import QTreeView, QMenu, QMessageBox, QProgressDialog
 from PySide6.QtGui import QAction
 
-# --------------------------
-# 统一资产操作管理类
-# --------------------------
-class AssetManager:
-    @staticmethod
-    def delete(asset_id):
-        info = ee.data.getAsset(asset_id)
-        asset_type = info.get("type", "")
-        if asset_type.lower() == "folder":
-            children = ee.data.listAssets({"parent": asset_id}).get("assets", [])
-            for child in children:
-                AssetManager.delete(child["name"])
-        ee.data.deleteAsset(asset_id)
-        print(f"✅ 删除资产: {asset_id}")
-
-    @staticmethod
-    def move(src_id, dest_folder, asset_type):
-        if not dest_folder:
-            project = os.environ.get("PROJECT")
-            dest_folder = f"projects/{project}/assets"
-        if '/' not in src_id:
-            project = os.environ.get("PROJECT")
-            src_id = f"projects/{project}/assets/{src_id}"
-
-        print(f'{src_id} move to {dest_folder}')
-
-        if asset_type.lower() == 'folder':
-            folder_name = src_id.split('/')[-1]
-            target_folder = f"{dest_folder}/{folder_name}"
-            ee.data.createFolder(target_folder)
-            children = ee.data.listAssets({'parent': src_id}).get('assets', [])
-            for child in children:
-                AssetManager.move(child['id'], target_folder, child.get('type', ''))
-            ee.data.deleteAsset(src_id)
-        else:
-            name = src_id.split('/')[-1]
-            dest_id = f"{dest_folder}/{name}"
-            ee.data.renameAsset(src_id, dest_id)
-        print(f"✅ 移动完成: {src_id} → {dest_folder}")
 
-# --------------------------
-# 通用线程任务类
-# --------------------------
-class AssetTask(QRunnable):
-    def __init__(self, func, args=(), callback=None):
+class ProgressSignals(QObject):
+    progress = Signal(int, int, int)
+    finished = Signal(object)
+    file = Signal(str, str)
+
+class EngineTask(QRunnable):
+    '''
+    Run an AssetManager / engine method off the GUI thread, reporting
+    (done, total, failed) progress and the final result through signals.
+    '''
+    def __init__(self, engine_cls, method, *args):
         super().__init__()
-        self.func = func
+        self.signaler = ProgressSignals()
+        self.engine = engine_cls(on_progress=self.signaler.progress.emit)
+        self.method = method
         self.args = args
-        self.callback = callback
 
     @Slot()
     def run(self):
         try:
-            self.func(*self.args)
-            if self.callback:
-                self.callback()
+            result = getattr(self.engine, self.method)(*self.args)
         except Exception as e:
             print(f"❌ 任务失败: {e}")
+            result = {'total': 0, 'done': 0, 'failed': 1, 'errors': [('', str(e))]}
+        self.signaler.finished.emit(result)
+
+class UploadTask(EngineTask):
+    '''
+    UploadEngine.run off the GUI thread; per-file states arrive on signaler.file.
+    '''
+    def __init__(self, file_paths, asset_folder):
+        super().__init__(UploadEngine, 'run', file_paths, asset_folder)
+        self.engine.on_file = self.signaler.file.emit
+
+class InitSignals(QObject):
+    finished = Signal(object)
+
+class InitTask(QRunnable):
+    '''
+    Earth Engine initialization off the GUI thread; emits the user/project.
+    '''
+    def __init__(self):
+        super().__init__()
+        self.signaler = InitSignals()
+
+    @Slot()
+    def run(self):
+        self.signaler.finished.emit(setup.initialize_earth_engine())
 
 class AssetLoader(QObject):
     finished = Signal(object)
-    
+    partial = Signal(int)  # 已列完的层级深度
+
 class LoadAssetTask(QRunnable):
-    def __init__(self):
+    def __init__(self, cache=None):
         super().__init__()
         self.signaler = AssetLoader()
+        self.cache = cache
 
     @Slot()
     def run(self):
+        tree = None
         try:
-            assets = get_assets()
-            self.signaler.finished.emit(assets)
+            assets = get_assets(on_level=self._emit_partial, cache=self.cache)
+            # 节点在后台线程建好，界面线程只做替换
+            if assets is not None:
+                tree = build_tree(assets)
         except Exception as e:
             print(f"❌ 加载资产失败: {e}")
+        # 失败时发出 None，界面保留当前资产树
+        self.signaler.finished.emit(tree)
+
+    def _emit_partial(self, depth, tree):
+        # 只通知层级完成，不复制树
+        self.signaler.partial.emit(depth)
+
+class CachedTreeTask(QRunnable):
+    '''
+    Read the cached tree and build its nodes off the GUI thread; emits
+    the build_tree() result, or None when nothing is cached.
+    '''
+    def __init__(self, cache):
+        super().__init__()
+        self.signaler = AssetLoader()
+        self.cache = cache
+
+    @Slot()
+    def run(self):
+        tree = None
+        try:
+            assets = self.cache.load_tree()
+            if assets:
+                tree = build_tree(assets)
+        except Exception as e:
+            print(f"❌ 读取本地缓存失败: {e}")
+        self.signaler.finished.emit(tree)
 
 # --------------------------
 # 树视图组件
@@ -92,69 +112,161 @@ class MyTreeView(QTreeView):
     def __init__(self, parent=None):
         super().__init__(parent)
         self._dragged_ids = []
-
-    def removeItemById(self, asset_id):
+        self._tasks = []  # 运行中的 EngineTask，保持信号对象存活
+        self.setUniformRowHeights(True)  # 行高一致，展开大文件夹时不逐行测量
+        self.expanded.connect(self._fetch_visible_pages)
+
+    def setModel(self, model):
+        super().setModel(model)
+        # 新的一页插入后，若末尾仍在视口内则继续取下一页
+        model.rowsInserted.connect(lambda *args: QTimer.singleShot(0, self._fetch_visible_pages))
+
+    def verticalScrollbarValueChanged(self, value):
+        super().verticalScrollbarValueChanged(value)
+        self._fetch_visible_pages()
+
+    def _fetch_visible_pages(self, *args):
+        '''
+        Only the visible rows are materialized: ImageCollection members are
+        requested page by page as the last loaded one becomes visible.
+        '''
         model = self.model()
+        index = self.indexAt(QPoint(0, 0))
+        height = self.viewport().height()
+        while index.isValid() and self.visualRect(index).top() < height:
+            parent = index.parent()
+            if index.row() == model.rowCount(parent) - 1:
+                model.fetchNextPage(parent)
+            index = self.indexBelow(index)
 
-        def recurse_remove(parent):
-            for row in range(parent.rowCount()):
-                child = parent.child(row)
-                if not child:
-                    continue
-                data = child.data(Qt.UserRole)
-                if data and data.get('id') == asset_id:
-                    parent.removeRow(row)
-                    print(f"🔄 从视图中移除: {asset_id}")
-                    return True
-                if recurse_remove(child):
-                    return True
-            return False
-
-        recurse_remove(model.invisibleRootItem())
-
-    def contextMenuEvent(self, event):
-        def confirm_and_delete(asset_ids):
-            reply = QMessageBox.question(
-                self,
-                "确认删除",
-                "确定要删除以下资产？\n" + "\n".join(asset_ids),
-                QMessageBox.Yes | QMessageBox.No
-            )
-            if reply == QMessageBox.Yes:
-                pool = QThreadPool.globalInstance()
-                for aid in asset_ids:
-                    task = AssetTask(
-                        AssetManager.delete,
-                        args=(aid,),
-                        callback=lambda aid=aid: self.removeItemById(aid)
-                    )
-                    pool.start(task)
+    def removeItemById(self, asset_id):
+        self.model().removeById(asset_id)
 
+    def selectedAssets(self):
+        '''
+        Qt.UserRole asset dicts of the selected rows.
+        '''
         selected_indexes = [i for i in self.selectionModel().selectedIndexes() if i.column() == 0]
-        asset_ids = []
+        assets = []
         for index in selected_indexes:
-            item = self.model().itemFromIndex(index)
-            asset_info = item.data(Qt.UserRole)
+            asset_info = index.data(Qt.UserRole)
             if asset_info and 'id' in asset_info:
-                asset_ids.append(asset_info['id'])
+                assets.append(asset_info)
+        return assets
 
-        if not asset_ids:
+    def contextMenuEvent(self, event):
+        assets = self.selectedAssets()
+        if not assets:
             return
 
         menu = QMenu(self)
         action_delete = QAction("删除", self)
-        action_delete.triggered.connect(lambda: confirm_and_delete(asset_ids))
+        action_delete.triggered.connect(lambda: self.confirm_and_delete(assets))
         menu.addAction(action_delete)
         menu.exec(event.globalPos())
 
+    def confirm_and_delete(self, assets):
+        reply = QMessageBox.question(
+            self,
+            "确认删除",
+            "确定要删除以下资产？\n" + "\n".join(a['id'] for a in assets),
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply != QMessageBox.Yes:
+            return
+
+        def on_finished(result):
+            # 祖先先移除，后代随之消失
+            # 任务异常时结果里没有 deleted
+            for asset_id in sorted(result.get('deleted', []), key=len):
+                self.removeItemById(asset_id)
+
+        self.runWithProgress(EngineTask(AssetManager, 'delete_assets', assets), "删除中", "已删除", on_finished)
+
+    def runMoveJournal(self, path):
+        '''
+        Resume an interrupted move from its journal.
+        '''
+        self.runWithProgress(EngineTask(AssetManager, 'resume_move', path), "恢复移动", "已完成")
+
+    def runWithProgress(self, task, title, verb, on_finished=None):
+        '''
+        Start an EngineTask behind a cancellable progress dialog.
+        '''
+        dialog = QProgressDialog("准备中.....", "取消", 0, 0, self)
+        dialog.setWindowTitle(title)
+        dialog.setWindowModality(Qt.WindowModal)
+        dialog.setAutoClose(False)
+        dialog.setAutoReset(False)
+        dialog.canceled.connect(task.engine.cancel)
+        dialog.show()
+        counts = [0, 0, 0]
+        running = {}  # 正在处理的文件，按开始顺序
+
+        def refresh():
+            done, total, failed = counts
+            text = f"{verb} {done}/{total}，失败 {failed}"
+            if running:
+                names = [os.path.basename(label) for label in running]
+                more = f" 等 {len(names)} 个" if len(names) > 3 else ""
+                text += "\n处理中: " + ", ".join(names[:3]) + more
+            dialog.setLabelText(text)
+
+        def on_progress(done, total, failed):
+            counts[:] = [done, total, failed]
+            dialog.setMaximum(total)
+            dialog.setValue(done + failed)
+            refresh()
+
+        def on_file(label, state):
+            if state == 'running':
+                running[label] = True
+            else:
+                running.pop(label, None)
+            refresh()
+
+        def on_done(result):
+            dialog.close()
+            self._tasks.remove(task)
+            if on_finished:
+                on_finished(result)
+            if result['failed']:
+                details = "\n".join(f"{aid}: {msg}" for aid, msg in result['errors'][:20])
+                if result.get('journal'):
+                    details += f"\n\n日志: {result['journal']}（重启后可恢复）"
+                QMessageBox.warning(self, f"{title}未完成", f"{result['failed']} 项失败\n{details}")
+
+        task.signaler.progress.connect(on_progress)
+        task.signaler.file.connect(on_file)
+        task.signaler.finished.connect(on_done)
+        self._tasks.append(task)
+        QThreadPool.globalInstance().start(task)
+
+    def expandedIds(self):
+        '''
+        Ids of the expanded rows, parents before children.
+        '''
+        model = self.model()
+        ids = []
+
+        def recurse(parent):
+            for row in range(model.rowCount(parent)):
+                index = model.index(row, 0, parent)
+                if self.isExpanded(index):
+                    ids.append(index.data(Qt.UserRole)['id'])
+                    recurse(index)
+        recurse(QModelIndex())
+        return ids
+
+    def expandIds(self, ids):
+        model = self.model()
+        for asset_id in ids:
+            node = model.findNode(asset_id)
+            if node:
+                self.expand(model.indexFromNode(node))
+
     def startDrag(self, supportedActions):
-        self._dragged_ids.clear()
-        selected_indexes = [i for i in self.selectionModel().selectedIndexes() if i.column() == 0]
-        for index in selected_indexes:
-            item = self.model().itemFromIndex(index)
-            asset_info = item.data(Qt.UserRole)
-            if asset_info and 'id' in asset_info:
-                self._dragged_ids.append(asset_info['id'])
+        self._dragged_ids = [asset['id'] for asset in self.selectedAssets()]
         super().startDrag(supportedActions)
 
     def dropEvent(self, event):
@@ -163,193 +275,29 @@ class MyTreeView(QTreeView):
 
     def _processMovedItems(self):
         model = self.model()
-        pool = QThreadPool.globalInstance()
-
-        def findItemById(asset_id):
-            def recurse(parent):
-                for row in range(parent.rowCount()):
-                    child = parent.child(row)
-                    data = child.data(Qt.UserRole)
-                    if data and data.get('id') == asset_id:
-                        return child
-                    result = recurse(child)
-                    if result:
-                        return result
-                return None
-            return recurse(model.invisibleRootItem())
+        moves = []
 
         for moved_id in self._dragged_ids:
-            item = findItemById(moved_id)
-            if not item:
+            node = model.findNode(moved_id)
+            if not node:
                 print(f"未找到 ID: {moved_id}")
                 continue
-            parent_item = item.parent()
-            new_parent_id = parent_item.data(Qt.UserRole).get('id', '') if parent_item else ''
-            asset_info = item.data(Qt.UserRole)
-            asset_type = asset_info.get('type', '')
-            task = AssetTask(AssetManager.move, (moved_id, new_parent_id, asset_type))
-            pool.start(task)
-            updateItemIdRecursive(item, new_parent_id)
+            new_parent_id = default_parent(node.parent.id)
+            if default_parent(moved_id.rsplit('/', 1)[0]) == new_parent_id:
+                continue  # 未跨文件夹移动
+            moves.append((moved_id, new_parent_id, node.type))
+            model.updateItemIdRecursive(node, new_parent_id)
         self._dragged_ids.clear()
 
-# --------------------------
-# 递归更新 asset ID
-# --------------------------
-def updateItemIdRecursive(item, new_parent_id):
-    if not new_parent_id:
-        project = os.environ.get("PROJECT")
-        new_parent_id = f"projects/{project}/assets"
-        print(f"⚠️ 使用默认路径: {new_parent_id}")
-
-    asset_info = item.data(Qt.UserRole)
-    if not asset_info:
-        return
-    name = asset_info['id'].split('/')[-1]
-    new_id = f"{new_parent_id}/{name}"
-    asset_info['id'] = new_id
-    item.setData(asset_info, Qt.UserRole)
-    for row in range(item.rowCount()):
-        child = item.child(row)
-        updateItemIdRecursive(child, new_id)
-
-# --------------------------
-# 获取 GEE 资产树
-# --------------------------
-def get_assets():
-    def fetch_children(parent_id):
-        try:
-            children = ee.data.listAssets({'parent': parent_id}).get('assets', [])
-            results = []
-            for child in children:
-                node = {
-                    "id": child['id'],
-                    "type": child.get('type', ''),
-                    "children": []
-                }
-                if child.get('type', '') == 'Folder':
-                    node["children"] = fetch_children(child['id'])
-                results.append(node)
-            return results
-        except Exception as e:
-            print(f"❌ 获取子资产失败: {e}")
-            return []
-
-    try:
-        roots = ee.data.getAssetRoots()
-        tree = []
-        for root in roots:
-            node = {
-                "id": root['id'],
-                "type": root.get('type', ''),
-                "children": fetch_children(root['id'])
-            }
-            tree.append(node)
-        return tree
-    except Exception as e:
-        print(f"❌ 获取资产根目录失败: {e}")
-        return []
-    
-# 上传文件到asset
-def upload_to_asset(file_paths,asset_folder):
-
-    tifs = []
-    for i, file_path in enumerate(file_paths[0]):
-        file_name = os.path.basename(file_path)
-        name_no_ext = os.path.splitext(file_name)[0]
-        ext = os.path.splitext(file_path)[1].lower()
-        asset_id = f"{asset_folder}/{name_no_ext}"
-
-        print(f"开始上传: {file_path} → {asset_id}")
-
-        try:
-            if ext == ".geojson":
-                _upload_geojson(file_path=file_path, name_no_ext=name_no_ext,asset_id=asset_id)
-
-            elif ext in ".shp":
-                _upload_shp(file_path=file_path, file_name=file_name,asset_id=asset_id)
-            elif ext in ".csv":
-                _upload_csv(file_path=file_path, file_name=file_name,asset_id=asset_id)
-            elif ext in ".tif":
-                tifs.append(file_path)
-
-            print(f"✅ 上传任务已启动: {file_name}")
-    
-        except Exception as e:
-            print(f"❌ 上传失败: {file_path} 错误: {e}")
-
-    if tifs:
-        _merge_tifs(tifs)
-
-
-def _upload_geojson(file_path,name_no_ext,asset_id):
-    '''
-    upload geojson file to GEE
-    '''
-    with open(file_path, 'r', encoding='utf-8') as f:
-            geojson_data = json.load(f)
-    fc = ee.FeatureCollection([
-        ee.Feature(
-            ee.Geometry(feature['geometry']),
-            {**feature['properties'], 'system:index': str(i)}
-        )
-        for i, feature in enumerate(geojson_data['features'])
-    ])
-    task = ee.batch.Export.table.toAsset(
-        collection=fc,
-        description=f'{name_no_ext}',
-        assetId=asset_id
-    )
-    task.start()
-
-def _upload_shp(file_path,file_name,asset_id):
-    '''
-    upload shp file to GEE
-    '''
-    fc = geemap.shp_to_ee(file_path)
-    geemap.ee_export_vector_to_asset(fc,description=file_name,assetId=asset_id)
-
-def _upload_csv(file_path,file_name,asset_id):
-    '''
-    upload csv file to GEE
-    '''
-    df = pd.read_csv(file_path)
-    if not {'longitude', 'latitude'}.issubset(df.columns):
-        print(f"❌ CSV 文件中必须包含 'longitude' 和 'latitude' 字段: {file_path}")
-        return
-    fc = geemap.df_to_ee(df)
-    geemap.ee_export_vector_to_asset(fc,description=file_name,assetId=asset_id)
-
-
-def _merge_tifs(tifs):
-    '''
-    Merge multiple TIF files into a single multi-band GeoTIFF,
-    and write band descriptions as GEE-compatible metadata.
-    '''
-    arrays = []
-    profile = None
-    for i, path in enumerate(tifs):
-        with rasterio.open(path) as src:
-            if i == 0:
-                profile = src.profile
-                height, width = src.height, src.width
-            elif src.height != height or src.width != width:
-                raise ValueError(f"{path} 的尺寸不一致")
-            
-            data = src.read()  # shape: (bands, height, width)
-            arrays.append(data)
-
-
-    # (total_bands, height, width)
-    merged = np.concatenate(arrays, axis=0)
-    profile.update(count=merged.shape[0])
-
-    output_dir = './output/tifs'
-    os.makedirs(output_dir, exist_ok=True)
-
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_path = os.path.join(output_dir, f"{timestamp}.tif")
-
-    with rasterio.open(output_path, 'w', **profile) as dst:
-        dst.write(merged)
-
-    print(f"✅ 合成完成，输出文件: {output_path}")
\ No newline at end of file
+        def on_finished(result):
+            if not result['failed']:
+                return
+            # id 已按成功改写，有失败时重新列出源和目标文件夹
+            root = default_parent('')
+            folders = {default_parent(src_id.rsplit('/', 1)[0]) for src_id, _, _ in moves}
+            folders.update(parent_id for _, parent_id, _ in moves)
+            for folder in sorted(folders, key=len):
+                self.model().reloadChildren('' if folder == root else folder)
+
+        if moves:
+            self.runWithProgress(EngineTask(AssetManager, 'move_assets', moves), "移动中", "已完成", on_finished)
@@ -0,0 +1,175 @@
+import os
+import threading
+import rasterio
+import rasterio.shutil
+import numpy as np
+from rasterio.windows import Window
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import src.metrics as metrics
+
+# --------------------------
+# 分块流式合并 TIF
+# --------------------------
+BLOCK_SIZE = 1024
+# GDAL 块缓存上限 (MB)，默认是物理内存的 5%
+GDAL_CACHE_MB = 64
+
+# --------------------------
+# 上传用输出格式
+# --------------------------
+TILE_SIZE = 512
+COMPRESSIONS = ('DEFLATE', 'ZSTD', 'LZW')
+OVERVIEW_RESAMPLING = 'nearest'
+_LEVEL_OPTION = {'DEFLATE': 'zlevel', 'ZSTD': 'zstd_level'}
+
+
+def creation_options(dtype, compress='DEFLATE', level=None, tile_size=TILE_SIZE):
+    '''
+    GeoTIFF creation options for a compact upload: tiled, compressed with
+    a predictor matching dtype, and compressed on all CPUs.
+    '''
+    compress = compress.upper()
+    if compress not in COMPRESSIONS:
+        raise ValueError(f"不支持的压缩方式: {compress}")
+    dtype = np.dtype(dtype)
+    options = {
+        'tiled': True,
+        'blockxsize': tile_size,
+        'blockysize': tile_size,
+        'compress': compress,
+        # 每个分块只含一个波段，分波段写入时不会反复重压缩同一块
+        'interleave': 'band',
+        'num_threads': 'ALL_CPUS',
+    }
+    # 整数用水平差分，浮点用浮点预测，复数不支持预测
+    if dtype.kind in 'iu':
+        options['predictor'] = 2
+    elif dtype.kind == 'f':
+        options['predictor'] = 3
+    if level is not None and compress in _LEVEL_OPTION:
+        options[_LEVEL_OPTION[compress]] = level
+    return options
+
+
+def block_windows(height, width, block_size=BLOCK_SIZE, align=1):
+    '''
+    Cover a height x width raster with windows of at most about
+    block_size^2 pixels. Full-width strips are used while they fit, as
+    they match how striped GeoTIFFs are laid out, so every input strip is
+    decoded once; a raster too wide for that is cut into columns as well.
+    align keeps window heights and column widths a multiple of the output
+    tile size so no tile is written twice; the smallest window is one
+    align x align tile.
+    '''
+    budget = block_size * block_size
+    rows = max(1, min(height, budget // width))
+    rows = max(align, rows // align * align)
+    cols = width
+    if rows * width > budget:
+        # 条带超出预算（宽幅影像），再按列切成对齐分块的窗口
+        cols = max(align, budget // rows // align * align)
+    for row in range(0, height, rows):
+        for col in range(0, width, cols):
+            yield Window(col, row, min(cols, width - col), min(rows, height - row))
+
+
+@metrics.timed('merge')
+def merge_tifs(tifs, output_path, block_size=BLOCK_SIZE, max_workers=None,
+               compress=None, level=None, cog=False):
+    '''
+    Stack the bands of every input into one multi-band GeoTIFF, streaming
+    block windows instead of loading whole rasters.
+
+    compress: None keeps the first input's layout; 'DEFLATE'/'ZSTD'/'LZW'
+              write a tiled, compressed file (see creation_options).
+    cog:      write a Cloud-Optimized GeoTIFF with overviews (implies
+              DEFLATE when compress is None).
+
+    Blocks are read on max_workers threads (GDAL releases the GIL while
+    decoding) and written by a single writer; at most 2 * max_workers blocks
+    are in flight, so peak memory is about
+    2 * max_workers * block_size^2 * total_bands * itemsize plus the
+    GDAL_CACHE_MB block cache.
+    '''
+    max_workers = max_workers or os.cpu_count() or 4
+    band_counts, dtypes = [], []
+    for i, path in enumerate(tifs):
+        with rasterio.open(path) as src:
+            if i == 0:
+                profile = src.profile.copy()
+                height, width = src.height, src.width
+            elif src.height != height or src.width != width:
+                raise ValueError(f"{path} 的尺寸不一致")
+            band_counts.append(src.count)
+            dtypes.append(src.dtypes[0])
+
+    # 与 np.concatenate 相同的类型提升
+    dtype = np.result_type(*dtypes)
+    profile.update(count=sum(band_counts), dtype=dtype.name)
+    if cog and not compress:
+        compress = 'DEFLATE'
+    options = creation_options(dtype, compress, level) if compress else {}
+    if cog:
+        # 中间文件只分块不压缩，压缩在复制为 COG 时只做一次
+        profile.update({k: options[k] for k in ('tiled', 'blockxsize', 'blockysize', 'interleave')})
+        profile.pop('compress', None)
+        profile.pop('predictor', None)
+    else:
+        profile.update(options)
+    offsets = np.cumsum([1] + band_counts[:-1])
+
+    # rasterio 数据集不能跨线程共享，每个读线程各自打开
+    local = threading.local()
+    opened = []
+    opened_lock = threading.Lock()
+
+    def read_block(window):
+        if not hasattr(local, 'sources'):
+            local.sources = [rasterio.open(path) for path in tifs]
+            with opened_lock:
+                opened.extend(local.sources)
+        return window, [src.read(window=window).astype(dtype, copy=False) for src in local.sources]
+
+    # COG 只能整体复制生成：先写分块中间文件，再复制并生成概览
+    write_path = output_path + '.tmp.tif' if cog else output_path
+    try:
+        with rasterio.Env(GDAL_CACHEMAX=GDAL_CACHE_MB), \
+                rasterio.open(write_path, 'w', **profile) as dst, \
+                ThreadPoolExecutor(max_workers=max_workers) as pool:
+            windows = block_windows(height, width, block_size, align=options.get('blockysize', 1))
+            in_flight = set()
+            while True:
+                for window in windows:
+                    in_flight.add(pool.submit(read_block, window))
+                    if len(in_flight) >= 2 * max_workers:
+                        break
+                if not in_flight:
+                    break
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    window, blocks = future.result()
+                    for offset, block in zip(offsets, blocks):
+                        indexes = list(range(offset, offset + block.shape[0]))
+                        dst.write(block, indexes=indexes, window=window)
+        if cog:
+            cog_options = {k: v for k, v in options.items() if k not in ('tiled', 'blockxsize', 'blockysize', 'interleave')}
+            with rasterio.Env(GDAL_CACHEMAX=GDAL_CACHE_MB):
+                rasterio.shutil.copy(write_path, output_path, driver='COG', blocksize=options['blockxsize'],
+                                     overview_resampling=OVERVIEW_RESAMPLING, **cog_options)
+    finally:
+        for src in opened:
+            src.close()
+        if cog and os.path.exists(write_path):
+            os.remove(write_path)
+    return output_path
+
+
+def size_report(path):
+    '''
+    {"size","raw_size","ratio"}: bytes on disk, uncompressed full-resolution
+    pixel bytes, and raw_size / size.
+    '''
+    with rasterio.open(path) as src:
+        raw_size = src.width * src.height * src.count * np.dtype(src.dtypes[0]).itemsize
+    size = os.path.getsize(path)
+    return {'size': size, 'raw_size': raw_size, 'ratio': raw_size / size if size else 0.0}
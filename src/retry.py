@@ -0,0 +1,179 @@
+import random
+import threading
+import time
+import src.metrics as metrics
+
+# --------------------------
+# 配额 / 限流错误重试
+# --------------------------
+QUOTA_MARKERS = ('429', 'resource_exhausted', 'too many requests', 'quota', 'rate limit')
+TRANSIENT_MARKERS = ('internal error', 'backend error', 'service unavailable', 'deadline exceeded',
+                     'timed out', 'connection reset', 'connection aborted', 'temporarily unavailable',
+                     'httperror 50')
+
+# --------------------------
+# 统一的 ee.data 调用入口
+# --------------------------
+RATE = 100.0  # 每秒请求数，0 表示不限
+BURST = 20
+START_CONCURRENCY = 8
+MIN_CONCURRENCY = 1
+MAX_CONCURRENCY = 40
+DECREASE = 0.5  # 配额错误时并发上限的乘数
+SMOOTHING = 0.2  # 请求耗时的指数平均系数；一个平均耗时内的多个 429 只下调一次
+
+
+def is_quota_error(error):
+    '''
+    True for Earth Engine quota / 429 errors that are worth retrying.
+    '''
+    message = str(error).lower()
+    return any(marker in message for marker in QUOTA_MARKERS)
+
+
+def is_transient_error(error):
+    '''
+    True for 5xx / timeout / connection errors; the request may or may not
+    have been executed.
+    '''
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in TRANSIENT_MARKERS)
+
+
+def _call_name(func):
+    return getattr(func, '__name__', None) or type(func).__name__
+
+
+class Gateway:
+    '''
+    Client-side limiter shared by every Earth Engine request.
+
+    A token bucket caps the request rate and an AIMD limit caps how many
+    requests are in flight: the limit grows by about one per window of
+    successful calls and is halved on a quota error, at most once per
+    average call duration so one burst of 429s counts once. Failed calls
+    are retried with full-jitter exponential backoff outside their slot:
+    quota errors always (the request was rejected), transient errors only
+    for idempotent calls.
+    '''
+    def __init__(self, rate=RATE, burst=BURST, concurrency=START_CONCURRENCY,
+                 min_concurrency=MIN_CONCURRENCY, max_concurrency=MAX_CONCURRENCY):
+        self.rate = rate
+        self.burst = burst
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.limit = float(max(min_concurrency, min(concurrency, max_concurrency)))
+        self.in_flight = 0
+        self.calls = 0
+        self.retries = 0
+        self.quota_errors = 0
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+        self._last_decrease = 0.0
+        self.latency = 0.0  # 平均请求耗时
+        self._cond = threading.Condition()
+        self._bucket_lock = threading.Lock()
+
+    # ---- 令牌桶 ----
+    def _take_token(self):
+        if not self.rate:
+            return
+        while True:
+            with self._bucket_lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+                self._refilled = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+    # ---- 并发上限 ----
+    def _acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+        self._take_token()
+
+    def _release(self, started, quota_error=False):
+        with self._cond:
+            now = time.monotonic()
+            self.latency += SMOOTHING * (now - started - self.latency)
+            self.in_flight -= 1
+            self.calls += 1
+            if quota_error:
+                self.quota_errors += 1
+                if now - self._last_decrease >= self.latency:
+                    self._last_decrease = now
+                    self.limit = max(self.min_concurrency, self.limit * DECREASE)
+            else:
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            self._cond.notify(max(0, int(self.limit) - self.in_flight))
+
+    def call(self, func, *args, idempotent=True, retries=5, backoff=1.0, **kwargs):
+        '''
+        Run func(*args, **kwargs) under the limits, retrying as described above.
+        Every attempt is recorded in the shared Metrics under func's name.
+        '''
+        recorder = metrics.get_metrics()
+        for attempt in range(retries + 1):
+            self._acquire()
+            started = time.monotonic()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                quota = is_quota_error(e)
+                self._release(started, quota_error=quota)
+                if recorder.enabled:
+                    recorder.record_call(_call_name(func), time.monotonic() - started, e)
+                retryable = quota or (idempotent and is_transient_error(e))
+                if attempt == retries or not retryable:
+                    raise
+                with self._cond:
+                    self.retries += 1
+                time.sleep(random.uniform(0, backoff * (2 ** attempt)))
+            else:
+                self._release(started)
+                if recorder.enabled:
+                    recorder.record_call(_call_name(func), time.monotonic() - started)
+                return result
+
+    def stats(self):
+        with self._cond:
+            return {'calls': self.calls, 'retries': self.retries, 'quota_errors': self.quota_errors,
+                    'in_flight': self.in_flight, 'limit': self.limit, 'latency': self.latency}
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+def get_gateway():
+    '''
+    The process-wide Gateway, created on first use.
+    '''
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = Gateway()
+        return _gateway
+
+
+def configure(**kwargs):
+    '''
+    Replace the shared Gateway, e.g. configure(rate=0) for no rate cap.
+    '''
+    global _gateway
+    with _gateway_lock:
+        _gateway = Gateway(**kwargs)
+        return _gateway
+
+
+def call_with_retry(func, *args, retries=5, backoff=1.0, idempotent=True, **kwargs):
+    '''
+    Call func through the shared Gateway.
+    '''
+    return get_gateway().call(func, *args, idempotent=idempotent, retries=retries, backoff=backoff, **kwargs)
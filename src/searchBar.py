@@ -0,0 +1,97 @@
+from PySide6.QtCore import Signal, Slot
+from PySide6.QtWidgets import QWidget, QHBoxLayout, QLineEdit, QComboBox
+from src.assetIndex import MAX_RESULTS, SEARCH_TYPES
+
+# --------------------------
+# 资产搜索栏
+# --------------------------
+MAX_EXPAND = 100  # 最多为前 N 个结果展开祖先文件夹
+
+
+class SearchBar(QWidget):
+    '''
+    Search box and type filter over the model's AssetIndex. Every keystroke
+    highlights the matches, expands the folders above the first MAX_EXPAND
+    of them and jumps to the first; Enter jumps to the next match.
+    A leading "^" matches name prefixes only.
+    '''
+    message = Signal(str)
+
+    def __init__(self, view, model, parent=None):
+        super().__init__(parent)
+        self.view = view
+        self.model = model
+        self.results = []
+        self._current = 0
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(4)
+        self.edit = QLineEdit(self)
+        self.edit.setPlaceholderText("搜索名称，^ 开头按前缀")
+        self.edit.setClearButtonEnabled(True)
+        self.type_box = QComboBox(self)
+        self.type_box.addItem("全部", None)
+        for asset_type in SEARCH_TYPES:
+            self.type_box.addItem(asset_type, asset_type)
+        layout.addWidget(self.edit, 1)
+        layout.addWidget(self.type_box)
+
+        self.edit.textChanged.connect(self.search)
+        self.edit.returnPressed.connect(self.next_match)
+        self.type_box.currentIndexChanged.connect(self.search)
+
+    @Slot()
+    def search(self):
+        text = self.edit.text().strip()
+        asset_type = self.type_box.currentData()
+        if not text and asset_type is None:
+            self.results = []
+            self.model.setHighlighted([])
+            self.view.viewport().update()
+            self.message.emit("")
+            return
+
+        prefix = text.startswith('^')
+        self.results = self.model.search_index.search(text.lstrip('^'), asset_type, prefix=prefix)
+        self.model.setHighlighted(self.results)
+        self._expand_ancestors(self.results[:MAX_EXPAND])
+        self._current = 0
+        self._show_current()
+        self.view.viewport().update()
+        more = "+" if len(self.results) >= MAX_RESULTS else ""
+        self.message.emit(f"🔍 {len(self.results)}{more} 个匹配")
+
+    @Slot()
+    def next_match(self):
+        if self.results:
+            self._current = (self._current + 1) % len(self.results)
+            self._show_current()
+
+    def _expand_ancestors(self, ids):
+        folders = []
+        seen = set()
+        for asset_id in ids:
+            node = self.model.findNode(asset_id)
+            chain = []
+            parent = node.parent if node else None
+            while parent is not None and parent.parent is not None and parent.id not in seen:
+                seen.add(parent.id)
+                chain.append(parent)
+                parent = parent.parent
+            folders.extend(reversed(chain))
+        # 祖先在前，逐级展开
+        for folder in folders:
+            index = self.model.indexFromNode(folder)
+            if not self.view.isExpanded(index):
+                self.view.expand(index)
+
+    def _show_current(self):
+        if not self.results:
+            return
+        node = self.model.findNode(self.results[self._current])
+        if node is None:
+            return
+        index = self.model.indexFromNode(node)
+        self.view.setCurrentIndex(index)
+        self.view.scrollTo(index)
@@ -1,5 +1,4 @@
 import ee
-import geemap
 import os
 
 def initialize_earth_engine():
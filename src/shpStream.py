@@ -0,0 +1,186 @@
+import datetime
+import os
+import numpy as np
+import shapefile
+import src.tableUpload as tableUpload
+from src.geojsonStream import feature_size
+
+# --------------------------
+# 流式读取 Shapefile 并压缩坐标
+# --------------------------
+PRECISION = None  # 保留的小数位（6 位约 0.1 米）；None 表示不取整
+TOLERANCE = None  # 简化容差（度）；None 表示不简化
+MIN_RING = 4  # 闭合环至少 4 个点
+
+
+def is_geographic(path):
+    '''
+    True when the shapefile has no .prj or a geographic one (lon / lat).
+    '''
+    prj = os.path.splitext(path)[0] + '.prj'
+    if not os.path.exists(prj):
+        return True
+    with open(prj, 'r', encoding='utf-8', errors='ignore') as f:
+        return f.read().lstrip().upper().startswith(('GEOGCS', 'GEOGCRS'))
+
+
+def simplify(coords, tolerance):
+    '''
+    Douglas-Peucker on an (n, 2) array, one NumPy pass per level: every
+    point is measured against the segment between the kept points around
+    it, and each segment whose farthest point is beyond tolerance is split
+    there, all segments at once. The end points are always kept.
+    '''
+    n = len(coords)
+    if n < 3:
+        return coords
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    positions = np.arange(n)
+    while True:
+        kept = np.flatnonzero(keep)
+        segment = np.searchsorted(kept, positions, side='right') - 1
+        segment[-1] = len(kept) - 2
+        start, end = kept[segment], kept[segment + 1]
+        direction = coords[end] - coords[start]
+        offsets = coords - coords[start]
+        length = np.hypot(direction[:, 0], direction[:, 1])
+        cross = np.abs(direction[:, 0] * offsets[:, 1] - direction[:, 1] * offsets[:, 0])
+        # 闭合环首尾重合时按到该点的距离
+        distances = np.where(length > 0, cross / np.where(length > 0, length, 1),
+                             np.hypot(offsets[:, 0], offsets[:, 1]))
+        distances[keep] = -1
+        farthest = np.maximum.reduceat(distances, kept[:-1])
+        split = farthest > tolerance
+        if not split.any():
+            return coords[keep]
+        # 每段取第一个达到最大距离的点
+        candidates = np.flatnonzero((distances == farthest[segment]) & split[segment])
+        first = candidates[np.unique(segment[candidates], return_index=True)[1]]
+        keep[first] = True
+
+
+def quantize(coords, precision):
+    '''
+    Round to precision decimals and drop the consecutive duplicates that
+    rounding creates.
+    '''
+    rounded = np.round(coords, precision)
+    if len(rounded) < 2:
+        return rounded
+    changed = np.any(rounded[1:] != rounded[:-1], axis=1)
+    return rounded[np.concatenate(([True], changed))]
+
+
+def reduce_coords(coords, precision=PRECISION, tolerance=TOLERANCE, ring=False):
+    '''
+    Simplify then quantize one coordinate sequence; a ring that would fall
+    below MIN_RING points keeps its original vertices.
+    '''
+    array = np.asarray(coords, dtype='float64')
+    if array.ndim != 2 or len(array) < 2:
+        return coords
+    reduced = array
+    if tolerance:
+        reduced = simplify(reduced, tolerance)
+    if precision is not None:
+        reduced = quantize(reduced, precision)
+    if (ring and len(reduced) < MIN_RING) or len(reduced) < 2:
+        reduced = array
+    return reduced.tolist()
+
+
+def reduce_geometry(geometry, precision=PRECISION, tolerance=TOLERANCE):
+    '''
+    GeoJSON geometry dict with every line and ring reduced; points are only
+    rounded. Returned unchanged when there is nothing to round or simplify.
+    '''
+    if not geometry or (precision is None and not tolerance):
+        return geometry
+    kind = geometry['type']
+    coords = geometry['coordinates']
+    if kind == 'Point':
+        reduced = coords if precision is None else [round(c, precision) for c in coords]
+    elif kind == 'MultiPoint':
+        reduced = reduce_coords(coords, precision, None)
+    elif kind == 'LineString':
+        reduced = reduce_coords(coords, precision, tolerance)
+    elif kind == 'MultiLineString':
+        reduced = [reduce_coords(line, precision, tolerance) for line in coords]
+    elif kind == 'Polygon':
+        reduced = [reduce_coords(ring, precision, tolerance, ring=True) for ring in coords]
+    elif kind == 'MultiPolygon':
+        reduced = [[reduce_coords(ring, precision, tolerance, ring=True) for ring in polygon] for polygon in coords]
+    else:
+        return geometry
+    return {'type': kind, 'coordinates': reduced}
+
+
+def _json_value(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return value.decode('utf-8', errors='replace') or None
+    return value
+
+
+def iter_features(path, precision=PRECISION, tolerance=TOLERANCE, stats=None, encoding='utf-8'):
+    '''
+    Yield (GeoJSON feature, bytes) one record at a time, geometries reduced.
+
+    stats: optional dict, filled with "features", "bytes_before",
+           "bytes_after", "vertices_before" and "vertices_after".
+    '''
+    stats = stats if stats is not None else {}
+    for key in ('features', 'bytes_before', 'bytes_after', 'vertices_before', 'vertices_after'):
+        stats.setdefault(key, 0)
+    with shapefile.Reader(path, encoding=encoding) as reader:
+        for shape_record in reader.iterShapeRecords():
+            shape = shape_record.shape
+            geometry = shape.__geo_interface__ if shape.shapeType != shapefile.NULL else None
+            properties = {k: _json_value(v) for k, v in shape_record.record.as_dict().items()}
+            reduced = reduce_geometry(geometry, precision, tolerance)
+            feature = {'type': 'Feature', 'geometry': reduced, 'properties': properties}
+            size = feature_size(feature)
+            stats['features'] += 1
+            # 几何未变时不再序列化原要素
+            stats['bytes_before'] += size if reduced is geometry else feature_size(
+                {'type': 'Feature', 'geometry': geometry, 'properties': properties})
+            stats['bytes_after'] += size
+            stats['vertices_before'] += len(shape.points)
+            stats['vertices_after'] += _vertices(feature['geometry'])
+            yield feature, size
+
+
+def _vertices(geometry):
+    if not geometry:
+        return 0
+    depth = {'Point': 0, 'MultiPoint': 1, 'LineString': 1, 'MultiLineString': 2,
+             'Polygon': 2, 'MultiPolygon': 3}.get(geometry['type'])
+    items = [geometry['coordinates']]
+    for _ in range(depth or 0):
+        items = [c for item in items for c in item]
+    return len(items) if depth is not None else 0
+
+
+def upload_shapefile(file_path, asset_id, description, precision=PRECISION, tolerance=TOLERANCE,
+                     max_bytes=tableUpload.MAX_BATCH_BYTES, max_features=tableUpload.MAX_BATCH_FEATURES,
+                     merge=False):
+    '''
+    Stream a lon / lat shapefile into payload-bounded table exports and
+    print the payload before and after reduction; returns
+    [(asset_id, task)] like tableUpload.export_batches.
+    '''
+    stats = {}
+    features = iter_features(file_path, precision=precision, tolerance=tolerance, stats=stats)
+    batches = tableUpload.batched(features, max_bytes=max_bytes, max_features=max_features)
+    parts = tableUpload.export_batches(batches, asset_id, description, merge=merge)
+    print(payload_report(description, stats))
+    return parts
+
+
+def payload_report(name, stats):
+    before, after = stats['bytes_before'], stats['bytes_after']
+    ratio = after / before if before else 1.0
+    return (f"📦 {name}: {stats['features']} 个要素，载荷 {before / 2 ** 20:.1f} MB → {after / 2 ** 20:.1f} MB "
+            f"({ratio:.0%})，顶点 {stats['vertices_before']} → {stats['vertices_after']}")
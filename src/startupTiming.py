@@ -0,0 +1,61 @@
+import json
+import os
+import time
+from datetime import datetime
+
+# --------------------------
+# 启动耗时统计
+# --------------------------
+# 第一次导入本模块的时间即进程启动时间，main.py 应最先导入
+T0 = time.perf_counter()
+TIMING_FILE = './output/startup_timing.jsonl'
+PHASES = ('import', 'init', 'first-list', 'model-build')
+
+
+class StartupTimer:
+    '''
+    Wall time of the startup phases:
+      import      process start until the main window is constructed
+      init        Earth Engine initialization
+      first-list  first level of the asset tree listed after init
+      model-build time spent building the tree model (summed)
+    '''
+    def __init__(self, t0=T0):
+        self.t0 = t0
+        self.phases = {}
+        self._started = {}
+        self.reported = False
+
+    def mark(self, phase):
+        '''
+        Record phase as lasting from process start until now.
+        '''
+        self.phases.setdefault(phase, time.perf_counter() - self.t0)
+
+    def start(self, phase):
+        self._started.setdefault(phase, time.perf_counter())
+
+    def stop(self, phase):
+        '''
+        End a started phase; repeated phases accumulate.
+        '''
+        started = self._started.pop(phase, None)
+        if started is not None:
+            self.phases[phase] = self.phases.get(phase, 0.0) + time.perf_counter() - started
+
+    def report(self, path=None):
+        '''
+        Print the breakdown once and append it to the timing history.
+        '''
+        if self.reported:
+            return
+        self.reported = True
+        total = time.perf_counter() - self.t0
+        parts = [f"{phase} {self.phases[phase]:.2f}s" for phase in PHASES if phase in self.phases]
+        print(f"⏱️ 启动耗时 {total:.2f}s: " + " | ".join(parts))
+
+        path = path or TIMING_FILE
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        entry = {'time': datetime.now().isoformat(timespec='seconds'), 'total': total, **self.phases}
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
@@ -0,0 +1,298 @@
+import hashlib
+import json
+import mmap
+import os
+import threading
+import ee
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import src.crawler as crawler
+import src.retry as retry
+import src.metrics as metrics
+from src.deleteEngine import DeleteEngine
+from src.uploadEngine import table_job
+
+# --------------------------
+# 本地目录增量同步
+# --------------------------
+MANIFEST_DIR = './output/sync'
+MAX_WORKERS = 8
+HASH_WORKERS = 4
+HASH_CHUNK = 8 * 2 ** 20
+MMAP_THRESHOLD = 64 * 2 ** 20  # 超过此大小的文件用 mmap 读取
+SHP_SIDECARS = ('.dbf', '.shx', '.prj', '.cpg')
+
+
+def hash_file(path, chunk_size=HASH_CHUNK):
+    '''
+    SHA-256 of a file without loading it whole: large files are mapped and
+    fed to the hash a chunk at a time, smaller ones read into one reused
+    buffer. hashlib releases the GIL on big updates, so files hash in
+    parallel threads.
+    '''
+    digest = hashlib.sha256()
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        if size and size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    for start in range(0, size, chunk_size):
+                        digest.update(view[start:start + chunk_size])
+                finally:
+                    view.release()
+        else:
+            buffer = bytearray(max(1, min(chunk_size, size)))
+            view = memoryview(buffer)
+            while True:
+                n = f.readinto(buffer)
+                if not n:
+                    break
+                digest.update(view[:n])
+    return digest.hexdigest()
+
+
+def scan(local_dir, asset_folder):
+    '''
+    Uploadable files directly in local_dir as {"name","path","files",
+    "asset_id","size","mtime_ns"}; a shapefile includes its sidecar files.
+    '''
+    sources = []
+    seen = {}
+    for entry in sorted(os.scandir(local_dir), key=lambda e: e.name):
+        if not entry.is_file() or table_job(entry.path, asset_folder) is None:
+            continue
+        stem = os.path.splitext(entry.path)[0]
+        asset_id = f"{asset_folder}/{os.path.basename(stem)}"
+        if asset_id in seen:
+            print(f"⚠️ 跳过同名文件: {entry.name}（与 {seen[asset_id]} 对应同一资产）")
+            continue
+        seen[asset_id] = entry.name
+        files = [entry.path]
+        if entry.name.lower().endswith('.shp'):
+            files += [stem + ext for ext in SHP_SIDECARS if os.path.exists(stem + ext)]
+        stats = [os.stat(path) for path in files]
+        sources.append({'name': entry.name, 'path': entry.path, 'files': files, 'asset_id': asset_id,
+                        'size': sum(s.st_size for s in stats), 'mtime_ns': max(s.st_mtime_ns for s in stats)})
+    return sources
+
+
+class SyncManifest:
+    '''
+    What the last sync uploaded into one asset folder: file name ->
+    {"hash","size","mtime_ns","assets"}, saved as JSON next to the move
+    journals. Written through a temporary file, so an interrupted save
+    keeps the previous manifest.
+    '''
+    def __init__(self, path, folder, files=None):
+        self.path = path
+        self.folder = folder
+        self.files = files or {}
+
+    @classmethod
+    def load(cls, folder, manifest_dir=None):
+        manifest_dir = manifest_dir or MANIFEST_DIR
+        path = os.path.join(manifest_dir, folder.replace('/', '_') + '.json')
+        files = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                files = json.load(f).get('files', {})
+        return cls(path, folder, files)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'folder': self.folder, 'files': self.files}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.path)
+
+
+class SyncEngine:
+    '''
+    Make an asset folder follow a local directory. Files are hashed in
+    parallel (a file whose size and mtime match the manifest keeps its
+    recorded hash unless rehash=True) and compared with the manifest and
+    the live folder listing: a file is uploaded when it is new, its hash
+    changed, or one of its assets is missing remotely. Assets a changed
+    file replaces are deleted first, and a file whose old assets could not
+    be deleted is not uploaded and keeps its manifest entry, so the next
+    run retries it. With delete_orphans, the assets of files that are gone
+    from the directory are deleted too. Only assets recorded in the
+    manifest or named after a local file are touched.
+
+    on_progress: optional callback(done, total, failed)
+    on_file:     optional callback(name, state), as for UploadEngine
+    '''
+    def __init__(self, max_workers=MAX_WORKERS, hash_workers=HASH_WORKERS, delete_orphans=False,
+                 rehash=False, manifest_dir=None, on_progress=None, on_file=None):
+        self.max_workers = max_workers
+        self.hash_workers = hash_workers
+        self.delete_orphans = delete_orphans
+        self.rehash = rehash
+        self.manifest_dir = manifest_dir
+        self.on_progress = on_progress
+        self.on_file = on_file
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def plan(self, local_dir, asset_folder, manifest=None):
+        '''
+        {"upload": [source], "replace": [asset], "orphans": [asset],
+        "unchanged": [name], "gone": [name], "create_folder": bool} where
+        sources are scan() dicts with their "hash" and assets are listing
+        dicts to delete.
+        '''
+        manifest = manifest or SyncManifest.load(asset_folder, self.manifest_dir)
+        sources = scan(local_dir, asset_folder)
+        self._hash(sources, manifest)
+        try:
+            remote = {a['id']: a for a in crawler.list_children(asset_folder)}
+        except Exception as e:
+            if 'not found' not in str(e).lower():
+                raise
+            remote = None  # 目标文件夹还不存在
+
+        plan = {'upload': [], 'replace': [], 'orphans': [], 'unchanged': [], 'gone': []}
+        for source in sources:
+            record = manifest.files.get(source['name'])
+            recorded = record['assets'] if record else [source['asset_id']]
+            existing = [remote[a] for a in recorded if remote and a in remote]
+            if record and record['hash'] == source['hash'] and len(existing) == len(recorded):
+                plan['unchanged'].append(source['name'])
+            else:
+                source['replaces'] = [asset['id'] for asset in existing]
+                plan['upload'].append(source)
+                plan['replace'].extend(existing)
+
+        local = {source['name'] for source in sources}
+        for name, record in manifest.files.items():
+            if name not in local:
+                plan['gone'].append(name)
+                plan['orphans'].extend(remote[a] for a in record['assets'] if remote and a in remote)
+        plan['create_folder'] = remote is None
+        return plan
+
+    @metrics.timed('sync.hash')
+    def _hash(self, sources, manifest):
+        todo = []
+        for source in sources:
+            record = manifest.files.get(source['name'])
+            if (not self.rehash and record and record['size'] == source['size']
+                    and record['mtime_ns'] == source['mtime_ns']):
+                source['hash'] = record['hash']
+            else:
+                todo.append(source)
+
+        def digest(source):
+            hashes = [hash_file(path) for path in source['files']]
+            if len(hashes) == 1:
+                return hashes[0]
+            # shapefile：各组成文件哈希的哈希
+            parts = ''.join(f"{os.path.splitext(p)[1].lower()}:{h}\n" for p, h in zip(source['files'], hashes))
+            return hashlib.sha256(parts.encode()).hexdigest()
+
+        with ThreadPoolExecutor(max_workers=self.hash_workers) as pool:
+            for source, value in zip(todo, pool.map(digest, todo)):
+                source['hash'] = value
+        if todo:
+            print(f"🔑 计算哈希 {len(todo)} 个文件，{len(sources) - len(todo)} 个沿用清单")
+
+    @metrics.timed('sync')
+    def run(self, local_dir, asset_folder, dry_run=False):
+        '''
+        Returns {"total","done","failed","errors","uploaded","deleted",
+        "unchanged","plan"}; "total" counts uploads plus orphan deletions.
+        With dry_run only the plan is computed.
+        '''
+        manifest = SyncManifest.load(asset_folder, self.manifest_dir)
+        plan = self.plan(local_dir, asset_folder, manifest)
+        orphans = plan['orphans'] if self.delete_orphans else []
+        result = {'total': len(plan['upload']) + len(orphans), 'done': 0, 'failed': 0, 'errors': [],
+                  'uploaded': [], 'deleted': [], 'unchanged': plan['unchanged'], 'plan': plan}
+        print(f"🔄 同步 {local_dir} → {asset_folder}: 上传 {len(plan['upload'])}，"
+              f"未变 {len(plan['unchanged'])}，远端多余 {len(plan['orphans'])}")
+        if dry_run:
+            return result
+        self._report(result)
+
+        if plan['create_folder']:
+            retry.call_with_retry(ee.data.createFolder, asset_folder)
+        # 内容变化的文件先删除旧资产，导出不能覆盖已有资产
+        if plan['replace'] or orphans:
+            deleted = DeleteEngine(max_workers=self.max_workers).run(plan['replace'] + orphans)
+            result['deleted'] = deleted['deleted']
+            result['errors'].extend(deleted['errors'])
+        gone = set(result['deleted'])
+        for asset in orphans:
+            if asset['id'] in gone:
+                result['done'] += 1
+            else:
+                result['failed'] += 1
+        # 资产已全部删除的源文件从清单中移除，删除失败的留待下次
+        orphan_ids = {asset['id'] for asset in orphans}
+        if self.delete_orphans:
+            for name in plan['gone']:
+                if not any(a in orphan_ids and a not in gone for a in manifest.files[name]['assets']):
+                    del manifest.files[name]
+        self._report(result)
+
+        # 旧资产没删掉的文件不上传，清单保持原样，下次重试
+        uploads = []
+        for source in plan['upload']:
+            if all(asset_id in gone for asset_id in source['replaces']):
+                uploads.append(source)
+            else:
+                result['failed'] += 1
+                result['errors'].append((source['name'], '旧资产删除失败，未上传'))
+                self._file(source['name'], 'failed')
+        self._report(result)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self._upload, source, asset_folder): source for source in uploads}
+            for future in as_completed(futures):
+                source = futures[future]
+                try:
+                    assets = future.result()
+                except Exception as e:
+                    result['failed'] += 1
+                    result['errors'].append((source['name'], str(e)))
+                    self._file(source['name'], 'failed')
+                    print(f"❌ 上传失败: {source['name']} 错误: {e}")
+                else:
+                    if assets is not None:
+                        manifest.files[source['name']] = {'hash': source['hash'], 'size': source['size'],
+                                                          'mtime_ns': source['mtime_ns'], 'assets': assets}
+                        result['done'] += 1
+                        result['uploaded'].append(source['name'])
+                        self._file(source['name'], 'done')
+                self._report(result)
+
+        manifest.save()
+        if self._cancelled.is_set():
+            print(f"⚠️ 同步已取消: {result['done']}/{result['total']}")
+        return result
+
+    def _upload(self, source, asset_folder):
+        '''
+        Start the upload of one source; the asset ids it writes, or None
+        when cancelled.
+        '''
+        if self._cancelled.is_set():
+            self._file(source['name'], 'cancelled')
+            return None
+        self._file(source['name'], 'running')
+        func, args = table_job(source['path'], asset_folder)
+        started = func(*args)
+        # GeoJSON、CSV 和地理坐标 SHP 分批上传返回 [(asset_id, task)]，投影 SHP 返回单个任务
+        if isinstance(started, list):
+            return [asset_id for asset_id, _ in started]
+        return [source['asset_id']]
+
+    def _file(self, name, state):
+        if self.on_file:
+            self.on_file(name, state)
+
+    def _report(self, result):
+        if self.on_progress:
+            self.on_progress(result['done'], result['total'], result['failed'])
@@ -0,0 +1,125 @@
+import ee
+import src.retry as retry
+import src.taskTracker as taskTracker
+
+# --------------------------
+# 分批导出表格资产
+# --------------------------
+# Export 请求体的上限约 10 MB，留出余量
+MAX_BATCH_BYTES = 8 * 2 ** 20
+MAX_BATCH_FEATURES = 10000
+
+
+def batched(features, max_bytes=MAX_BATCH_BYTES, max_features=MAX_BATCH_FEATURES):
+    '''
+    Group an iterable of (feature, bytes) pairs into feature lists bounded
+    by both the total serialized size and the feature count. A single
+    feature larger than max_bytes is still emitted, alone in its batch.
+    '''
+    batch, batch_bytes = [], 0
+    for feature, n in features:
+        if batch and (batch_bytes + n > max_bytes or len(batch) >= max_features):
+            yield batch
+            batch, batch_bytes = [], 0
+        batch.append(feature)
+        batch_bytes += n
+    if batch:
+        yield batch
+
+
+def to_collection(features, start_index=0):
+    '''
+    Client-side ee.FeatureCollection from GeoJSON features; system:index
+    continues from start_index so merged parts keep unique indices.
+    '''
+    return ee.FeatureCollection([
+        ee.Feature(
+            ee.Geometry(feature['geometry']) if feature.get('geometry') else None,
+            {**(feature.get('properties') or {}), 'system:index': str(start_index + i)}
+        )
+        for i, feature in enumerate(features)
+    ])
+
+
+def export_table(collection, description, asset_id):
+    '''
+    Start a table export to asset_id and register it with the task tracker.
+    '''
+    task = ee.batch.Export.table.toAsset(
+        collection=collection,
+        description=description,
+        assetId=asset_id
+    )
+    retry.call_with_retry(task.start)
+    taskTracker.get_tracker().track(task.id, description, asset_id, name=getattr(task, 'name', None))
+    return task
+
+
+def export_batches(batches, asset_id, description, merge=False, build=None):
+    '''
+    Export each batch of GeoJSON features as its own table asset.
+    build(batch, start_index) makes the collection of a batch, default
+    to_collection; batches only need a len().
+
+    A single batch goes straight to asset_id; otherwise the parts are named
+    {asset_id}_part0000, ... and returned as [(asset_id, task)]. Without
+    merge the parts stay as separate assets. With merge=True the tracker
+    combines them into asset_id once all of them have finished (see
+    merge_parts); someone has to keep polling the tracker for that.
+    '''
+    build = build or to_collection
+    batches = iter(batches)
+    first = next(batches, None)
+    if first is None:
+        print(f"⚠️ 没有可上传的要素: {description}")
+        return []
+    second = next(batches, None)
+    if second is None:
+        return [(asset_id, export_table(build(first), description, asset_id))]
+
+    parts = []
+    index = 0
+
+    def export_part(batch):
+        nonlocal index
+        part_id = f"{asset_id}_part{len(parts):04d}"
+        task = export_table(build(batch, index), f"{description}_part{len(parts):04d}", part_id)
+        print(f"📤 分批上传 {part_id}: {len(batch)} 个要素")
+        parts.append((part_id, task))
+        index += len(batch)
+
+    # 只保留一个预读批次，内存与批次大小成正比
+    export_part(first)
+    export_part(second)
+    for batch in batches:
+        export_part(batch)
+
+    if merge:
+        tracker = taskTracker.get_tracker()
+        tracker.on_done([task.id for _, task in parts],
+                        lambda failed: merge_parts([part_id for part_id, _ in parts], asset_id, description, failed))
+    return parts
+
+
+def merge_parts(part_ids, asset_id, description, failed=()):
+    '''
+    on_done callback of the part exports: export the union of the parts
+    to asset_id, then delete the parts once that export has succeeded.
+    If any part or the merge fails, the parts are kept.
+    '''
+    if failed:
+        print(f"❌ 分批导出失败，未合并 {asset_id}: {failed[0]['description']} {failed[0]['error'] or failed[0]['state']}")
+        return
+    merged = ee.FeatureCollection([ee.FeatureCollection(part_id) for part_id in part_ids]).flatten()
+    task = export_table(merged, description, asset_id)
+    print(f"🔗 合并 {len(part_ids)} 个分批资产 → {asset_id}")
+
+    def delete_parts(failed):
+        if failed:
+            print(f"❌ 合并失败，保留分批资产: {asset_id}")
+            return
+        for part_id in part_ids:
+            retry.call_with_retry(ee.data.deleteAsset, part_id)
+        print(f"🗑️ 已删除 {len(part_ids)} 个分批资产: {asset_id}_part*")
+
+    taskTracker.get_tracker().on_done([task.id], delete_parts)
@@ -0,0 +1,123 @@
+import time
+from PySide6.QtCore import Qt, QTimer, QRunnable, Slot, QThreadPool, Signal, QObject
+from PySide6.QtWidgets import (QDockWidget, QWidget, QVBoxLayout, QLabel, QTableWidget,
+                               QTableWidgetItem, QHeaderView, QAbstractItemView)
+import src.taskTracker as taskTracker
+
+# --------------------------
+# 导出任务面板
+# --------------------------
+SYNC_MS = 1000
+STATE_LABELS = [
+    ('PENDING', '排队'),
+    ('RUNNING', '运行中'),
+    ('SUCCEEDED', '成功'),
+    ('FAILED', '失败'),
+    ('CANCELLED', '已取消'),
+]
+
+
+class PollSignals(QObject):
+    finished = Signal(object)
+
+class PollTask(QRunnable):
+    '''
+    One TaskTracker.poll() off the GUI thread.
+    '''
+    def __init__(self, tracker):
+        super().__init__()
+        self.tracker = tracker
+        self.signaler = PollSignals()
+
+    @Slot()
+    def run(self):
+        try:
+            changed = self.tracker.poll()
+        except Exception as e:
+            print(f"❌ 查询任务状态失败: {e}")
+            changed = []
+        self.signaler.finished.emit(changed)
+
+
+class TaskPanel(QDockWidget):
+    '''
+    Dockable list of tracked export tasks with state counts. A one second
+    timer mirrors new tasks from the tracker; the tracker itself is polled
+    only while tasks are active, at its adaptive interval. When a task
+    succeeds, the destination folder is re-listed in the asset tree.
+    '''
+    def __init__(self, model, parent=None, tracker=None):
+        super().__init__("导出任务", parent)
+        self.setObjectName("taskPanel")
+        self.model = model
+        self.tracker = tracker or taskTracker.get_tracker()
+        self._rows = {}  # task id -> row
+        self._version = -1
+        self._polling = None  # 运行中的 PollTask
+        self._last_poll = 0.0
+
+        body = QWidget(self)
+        layout = QVBoxLayout(body)
+        self.summary = QLabel("暂无任务", body)
+        self.table = QTableWidget(0, 3, body)
+        self.table.setHorizontalHeaderLabels(["任务", "状态", "错误"])
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.summary)
+        layout.addWidget(self.table)
+        self.setWidget(body)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.tick)
+        self.timer.start(SYNC_MS)
+
+    @Slot()
+    def tick(self):
+        if self.tracker.version != self._version:
+            self.sync()
+        due = time.time() - self._last_poll >= self.tracker.interval
+        if self._polling is None and due and self.tracker.active():
+            self._polling = PollTask(self.tracker)
+            self._polling.signaler.finished.connect(self.on_polled)
+            QThreadPool.globalInstance().start(self._polling)
+
+    @Slot(object)
+    def on_polled(self, changed):
+        self._polling = None
+        self._last_poll = time.time()
+        self.sync()
+        # 完成的导出只刷新目标文件夹
+        folders = {r['asset_id'].rsplit('/', 1)[0] for r in changed
+                   if r['state'] == 'SUCCEEDED' and r['asset_id']}
+        for folder in folders:
+            self.model.refreshChildren(folder)
+
+    def sync(self):
+        '''
+        Update the rows and the summary from the tracker.
+        '''
+        self._version = self.tracker.version
+        for record in self.tracker.records():
+            row = self._rows.get(record['id'])
+            if row is None:
+                row = self._rows[record['id']] = self.table.rowCount()
+                self.table.insertRow(row)
+                self.table.setItem(row, 0, QTableWidgetItem(record['description']))
+                self.table.item(row, 0).setToolTip(record['asset_id'] or '')
+            self._set(row, 1, record['state'])
+            self._set(row, 2, record['error'] or '')
+
+        counts = self.tracker.counts()
+        parts = [f"{label} {counts[state]}" for state, label in STATE_LABELS if counts[state]]
+        self.summary.setText(" | ".join(parts) if parts else "暂无任务")
+
+    def _set(self, row, column, text):
+        item = self.table.item(row, column)
+        if item is None:
+            self.table.setItem(row, column, QTableWidgetItem(text))
+        elif item.text() != text:
+            item.setText(text)
+            if column == 1 and text in taskTracker.FAILED_STATES:
+                item.setForeground(Qt.red)
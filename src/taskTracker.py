@@ -0,0 +1,199 @@
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import ee
+import src.retry as retry
+
+# --------------------------
+# 导出任务跟踪（批量轮询）
+# --------------------------
+MIN_INTERVAL = 5
+MAX_INTERVAL = 60
+BACKOFF = 1.5
+ACTIVE_STATES = ('PENDING', 'RUNNING', 'CANCELLING')
+FAILED_STATES = ('FAILED', 'CANCELLED')
+# 活动任务不多时逐个 getOperation，不必列出项目的全部历史操作
+GET_LIMIT = 10
+
+
+class TaskTracker:
+    '''
+    Remember every started export task and refresh the active ones each
+    poll: with up to get_limit of them, one ee.data.getOperation each (in
+    parallel); with more, a single ee.data.listOperations call matched
+    against the tracked ids.
+
+    interval is the suggested delay before the next poll: it resets to
+    min_interval when a task is added or changes state and grows by BACKOFF
+    up to max_interval while nothing changes.
+
+    on_done callbacks run from the poll that sees their tasks finish, so
+    follow-up work (merging batch parts) needs no thread of its own.
+    '''
+    def __init__(self, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL, get_limit=GET_LIMIT):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.get_limit = get_limit
+        self.interval = min_interval
+        self.version = 0  # 任何记录变化时递增
+        self._tasks = {}  # task id -> {"id","name","description","asset_id","state","error","started"}
+        self._watchers = []  # [(task ids, callback)]，任务全部结束后回调
+        self._lock = threading.Lock()
+
+    def track(self, task_id, description, asset_id=None, name=None):
+        '''
+        name: the task's operation name (projects/.../operations/ID), needed
+              to poll it with getOperation.
+        '''
+        with self._lock:
+            self._tasks[task_id] = {
+                'id': task_id,
+                'name': name,
+                'description': description,
+                'asset_id': asset_id,
+                'state': 'PENDING',
+                'error': None,
+                'started': time.time(),
+            }
+            self.interval = self.min_interval
+            self.version += 1
+
+    def on_done(self, task_ids, callback):
+        '''
+        Call callback(failed) from the poll after which none of task_ids is
+        active any more; failed lists the records of those that failed.
+        '''
+        with self._lock:
+            self._watchers.append((set(task_ids), callback))
+
+    def records(self):
+        with self._lock:
+            return [dict(record) for record in self._tasks.values()]
+
+    def active(self):
+        with self._lock:
+            return [task_id for task_id, record in self._tasks.items() if record['state'] in ACTIVE_STATES]
+
+    def counts(self):
+        with self._lock:
+            return Counter(record['state'] for record in self._tasks.values())
+
+    def failures(self):
+        with self._lock:
+            return [dict(r) for r in self._tasks.values() if r['state'] in FAILED_STATES]
+
+    def poll(self):
+        '''
+        Refresh the active tasks; returns the records whose state changed.
+        '''
+        with self._lock:
+            active = {task_id: record['name'] for task_id, record in self._tasks.items()
+                      if record['state'] in ACTIVE_STATES}
+        if not active:
+            self._notify()
+            return []
+        operations = self._fetch(active)
+
+        changed = []
+        with self._lock:
+            for operation in operations:
+                task_id = operation.get('name', '').rsplit('/', 1)[-1]
+                if task_id not in active:
+                    continue
+                record = self._tasks[task_id]
+                state = operation.get('metadata', {}).get('state', record['state'])
+                if state == record['state']:
+                    continue
+                record['state'] = state
+                record['error'] = operation.get('error', {}).get('message')
+                changed.append(dict(record))
+            if changed:
+                self.interval = self.min_interval
+                self.version += 1
+            else:
+                # 长时间运行的任务逐渐降低轮询频率
+                self.interval = min(self.max_interval, self.interval * BACKOFF)
+        self._notify()
+        return changed
+
+    def _notify(self):
+        '''
+        Run the on_done callbacks whose tasks have all finished.
+        '''
+        with self._lock:
+            ready, waiting = [], []
+            for task_ids, callback in self._watchers:
+                records = [self._tasks[task_id] for task_id in task_ids]
+                if any(r['state'] in ACTIVE_STATES for r in records):
+                    waiting.append((task_ids, callback))
+                else:
+                    ready.append((callback, [dict(r) for r in records if r['state'] in FAILED_STATES]))
+            self._watchers = waiting
+        # 回调可能再启动任务（track 需要锁），在锁外执行
+        for callback, failed in ready:
+            try:
+                callback(failed)
+            except Exception as e:
+                print(f"❌ 任务完成回调失败: {e}")
+
+    def _fetch(self, active):
+        '''
+        Operation dicts covering the active tasks ({task id: operation name}).
+        '''
+        names = list(active.values())
+        if len(names) > self.get_limit or None in names:
+            return retry.call_with_retry(ee.data.listOperations)
+
+        def get(name):
+            try:
+                return retry.call_with_retry(ee.data.getOperation, name)
+            except Exception as e:
+                # 单个任务查询失败时保留原状态，下次再查
+                print(f"❌ 查询任务状态失败: {name} {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=len(names)) as pool:
+            return [operation for operation in pool.map(get, names) if operation]
+
+    def wait(self, task_ids):
+        '''
+        Block until the given tasks have finished; raise if any failed.
+        '''
+        task_ids = set(task_ids)
+        while True:
+            self.poll()
+            with self._lock:
+                records = [self._tasks[task_id] for task_id in task_ids]
+            failed = [r for r in records if r['state'] in FAILED_STATES]
+            if failed:
+                raise RuntimeError(f"导出任务失败: {failed[0]['description']} {failed[0]['error'] or failed[0]['state']}")
+            if all(r['state'] not in ACTIVE_STATES for r in records):
+                return
+            time.sleep(self.interval)
+
+    def wait_all(self):
+        '''
+        Block until every tracked task has finished, including the ones
+        on_done callbacks start meanwhile; raise if any failed.
+        '''
+        while True:
+            task_ids = [r['id'] for r in self.records()]
+            self.wait(task_ids)
+            with self._lock:
+                if len(self._tasks) == len(task_ids) and not self._watchers:
+                    return
+
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+def get_tracker():
+    '''
+    Tracker shared by every upload path and the task panel.
+    '''
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            _tracker = TaskTracker()
+        return _tracker
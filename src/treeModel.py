@@ -0,0 +1,452 @@
+import json
+import sys
+import ee
+import src.crawler as crawler
+import src.retry as retry
+import src.metrics as metrics
+from src.assetIndex import AssetIndex
+from PySide6.QtGui import QBrush, QColor
+from PySide6.QtCore import Qt, QAbstractItemModel, QModelIndex, QMimeData, QRunnable, QObject, QThreadPool, Signal, Slot
+
+MIME_TYPE = 'application/x-gee-asset-ids'
+CONTAINER_TYPES = ('Folder', 'ImageCollection')
+# 按页加载的容器：展开时只取第一页，滚动到末尾再取下一页
+PAGED_TYPES = ('ImageCollection',)
+HIGHLIGHT = QBrush(QColor('#fff3a0'))
+# 展开大文件夹时 flags() 按行调用，标志位组合预先算好
+ITEM_FLAGS = Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsDragEnabled
+CONTAINER_FLAGS = ITEM_FLAGS | Qt.ItemIsDropEnabled
+
+# --------------------------
+# 树节点
+# --------------------------
+class AssetNode:
+    '''
+    One row of the tree. Slots only: the id string is shared with the
+    model's id index, the type is interned and leaves share an empty
+    children tuple, so a node costs about a hundred bytes.
+    '''
+    __slots__ = ('id', 'type', 'parent', 'children', 'fetched', 'fetching', 'next_page', '_row')
+
+    def __init__(self, asset_id='', asset_type=None, parent=None, row=0):
+        # 根节点 id 为 ''、type 为 None
+        self.id = asset_id
+        self.type = sys.intern(asset_type) if asset_type else asset_type
+        self.parent = parent
+        self._row = row
+        container = self.is_container()
+        self.children = [] if container else ()
+        self.fetched = not container
+        self.fetching = False
+        self.next_page = None  # 分页容器的下一页 token
+
+    @property
+    def asset(self):
+        # Qt.UserRole 返回的 {"id","type"} 字典，按需生成
+        return {"id": self.id, "type": self.type or ''} if self.parent else None
+
+    @property
+    def name(self):
+        return self.id.rsplit('/', 1)[-1]
+
+    def is_container(self):
+        return self.parent is None or self.type in CONTAINER_TYPES
+
+    def is_paged(self):
+        return self.type in PAGED_TYPES
+
+    def row(self):
+        if self.parent is None:
+            return 0
+        siblings = self.parent.children
+        if self._row >= len(siblings) or siblings[self._row] is not self:
+            self._row = siblings.index(self)
+        return self._row
+
+    def is_ancestor_of(self, node):
+        while node is not None:
+            if node is self:
+                return True
+            node = node.parent
+        return False
+
+def _renumber(children, start=0):
+    for row in range(start, len(children)):
+        children[row]._row = row
+
+
+@metrics.timed('model-build')
+def build_tree(assets):
+    '''
+    Build (root, id index, search index) from a {"id","type","children"}
+    tree; folders whose "children" is None and all ImageCollections stay
+    lazy. Pure Python, so it can run on the loading thread and the GUI
+    thread only swaps it in.
+    '''
+    by_id = {}
+
+    def build(asset, parent, row):
+        node = AssetNode(asset['id'], asset.get('type', ''), parent, row)
+        by_id[node.id] = node
+        children = asset.get('children')
+        if node.is_container() and not node.is_paged() and children is not None:
+            node.children = [build(child, node, i) for i, child in enumerate(children)]
+            node.fetched = True
+        return node
+
+    root = AssetNode()
+    root.children = [build(asset, root, i) for i, asset in enumerate(assets)]
+    root.fetched = True
+    return root, by_id, AssetIndex((node.id, node.type) for node in by_id.values())
+
+# --------------------------
+# 后台获取子资产
+# --------------------------
+class ChildLoader(QObject):
+    loaded = Signal(str, object, object)  # parent id, children, 下一页 token
+
+class FetchChildrenTask(QRunnable):
+    '''
+    List a folder completely, or one page of a paged container.
+    '''
+    def __init__(self, parent_id, signaler, cache=None, paged=False, page_token=None):
+        super().__init__()
+        self.parent_id = parent_id
+        self.signaler = signaler
+        self.cache = cache
+        self.paged = paged
+        self.page_token = page_token
+
+    @Slot()
+    def run(self):
+        next_page = None
+        try:
+            if self.paged:
+                # 集合成员不写入缓存，只在浏览时按页获取
+                children, next_page = crawler.list_page(self.parent_id, self.page_token)
+            elif self.parent_id:
+                children = crawler.list_children(self.parent_id)
+            else:
+                children = retry.call_with_retry(ee.data.getAssetRoots)
+            if self.cache and not self.paged:
+                # 文件夹自身的 updateTime 未知，下次刷新时会重新列出
+                self.cache.replace_children(self.parent_id, children)
+        except Exception as e:
+            print(f"❌ 获取子资产失败: {self.parent_id} {e}")
+            children = []
+        self.signaler.loaded.emit(self.parent_id, children, next_page)
+
+# --------------------------
+# 按需加载的资产树模型
+# --------------------------
+class AssetTreeModel(QAbstractItemModel):
+    '''
+    Tree model that lists only the roots up front and fetches a folder's
+    children in the background the first time the view expands it.
+    ImageCollections are fetched a page at a time: the first page on
+    expand, the next ones when the view scrolls to the last loaded member.
+    '''
+    def __init__(self, parent=None, cache=None):
+        super().__init__(parent)
+        self.cache = cache
+        self._root = AssetNode()
+        self._by_id = {}  # asset id -> AssetNode，已加载节点的索引
+        self.search_index = AssetIndex()  # 已加载节点的名称搜索
+        self._highlighted = set()  # 搜索命中的 id
+        self._loader = ChildLoader()
+        self._loader.loaded.connect(self._on_children_loaded)
+
+    # ---- 节点访问 ----
+    def nodeFromIndex(self, index):
+        return index.internalPointer() if index.isValid() else self._root
+
+    def indexFromNode(self, node):
+        if node is None or node is self._root:
+            return QModelIndex()
+        return self.createIndex(node.row(), 0, node)
+
+    def findNode(self, asset_id):
+        if not asset_id:
+            return self._root
+        return self._by_id.get(asset_id)
+
+    def _unindex_subtree(self, node):
+        if self._by_id.get(node.id) is node:
+            del self._by_id[node.id]
+            self.search_index.remove(node.id)
+        for child in node.children:
+            self._unindex_subtree(child)
+
+    # ---- QAbstractItemModel 接口 ----
+    def index(self, row, column, parent=QModelIndex()):
+        node = self.nodeFromIndex(parent)
+        if column != 0 or row < 0 or row >= len(node.children):
+            return QModelIndex()
+        return self.createIndex(row, column, node.children[row])
+
+    def parent(self, index=None):
+        if index is None:
+            return super().parent()
+        if not index.isValid():
+            return QModelIndex()
+        return self.indexFromNode(index.internalPointer().parent)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        return len(self.nodeFromIndex(parent).children)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+
+    def hasChildren(self, parent=QModelIndex()):
+        node = self.nodeFromIndex(parent)
+        if not node.fetched:
+            return True  # 未加载的文件夹也显示展开箭头
+        return len(node.children) > 0
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        if role == Qt.DisplayRole:
+            return f"{node.name} ({node.type})"
+        if role == Qt.UserRole:
+            return node.asset
+        if role == Qt.BackgroundRole and node.id in self._highlighted:
+            return HIGHLIGHT
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole and section == 0:
+            return 'Assets'
+        return None
+
+    def canFetchMore(self, parent):
+        # QTreeView 布局时会对展开的节点反复 fetchMore，分页容器只让它取第一页
+        node = self.nodeFromIndex(parent)
+        return not node.fetched and not node.fetching and node.next_page is None
+
+    def fetchMore(self, parent):
+        if self.canFetchMore(parent):
+            self._fetch(self.nodeFromIndex(parent))
+
+    def fetchNextPage(self, parent):
+        '''
+        Load the next page of a paged container; the view calls this when
+        its last loaded member scrolls into sight.
+        '''
+        node = self.nodeFromIndex(parent)
+        if node.next_page and not node.fetching:
+            self._fetch(node)
+
+    def _fetch(self, node):
+        node.fetching = True
+        QThreadPool.globalInstance().start(
+            FetchChildrenTask(node.id, self._loader, self.cache, node.is_paged(), node.next_page))
+
+    def refreshChildren(self, parent_id):
+        '''
+        Re-list one already loaded folder and add the children that appeared
+        (e.g. a finished export); unloaded folders fetch on expand anyway.
+        '''
+        if self.cache and parent_id == self.cache.root_id:
+            parent_id = ''
+        node = self.findNode(parent_id)
+        if node is None or not node.fetched:
+            return
+        node.fetched = False
+        node.next_page = None  # 分页容器从第一页重新列出
+        self._fetch(node)
+
+    def reloadChildren(self, parent_id):
+        '''
+        Drop a loaded folder's rows and list it again, so rows that do not
+        exist on the server (e.g. after a failed move) disappear too.
+        '''
+        if self.cache and parent_id == self.cache.root_id:
+            parent_id = ''
+        node = self.findNode(parent_id)
+        if node is None or not node.fetched or node.fetching:
+            return
+        if node.children:
+            self.beginRemoveRows(self.indexFromNode(node), 0, len(node.children) - 1)
+            for child in node.children:
+                self._unindex_subtree(child)
+            node.children = []
+            self.endRemoveRows()
+        node.fetched = False
+        node.next_page = None
+        self._fetch(node)
+
+    @Slot(str, object, object)
+    def _on_children_loaded(self, parent_id, children, next_page=None):
+        node = self.findNode(parent_id)
+        if node is None or node.fetched:
+            return
+        node.fetching = False
+        node.next_page = next_page
+        node.fetched = next_page is None
+        # 拖入未加载文件夹的节点已在 children 中，合并时跳过
+        known = {child.id for child in node.children}
+        first = len(node.children)
+        new_nodes = [
+            AssetNode(c['id'], crawler.asset_type(c), node)
+            for c in children if c['id'] not in known
+        ]
+        for row, new_node in enumerate(new_nodes, first):
+            new_node._row = row
+        parent_index = self.indexFromNode(node)
+        if new_nodes:
+            self.beginInsertRows(parent_index, first, first + len(new_nodes) - 1)
+            node.children.extend(new_nodes)
+            for new_node in new_nodes:
+                self._by_id[new_node.id] = new_node
+                self.search_index.add(new_node.id, new_node.type)
+            self.endInsertRows()
+        elif parent_index.isValid():
+            # 空文件夹需要刷新展开箭头
+            self.dataChanged.emit(parent_index, parent_index)
+
+    # ---- 整体加载 ----
+    def reload(self):
+        '''
+        Drop everything and list the roots again in the background.
+        '''
+        self.beginResetModel()
+        self._root = AssetNode()
+        self._by_id = {}
+        self.search_index = AssetIndex()
+        self.endResetModel()
+
+    def setAssets(self, assets):
+        '''
+        Populate from a full {"id","type","children"} tree; folders whose
+        "children" is None stay lazy.
+        '''
+        self.setTree(build_tree(assets))
+
+    def setTree(self, tree):
+        '''
+        Swap in the result of build_tree().
+        '''
+        self.beginResetModel()
+        self._root, self._by_id, self.search_index = tree
+        self.endResetModel()
+
+    def setHighlighted(self, ids):
+        '''
+        Mark search matches; the view repaints them on its next update.
+        '''
+        self._highlighted = set(ids)
+
+    # ---- 删除 / 移动 ----
+    def removeById(self, asset_id):
+        node = self.findNode(asset_id)
+        if node is None or node is self._root:
+            return False
+        row = node.row()
+        self.beginRemoveRows(self.indexFromNode(node.parent), row, row)
+        del node.parent.children[row]
+        _renumber(node.parent.children, row)
+        self._unindex_subtree(node)
+        self.endRemoveRows()
+        print(f"🔄 从视图中移除: {asset_id}")
+        return True
+
+    def updateItemIdRecursive(self, node, new_parent_id):
+        '''
+        Rewrite the ids of node and its descendants after a move.
+        '''
+        self._rewrite_ids(node, new_parent_id)
+        index = self.indexFromNode(node)
+        self.dataChanged.emit(index, index, [Qt.UserRole])
+
+    def _rewrite_ids(self, node, new_parent_id):
+        name = node.name
+        if self._by_id.get(node.id) is node:
+            del self._by_id[node.id]
+            self.search_index.remove(node.id)
+        node.id = f"{new_parent_id}/{name}"
+        # 已有同名资产时保留原索引项，不覆盖
+        if node.id not in self._by_id:
+            self._by_id[node.id] = node
+            self.search_index.add(node.id, node.type)
+        for child in node.children:
+            self._rewrite_ids(child, node.id)
+
+    # ---- 拖拽 ----
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemIsDropEnabled
+        return CONTAINER_FLAGS if index.internalPointer().is_container() else ITEM_FLAGS
+
+    def supportedDropActions(self):
+        return Qt.MoveAction
+
+    def mimeTypes(self):
+        return [MIME_TYPE]
+
+    def mimeData(self, indexes):
+        ids = [self.nodeFromIndex(i).id for i in indexes if i.isValid() and i.column() == 0]
+        mime = QMimeData()
+        mime.setData(MIME_TYPE, json.dumps(ids).encode('utf-8'))
+        return mime
+
+    def canDropMimeData(self, data, action, row, column, parent):
+        target = self.nodeFromIndex(parent)
+        if not data.hasFormat(MIME_TYPE) or not target.is_container():
+            return False
+        ids = json.loads(bytes(data.data(MIME_TYPE)).decode('utf-8'))
+        if target.is_paged():
+            # 集合里只能放影像
+            if not all(getattr(self.findNode(i), 'type', None) == 'Image' for i in ids):
+                return False
+        return not self._name_conflict(target, ids)
+
+    def _name_conflict(self, target, ids):
+        '''
+        True when a dragged asset would take the id of an existing asset
+        in target, or two dragged assets share a name.
+        '''
+        # 不可见根节点的 id 为 ''，按已加载的子节点名字比较
+        names = {child.name for child in target.children}
+        for asset_id in ids:
+            node = self.findNode(asset_id)
+            if node is None or node.parent is target:
+                continue
+            if node.name in names or (target.id and f"{target.id}/{node.name}" in self._by_id):
+                return True
+            names.add(node.name)
+        return False
+
+    def dropMimeData(self, data, action, row, column, parent):
+        '''
+        Move the dragged nodes under parent. Ids are left untouched here;
+        MyTreeView rewrites them once the server-side move is started.
+        Rows are moved in place, so the view's removeRows() afterwards is a no-op.
+        '''
+        if action == Qt.IgnoreAction:
+            return True
+        if not self.canDropMimeData(data, action, row, column, parent):
+            return False
+        target = self.nodeFromIndex(parent)
+        ids = json.loads(bytes(data.data(MIME_TYPE)).decode('utf-8'))
+        moved = False
+        for asset_id in ids:
+            node = self.findNode(asset_id)
+            if node is None or node.parent is target or node.is_ancestor_of(target):
+                continue
+            src_row = node.row()
+            dest_row = len(target.children)
+            src_index = self.indexFromNode(node.parent)
+            if not self.beginMoveRows(src_index, src_row, src_row, self.indexFromNode(target), dest_row):
+                continue
+            del node.parent.children[src_row]
+            _renumber(node.parent.children, src_row)
+            node._row = len(target.children)
+            target.children.append(node)
+            node.parent = target
+            self.endMoveRows()
+            moved = True
+        return moved
@@ -0,0 +1,201 @@
+import os
+import threading
+import time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import src.geojsonStream as geojsonStream
+import src.tableUpload as tableUpload
+import src.metrics as metrics
+
+# --------------------------
+# 后台并发上传
+# --------------------------
+MAX_WORKERS = 8
+
+
+class UploadEngine:
+    '''
+    Upload a selection of files: every GeoJSON / SHP / CSV is its own job
+    and all TIFs together form one merge job, run concurrently under
+    max_workers. Cancelling skips the jobs that have not started yet.
+
+    merge:       combine the batch parts of each table into one asset
+                 (see tableUpload.export_batches)
+    on_progress: optional callback(done, total, failed)
+    on_file:     optional callback(path, state) with state one of
+                 'queued', 'running', 'done', 'failed', 'cancelled'
+    Both are called from worker threads.
+    '''
+    def __init__(self, max_workers=MAX_WORKERS, on_progress=None, on_file=None, merge=False):
+        self.max_workers = max_workers
+        self.merge = merge
+        self.on_progress = on_progress
+        self.on_file = on_file
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def jobs(self, file_paths, asset_folder):
+        '''
+        [(label, func, args)] for the given files; unknown types are skipped.
+        '''
+        jobs, tifs = [], []
+        for file_path in file_paths:
+            job = table_job(file_path, asset_folder, merge=self.merge)
+            if job is not None:
+                jobs.append((file_path, *job))
+            elif file_path.lower().endswith('.tif'):
+                tifs.append(file_path)
+            else:
+                print(f"⚠️ 跳过不支持的文件: {file_path}")
+        if tifs:
+            jobs.append((f"合成 {len(tifs)} 个 TIF", _merge_tifs, (tifs,)))
+        return jobs
+
+    @metrics.timed('upload')
+    def run(self, file_paths, asset_folder):
+        '''
+        Returns {"total","done","failed","errors"}.
+        '''
+        jobs = self.jobs(file_paths, asset_folder)
+        result = {'total': len(jobs), 'done': 0, 'failed': 0, 'errors': []}
+        for label, _, _ in jobs:
+            self._file(label, 'queued')
+        self._report(result)
+
+        def step(label, func, args):
+            if self._cancelled.is_set():
+                self._file(label, 'cancelled')
+                return False
+            self._file(label, 'running')
+            print(f"开始上传: {label}")
+            with metrics.span('upload.file', os.path.basename(label)):
+                func(*args)
+            return True
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(step, *job): job[0] for job in jobs}
+            for future in as_completed(futures):
+                label = futures[future]
+                try:
+                    started = future.result()
+                except Exception as e:
+                    result['failed'] += 1
+                    result['errors'].append((label, str(e)))
+                    self._file(label, 'failed')
+                    print(f"❌ 上传失败: {label} 错误: {e}")
+                else:
+                    if started:
+                        result['done'] += 1
+                        self._file(label, 'done')
+                        print(f"✅ 上传任务已启动: {label}")
+                self._report(result)
+
+        if self._cancelled.is_set():
+            print(f"⚠️ 上传已取消: {result['done']}/{result['total']}")
+        return result
+
+    def _file(self, label, state):
+        if self.on_file:
+            self.on_file(label, state)
+
+    def _report(self, result):
+        if self.on_progress:
+            self.on_progress(result['done'], result['total'], result['failed'])
+
+
+def table_job(file_path, asset_folder, merge=False):
+    '''
+    (helper, args) uploading one GeoJSON / SHP / CSV file to
+    asset_folder/<name without extension>, or None for other types.
+    '''
+    file_name = os.path.basename(file_path)
+    name_no_ext, ext = os.path.splitext(file_name)
+    ext = ext.lower()
+    asset_id = f"{asset_folder}/{name_no_ext}"
+    if ext == '.geojson':
+        return _upload_geojson, (file_path, name_no_ext, asset_id, merge)
+    if ext == '.shp':
+        return _upload_shp, (file_path, file_name, asset_id, merge)
+    if ext == '.csv':
+        return _upload_csv, (file_path, file_name, asset_id, merge)
+    return None
+
+
+def _upload_geojson(file_path,name_no_ext,asset_id,merge=False,max_bytes=tableUpload.MAX_BATCH_BYTES,
+                    max_features=tableUpload.MAX_BATCH_FEATURES):
+    '''
+    upload geojson file to GEE
+
+    Features are parsed incrementally and exported in batches bounded by
+    max_bytes / max_features, each as its own table asset; merge=True
+    combines the parts into asset_id once they have finished and then
+    deletes them.
+    '''
+    features = geojsonStream.iter_features(file_path, sizes=True)
+    batches = tableUpload.batched(features, max_bytes=max_bytes, max_features=max_features)
+    return tableUpload.export_batches(batches, asset_id, name_no_ext, merge=merge)
+
+def _upload_shp(file_path,file_name,asset_id,merge=False):
+    '''
+    upload shp file to GEE
+
+    Lon / lat shapefiles are streamed record by record, coordinates
+    rounded to shpStream.PRECISION decimals and simplified within
+    shpStream.TOLERANCE when those are set (by default they are kept
+    as is), and exported in payload-bounded batches, merged like GeoJSON.
+    Projected ones still go through geemap, which reprojects them into a
+    single export.
+    '''
+    import src.shpStream as shpStream
+    if shpStream.is_geographic(file_path):
+        return shpStream.upload_shapefile(file_path, asset_id, file_name, precision=shpStream.PRECISION,
+                                          tolerance=shpStream.TOLERANCE, merge=merge)
+    import geemap
+    fc = geemap.shp_to_ee(file_path)
+    return tableUpload.export_table(fc, file_name, asset_id)
+
+def _upload_csv(file_path,file_name,asset_id,merge=False,max_bytes=tableUpload.MAX_BATCH_BYTES,
+                max_features=tableUpload.MAX_BATCH_FEATURES):
+    '''
+    upload csv file to GEE
+
+    The file is validated, then read in chunks, rows with invalid
+    longitude / latitude are dropped, and each size-bounded batch is
+    exported as its own table asset (see csvPoints); merge=True combines
+    the parts into asset_id once they have finished and then deletes them.
+    '''
+    import src.csvPoints as csvPoints
+    return csvPoints.upload_points(file_path, asset_id, file_name, max_bytes=max_bytes,
+                                   max_features=max_features, merge=merge)
+
+
+def _merge_tifs(tifs, block_size=None, max_workers=None,
+                compress='DEFLATE', level=None, cog=False):
+    '''
+    Merge multiple TIF files into a single multi-band GeoTIFF,
+    streaming block windows so memory stays bounded.
+
+    block_size: defaults to rasterMerge.BLOCK_SIZE
+    compress/level/cog: output mode, see rasterMerge.merge_tifs. The default
+    writes a tiled DEFLATE file, which is much smaller to upload; pass
+    compress=None to keep the first input's layout.
+    '''
+    import src.rasterMerge as rasterMerge
+    output_dir = './output/tifs'
+    os.makedirs(output_dir, exist_ok=True)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_path = os.path.join(output_dir, f"{timestamp}.tif")
+
+    start = time.perf_counter()
+    rasterMerge.merge_tifs(tifs, output_path, block_size=block_size or rasterMerge.BLOCK_SIZE, max_workers=max_workers,
+                           compress=compress, level=level, cog=cog)
+    elapsed = time.perf_counter() - start
+
+    report = rasterMerge.size_report(output_path)
+    print(f"✅ 合成完成，输出文件: {output_path}")
+    print(f"📦 大小 {report['size'] / 2 ** 20:.1f} MB (未压缩 {report['raw_size'] / 2 ** 20:.1f} MB, "
+          f"压缩比 {report['ratio']:.2f}), 耗时 {elapsed:.1f}s")
+    return output_path
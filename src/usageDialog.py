@@ -0,0 +1,126 @@
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, Slot
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QTableView, QPushButton, QCheckBox,
+                               QLabel, QFileDialog, QHeaderView, QAbstractItemView)
+from src.usageEngine import write_csv, format_size
+
+# --------------------------
+# 存储用量报告窗口
+# --------------------------
+SUBTREE_TYPES = ('Folder', 'ImageCollection')
+COLUMNS = [
+    ('资产', 'id'),
+    ('类型', 'type'),
+    ('大小', 'total_bytes'),
+    ('资产数', 'assets'),
+    ('最早更新', 'oldest_update'),
+    ('最近更新', 'newest_update'),
+]
+
+
+class UsageModel(QAbstractTableModel):
+    '''
+    Usage rows for a QTableView; sorting reorders the row list in place
+    instead of going through a proxy.
+    '''
+    def __init__(self, rows, parent=None):
+        super().__init__(parent)
+        self.rows = rows
+
+    def setRows(self, rows):
+        self.beginResetModel()
+        self.rows = rows
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        key = COLUMNS[index.column()][1]
+        if role == Qt.DisplayRole:
+            value = row[key]
+            if key == 'total_bytes':
+                return format_size(value)
+            return '' if value is None else str(value)
+        if role == Qt.ToolTipRole and key == 'total_bytes':
+            return f"{row[key]:,} B"
+        if role == Qt.TextAlignmentRole and key in ('total_bytes', 'assets'):
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return COLUMNS[section][0]
+        return None
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        key = COLUMNS[column][1]
+        self.layoutAboutToBeChanged.emit()
+        # 空的更新时间不参与排序，始终排在最后
+        empty = [r for r in self.rows if r[key] is None]
+        rows = sorted((r for r in self.rows if r[key] is not None), key=lambda r: r[key],
+                      reverse=order == Qt.DescendingOrder)
+        self.rows = rows + empty
+        self.layoutChanged.emit()
+
+
+class UsageDialog(QDialog):
+    '''
+    Sortable table of the usage report, folders and collections only by
+    default, with CSV export of every asset.
+    '''
+    def __init__(self, result, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("存储用量")
+        self.resize(900, 600)
+        self.all_rows = result.get('rows', [])
+        roots = [r for r in self.all_rows if r['parent'] is None]
+        total = sum(r['total_bytes'] for r in roots)
+
+        self.summary = QLabel(f"共 {len(self.all_rows)} 个资产，{format_size(total)}；"
+                              f"本次查询 {result.get('queried', 0)} 个资产的大小", self)
+        self.subtrees_only = QCheckBox("只显示文件夹 / 集合", self)
+        self.subtrees_only.setChecked(True)
+        self.subtrees_only.toggled.connect(self.apply_filter)
+        export = QPushButton("导出 CSV", self)
+        export.clicked.connect(self.export_csv)
+
+        self.model = UsageModel([], self)
+        self.view = QTableView(self)
+        self.view.setModel(self.model)
+        self.view.setSortingEnabled(True)
+        self.view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.view.verticalHeader().setVisible(False)
+        self.view.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+
+        bar = QHBoxLayout()
+        bar.addWidget(self.summary, 1)
+        bar.addWidget(self.subtrees_only)
+        bar.addWidget(export)
+        layout = QVBoxLayout(self)
+        layout.addLayout(bar)
+        layout.addWidget(self.view)
+
+        self.apply_filter()
+        self.view.sortByColumn(2, Qt.DescendingOrder)
+
+    @Slot()
+    def apply_filter(self):
+        rows = self.all_rows
+        if self.subtrees_only.isChecked():
+            rows = [r for r in rows if r['type'] in SUBTREE_TYPES]
+        self.model.setRows(list(rows))
+        header = self.view.horizontalHeader()
+        self.model.sort(header.sortIndicatorSection(), header.sortIndicatorOrder())
+
+    @Slot()
+    def export_csv(self):
+        path, _ = QFileDialog.getSaveFileName(self, "导出用量", "asset_usage.csv", "CSV (*.csv)")
+        if path:
+            write_csv(self.all_rows, path)
+            print(f"✅ 已导出: {path}")
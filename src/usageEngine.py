@@ -0,0 +1,174 @@
+import csv
+import threading
+import ee
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import src.crawler as crawler
+import src.retry as retry
+import src.metrics as metrics
+import src.assetCache as assetCache
+
+# --------------------------
+# 存储用量报告
+# --------------------------
+MAX_WORKERS = 16
+CONTAINER_TYPES = ('Folder',)
+CSV_FIELDS = ('id', 'type', 'size_bytes', 'total_bytes', 'assets', 'oldest_update', 'newest_update')
+
+
+def _size(asset):
+    # REST 接口的 int64 以字符串返回
+    size = asset.get('sizeBytes')
+    return int(size) if size not in (None, '') else None
+
+
+class UsageEngine:
+    '''
+    Storage usage of the whole tree (or of some roots). Sizes come from
+    the listAssets entries where present; assets listed without one
+    (ImageCollections) are looked up with getAsset in parallel, and a
+    collection without a size of its own sums its images. Every folder is
+    listed again and sizes are stored per updateTime, so a repeat report
+    only queries assets whose listed updateTime changed.
+
+    on_progress: optional callback(done, total, failed), called from the
+                 engine thread.
+    '''
+    def __init__(self, max_workers=MAX_WORKERS, on_progress=None, cache=None):
+        self.max_workers = max_workers
+        self.on_progress = on_progress
+        self.cache = cache
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @metrics.timed('usage')
+    def run(self, roots=None):
+        '''
+        Returns {"total","done","failed","errors","rows","queried"} where rows
+        are dicts with CSV_FIELDS plus "parent" and "depth", parents before
+        their children; "total" counts the getAsset lookups.
+        '''
+        cache = self.cache or assetCache.get_cache()
+        meta = {}  # asset id -> 列表中的资产字典（含 sizeBytes / updateTime）
+
+        def on_listed(asset, children):
+            cache.on_listed(asset, children)
+            for child in children:
+                meta[child['id']] = child
+
+        if roots is None:
+            roots = retry.call_with_retry(ee.data.getAssetRoots)
+            cache.replace_children('', roots)
+        for root in roots:
+            meta[root['id']] = root
+        # 每个文件夹都重新列出：缓存的 updateTime 判断不了大小是否变化
+        tree = crawler.crawl_assets(roots=roots, max_workers=self.max_workers, on_listed=on_listed)
+
+        # 文件夹的大小由子资产汇总，其余资产缺大小时先查缓存再请求
+        nodes = []
+        stack = list(tree)
+        while stack:
+            node = stack.pop()
+            nodes.append(node)
+            stack.extend(node['children'])
+        sizes = {}
+        fresh = []  # 写回缓存的 (id, updateTime, size)
+        missing = []
+        for node in nodes:
+            if node['type'] in CONTAINER_TYPES:
+                continue
+            asset = meta.get(node['id'], {'id': node['id']})
+            size = _size(asset)
+            if size is None:
+                missing.append(asset)
+            else:
+                sizes[node['id']] = size
+                fresh.append((node['id'], asset.get('updateTime'), size))
+        stored = cache.cached_sizes(missing)
+        sizes.update(stored)
+        missing = [a for a in missing if a['id'] not in stored]
+
+        result = {'total': len(missing), 'done': 0, 'failed': 0, 'errors': [], 'queried': len(missing)}
+        self._report(result)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self._lookup, a['id']): a['id'] for a in missing}
+            for future in as_completed(futures):
+                asset_id = futures[future]
+                try:
+                    info = future.result()
+                except Exception as e:
+                    result['failed'] += 1
+                    result['errors'].append((asset_id, str(e)))
+                    print(f"❌ 获取大小失败: {asset_id} {e}")
+                else:
+                    if info is not None:
+                        sizes[asset_id] = info['size']
+                        meta[asset_id] = dict(meta.get(asset_id, {}), updateTime=info['updateTime'])
+                        fresh.append((asset_id, info['updateTime'], info['size']))
+                        result['done'] += 1
+                self._report(result)
+        cache.store_sizes([row for row in fresh if row[1]])
+
+        result['rows'] = self._roll_up(tree, meta, sizes)
+        if self._cancelled.is_set():
+            print(f"⚠️ 用量统计已取消: {result['done']}/{result['total']}")
+        return result
+
+    def _lookup(self, asset_id):
+        '''
+        {"size","updateTime"} of one asset, or None when cancelled.
+        '''
+        if self._cancelled.is_set():
+            return None
+        info = retry.call_with_retry(ee.data.getAsset, asset_id)
+        size = _size(info)
+        if size is None and crawler.asset_type(info) == 'ImageCollection':
+            size = sum(_size(image) or 0 for image in crawler.list_children(asset_id))
+        return {'size': size or 0, 'updateTime': info.get('updateTime')}
+
+    def _roll_up(self, tree, meta, sizes):
+        rows = []
+
+        def visit(node, parent, depth):
+            # 文件夹的时间取子树中最早 / 最近的更新，不算它自身
+            container = node['type'] in CONTAINER_TYPES
+            update_time = None if container else meta.get(node['id'], {}).get('updateTime')
+            row = {'id': node['id'], 'type': node['type'], 'parent': parent, 'depth': depth,
+                   'size_bytes': sizes.get(node['id'], 0), 'assets': 1,
+                   'oldest_update': update_time, 'newest_update': update_time}
+            row['total_bytes'] = row['size_bytes']
+            rows.append(row)
+            for child in node['children']:
+                sub = visit(child, node['id'], depth + 1)
+                row['total_bytes'] += sub['total_bytes']
+                row['assets'] += sub['assets']
+                for key, pick in (('oldest_update', min), ('newest_update', max)):
+                    values = [v for v in (row[key], sub[key]) if v]
+                    row[key] = pick(values) if values else None
+            return row
+
+        for node in tree:
+            visit(node, None, 0)
+        return rows
+
+    def _report(self, result):
+        if self.on_progress:
+            self.on_progress(result['done'], result['total'], result['failed'])
+
+
+def write_csv(rows, path):
+    '''
+    Write usage rows, largest subtree first.
+    '''
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(sorted(rows, key=lambda r: -r['total_bytes']))
+
+
+def format_size(size):
+    for unit in ('B', 'KB', 'MB', 'GB', 'TB'):
+        if size < 1024 or unit == 'TB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
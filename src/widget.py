@@ -1,19 +1,26 @@
-import src.opeAsset as oa
-import src.setup as setup
-from src.opeAsset import MyTreeView,LoadAssetTask
+import src.assetCache as assetCache
+import src.moveEngine as moveEngine
+import src.startupTiming as startupTiming
+import src.metrics as metrics
+from src.opeAsset import MyTreeView,InitTask,LoadAssetTask,CachedTreeTask,UploadTask,EngineTask
+from src.treeModel import AssetTreeModel, build_tree
+from src.taskPanel import TaskPanel
+from src.searchBar import SearchBar
+from src.usageEngine import UsageEngine
+from src.usageDialog import UsageDialog
 
 import sys
-import os
-from PySide6.QtCore import Qt,QFile, QIODevice, Slot,QThreadPool
+from PySide6.QtCore import Qt,QFile, QIODevice, Slot,QThreadPool,QTimer
 from PySide6.QtUiTools import QUiLoader
-from PySide6.QtWidgets import QApplication, QMainWindow,QLabel,QTreeView,QHeaderView,QAbstractItemView,QPushButton,QProgressDialog,QFileDialog,QMessageBox
-from PySide6.QtGui import QFont,QStandardItemModel, QStandardItem
+from PySide6.QtWidgets import QApplication, QMainWindow,QLabel,QTreeView,QHeaderView,QAbstractItemView,QPushButton,QFileDialog,QMessageBox
+from PySide6.QtGui import QFont
 
 
 class GEEAssetManager(QMainWindow):
     def __init__(self):
         super().__init__()
-        user = setup.initialize_earth_engine()
+        self.timer = startupTiming.StartupTimer()
+        self.timer.mark('import')
         # 加载UI文件
         loader = QUiLoader()
         ui_file = QFile("./ui/widget.ui")
@@ -26,37 +33,125 @@ class GEEAssetManager(QMainWindow):
 
         ##调整label
         self.user_label = self.window.findChild(QLabel, "user")
-        self.user_label.setText(f"{user}")
+        self.user_label.setText("...")
         self.user_label.setFont(self.setFont())
         self.user_label.adjustSize()#自适应大小
         ##调整treeview
         old_tree = self.window.findChild(QTreeView, "assets")
         self.asset_tree = MyTreeView(self.window)
-        self.asset_tree.setGeometry(old_tree.geometry())  # 保持位置和大小
+        # 树上方让出一行放搜索栏
+        geometry = old_tree.geometry()
+        search_height = 28
+        self.asset_tree.setGeometry(geometry.adjusted(0, search_height, 0, 0))
         self.asset_tree.setStyleSheet(old_tree.styleSheet())  # 保持样式
         old_tree.hide()
+        self.asset_model = AssetTreeModel(self, cache=assetCache.get_cache())
+        # 先放入空树，根节点标记为已加载，初始化前视图不会去列出
+        self.asset_model.setTree(build_tree([]))
+        self.asset_tree.setModel(self.asset_model)
+        # 设置header不自动拉伸，允许内容超出
+        header = self.asset_tree.header()
+        header.setSectionResizeMode(QHeaderView.ResizeToContents)
+        header.setStretchLastSection(False)
+        ##搜索栏
+        self.search_bar = SearchBar(self.asset_tree, self.asset_model, self.window)
+        self.search_bar.setGeometry(geometry.x(), geometry.y(), geometry.width(), search_height - 4)
+        self.search_bar.message.connect(self.statusBar().showMessage)
         ##刷新按钮
         self.refresh_btn = self.window.findChild(QPushButton,'refresh')       
         self.refresh_btn.clicked.connect(self.reload_assets_async)#连接刷新按钮
         ##上传按钮
         self.upload_btn = self.window.findChild(QPushButton,'upload')
         self.upload_btn.clicked.connect(self.handle_upload)
+        # 初始化完成前不能访问 GEE
+        self.refresh_btn.setEnabled(False)
+        self.upload_btn.setEnabled(False)
+        self.asset_tree.setContextMenuPolicy(Qt.NoContextMenu)  # 右键删除
 
 
         # 关闭UI文件
         ui_file.close()
-        self.load_assets()  # 初始化时加载资产
+
+        # 表单作为主窗口中心部件，右侧停靠导出任务面板
+        self.window.setMinimumSize(self.window.size())
+        self.setCentralWidget(self.window)
+        self.setWindowTitle(self.window.windowTitle())
+        self.task_panel = TaskPanel(self.asset_model, self)
+        self.addDockWidget(Qt.RightDockWidgetArea, self.task_panel)
+        ##工具菜单
+        tools_menu = self.menuBar().addMenu("工具")
+        self.usage_action = tools_menu.addAction("存储用量报告")
+        self.usage_action.triggered.connect(self.show_usage_report)
+        self.usage_action.setEnabled(False)
+        self.metrics_action = tools_menu.addAction("导出性能指标...")
+        self.metrics_action.triggered.connect(self.export_metrics)
+        ##状态栏右侧的 EE 调用统计
+        self.metrics_label = QLabel(self)
+        self.statusBar().addPermanentWidget(self.metrics_label)
+        self.metrics_timer = QTimer(self)
+        self.metrics_timer.timeout.connect(self.update_metrics)
+        if metrics.get_metrics().enabled:
+            self.metrics_timer.start(2000)
+        self.show_cached_assets()
 
         # 连接选中变化信号
         self.asset_tree.setSelectionMode(QAbstractItemView.ExtendedSelection)# 允许多选
         self.asset_tree.selectionModel().selectionChanged.connect(self.on_selection_changed)
 
-        # 启用拖拽
-        self.asset_tree.setDragEnabled(True)
-        self.asset_tree.setAcceptDrops(True)
+        # 拖拽在初始化完成后启用
         self.asset_tree.setDropIndicatorShown(True)
         self.asset_tree.setDefaultDropAction(Qt.MoveAction)
+
+        # 窗口先显示，GEE 初始化和首次加载在后台进行
+        self.statusBar().showMessage("正在初始化 Earth Engine...")
+        self.timer.start('init')
+        self.init_task = InitTask()
+        self.init_task.signaler.finished.connect(self.on_initialized)
+        QThreadPool.globalInstance().start(self.init_task)
+
+    @Slot(object)
+    def on_initialized(self, user):
+        '''
+        后台初始化完成：显示用户、启用操作并开始首次加载；
+        初始化失败（user 为 None）时提示错误，依赖 GEE 的操作保持禁用
+        '''
+        self.timer.stop('init')
+        if user is None:
+            self.user_label.setText("未连接")
+            self.user_label.adjustSize()
+            self.statusBar().showMessage("Earth Engine 初始化失败")
+            QMessageBox.critical(self.window, "初始化失败",
+                                 "Earth Engine 初始化失败，请检查 PROJECT 环境变量和认证后重新启动。")
+            return
+        self.user_label.setText(f"{user}")
+        self.user_label.adjustSize()
+        self.upload_btn.setEnabled(True)
+        self.usage_action.setEnabled(True)
+        self.asset_tree.setContextMenuPolicy(Qt.DefaultContextMenu)
+        self.asset_tree.setDragEnabled(True)
+        self.asset_tree.setAcceptDrops(True)
         self.asset_tree.setDragDropMode(QAbstractItemView.InternalMove)
+        self.load_assets()
+        self.resume_pending_moves()
+
+    def resume_pending_moves(self):
+        '''
+        上次中断的移动：询问是否按日志继续
+        '''
+        journals = moveEngine.pending_journals()
+        if not journals:
+            return
+        reply = QMessageBox.question(
+            self.window,
+            "恢复移动",
+            "以下移动未完成，是否继续？（Discard 放弃）\n" + "\n".join(journals),
+            QMessageBox.Yes | QMessageBox.No | QMessageBox.Discard
+        )
+        for path in journals:
+            if reply == QMessageBox.Yes:
+                self.asset_tree.runMoveJournal(path)
+            elif reply == QMessageBox.Discard:
+                moveEngine.abandon_journal(path)
 
     def setFont(self):
         '''
@@ -72,24 +167,17 @@ class GEEAssetManager(QMainWindow):
 
     def reload_assets_async(self):
         '''
-        异步刷新资产树
+        异步刷新资产树：后台与本地缓存对账，只重新列出 updateTime 变化的文件夹
         '''
-        # 显示加载中提示
-        self.loading_dialog = QProgressDialog("刷新中.....",None,0,0,self)
-        self.loading_dialog.setWindowTitle("请稍候")
-        self.loading_dialog.setWindowModality(Qt.ApplicationModal)
-        self.loading_dialog.setCancelButton(None)
-        self.loading_dialog.setStyleSheet("""
-            QProgressBar {
-                text-align: center;
-            }
-        """)
-
-        self.loading_dialog.show()
+        self.refresh_btn.setEnabled(False)
+        self.refresh_btn.setText("Refreshing...")
+        self.statusBar().showMessage("正在加载资产...")
 
         # 创建任务
-        task = LoadAssetTask()
+        task = LoadAssetTask(cache=self.asset_model.cache)
+        task.signaler.partial.connect(self.on_assets_partial)
         task.signaler.finished.connect(self.on_assets_loaded)  # 在主线程调用
+        self.timer.start('first-list')
         QThreadPool.globalInstance().start(task)
 
     @Slot()
@@ -102,19 +190,15 @@ class GEEAssetManager(QMainWindow):
         )
         if file_paths:
             paths = file_paths[0]
+            if not paths:
+                return
             # 判断是否全是 .tif 文件
             all_tif = all(path.lower().endswith('.tif') for path in paths)
 
             
             # 获取用户选择的资产目标文件夹
-            selected_indexes = self.asset_tree.selectionModel().selectedIndexes()
             selected_folder = None
-
-            for index in selected_indexes:
-                if index.column() != 0:
-                    continue
-                item = self.asset_tree.model().itemFromIndex(index)
-                asset_info = item.data(Qt.UserRole)
+            for asset_info in self.asset_tree.selectedAssets():
                 if asset_info.get("type") == "Folder":
                     selected_folder = asset_info['id']
                     break  
@@ -123,44 +207,42 @@ class GEEAssetManager(QMainWindow):
                 QMessageBox.warning(self, "未选择目标文件夹", "请选择目标文件夹后再上传。")
                 return
     
-            # 显示加载中提示
-            self.loading_dialog = QProgressDialog(self)
-            self.loading_dialog.setWindowTitle("请稍候")
-            self.loading_dialog.setWindowModality(Qt.ApplicationModal)
-            self.loading_dialog.setCancelButton(None)
-            self.loading_dialog.show()
             print(f"📂 上传到: {selected_folder}")
             print(f"📄 文件列表: {file_paths[0]}")
-            oa.upload_to_asset(file_paths, selected_folder)
-            # 关闭提示框
-            if self.loading_dialog:
-                self.loading_dialog.close()
-                self.loading_dialog = None
+            # 每个文件一个后台任务，界面保持响应
+            self.asset_tree.runWithProgress(UploadTask(paths, selected_folder), "上传中", "已启动")
 
-    @Slot(object)
-    def on_assets_loaded(self, assets):
+    @Slot()
+    def show_usage_report(self):
         '''
-        加载资产触发
+        后台统计整棵树的存储用量，完成后显示报告
         '''
-        model = QStandardItemModel()
-        model.setHorizontalHeaderLabels(['Assets'])
+        def on_finished(result):
+            if 'rows' in result:
+                self.usage_dialog = UsageDialog(result, self)
+                self.usage_dialog.show()
 
-        def insert_asset(asset, parent_item):
-            name = asset['id'].split('/')[-1]
-            node_text = f"{name} ({asset['type']})"
-            item = QStandardItem(node_text)
-            item.setData(asset, Qt.UserRole)
-            parent_item.appendRow(item)
-            for child in asset.get('children', []):
-                insert_asset(child, item)
+        self.asset_tree.runWithProgress(EngineTask(UsageEngine, 'run'), "存储用量", "已查询大小", on_finished)
 
-        for asset in assets:
-            insert_asset(asset, model.invisibleRootItem())
-
-        self.asset_tree.setModel(model)
-        header = self.asset_tree.header()
-        header.setSectionResizeMode(QHeaderView.ResizeToContents)
-        header.setStretchLastSection(False)
+    @Slot(object)
+    def on_assets_loaded(self, tree):
+        '''
+        加载资产触发：用后台建好的节点树替换模型，保留展开状态；
+        加载失败（tree 为 None）时保留当前资产树
+        '''
+        self.timer.stop('first-list')
+        if tree is not None:
+            expanded = self.asset_tree.expandedIds()
+            self.timer.start('model-build')
+            self.asset_model.setTree(tree)
+            self.timer.stop('model-build')
+            self.asset_tree.expandIds(expanded)
+            if self.search_bar.edit.text():
+                self.search_bar.search()  # 新树上重新匹配
+        self.refresh_btn.setEnabled(True)
+        self.refresh_btn.setText("Refresh")
+        self.statusBar().showMessage("就绪" if tree is not None else "加载资产失败，保留当前资产树", 5000)
+        self.timer.report()
 
         # 关闭提示框
         if self.loading_dialog:
@@ -169,46 +251,69 @@ class GEEAssetManager(QMainWindow):
 
     @Slot()
     def on_selection_changed(self):
-        # 获取所有选中的index
-        selected_indexes = self.asset_tree.selectionModel().selectedIndexes()
-        assets = []
-        for index in selected_indexes:
-            if index.isValid():
-                item = self.asset_tree.model().itemFromIndex(index)
-                asset_info = item.data(Qt.UserRole)
-                assets.append(asset_info)
-        print("选中资产:", assets)
+        # 只显示数量，不逐个取出资产信息
+        count = len(self.asset_tree.selectionModel().selectedRows())
+        self.statusBar().showMessage(f"已选 {count} 个资产" if count else "", 3000)
 
+    @Slot()
+    def update_metrics(self):
+        self.metrics_label.setText(metrics.get_metrics().summary())
 
-    def load_assets(self):
+    @Slot()
+    def export_metrics(self):
+        path, _ = QFileDialog.getSaveFileName(self, "导出性能指标", "metrics.json",
+                                              "JSON (*.json);;Prometheus (*.prom)")
+        if path:
+            metrics.get_metrics().write(path)
+            print(f"✅ 已导出: {path}")
+
+
+    @Slot(int)
+    def on_assets_partial(self, depth):
+        '''
+        第一层列出即为首次列表完成
         '''
-        load GEE assets and display in treeview
-        '''
-        assets = oa.get_assets()
-        model = QStandardItemModel()
-        model.setHorizontalHeaderLabels(['Assets'])
-        
-        def insert_asset(asset, parent_item):
-            name = asset['id'].split('/')[-1]
-            node_text = f"{name} ({asset['type']})"
-            item = QStandardItem(node_text)
-            item.setData(asset, Qt.UserRole)  # 保存原始资产信息
-            parent_item.appendRow(item)
-            for child in asset.get('children', []):
-                insert_asset(child, item)
-
-        for asset in assets:
-            insert_asset(asset, model.invisibleRootItem())
-        self.asset_tree.setModel(model)
-        # self.asset_tree.expandAll()  # 可选：展开所有节点
+        self.timer.stop('first-list')
 
-        # 设置header不自动拉伸，允许内容超出
-        header = self.asset_tree.header()
-        header.setSectionResizeMode(QHeaderView.ResizeToContents)
-        header.setStretchLastSection(False)
+    def show_cached_assets(self):
+        '''
+        Render the cached tree before Earth Engine is initialized; it is
+        read and built on the thread pool, only setTree() runs here.
+        Without a cache the tree stays empty (and does not fetch) until init.
+        '''
+        self.loading_dialog = None
+        self.has_cache = None  # 读取中
+        self.load_pending = False
+        self.timer.start('model-build')
+        self.cached_task = CachedTreeTask(self.asset_model.cache)
+        self.cached_task.signaler.finished.connect(self.on_cached_loaded)
+        QThreadPool.globalInstance().start(self.cached_task)
+
+    @Slot(object)
+    def on_cached_loaded(self, tree):
+        self.timer.stop('model-build')
+        self.has_cache = tree is not None
+        if tree is not None:
+            self.asset_model.setTree(tree)
+        if self.load_pending:
+            self.load_assets()
+
+    def load_assets(self):
+        '''
+        load GEE assets and display in treeview:
+        keep the cached tree (or list the roots lazily when there is no
+        cache yet), then reconcile in the background
+        '''
+        if self.has_cache is None:
+            # 缓存还在读取，读完再加载，避免旧树覆盖新结果
+            self.load_pending = True
+            return
+        if not self.has_cache:
+            self.asset_model.reload()
+        self.reload_assets_async()
 
 def display_widget():
     app = QApplication([])
     main_window = GEEAssetManager()
-    main_window.window.show()
+    main_window.show()
     app.exec()
\ No newline at end of file